@@ -1,19 +1,83 @@
+import os
 import dash
+import flask
 import dash_core_components as dcc
 import dash_html_components as html
-from dash.dependencies import Input, Output
+import dash_table
+from dash.dependencies import Input, Output, State, ClientsideFunction
 import plotly.graph_objs as go
 import pandas as pd
+import numpy as np
 from plotly.subplots import make_subplots
-from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
+from football_data import STAT_COLUMNS, load_dataset
+from head_to_head import HeadToHead
+from figures import FigureTemplates
+from caching import FileCache, LRUCache, Memoizer
+import serialization
+from render_cache import RENDERER_SOURCES, RenderCache, render_version
+from map_index import CLUSTER_TAG, ClusterIndex, MarkerIndex, take_points, view_zoom, viewport
 
 external_stylesheets = ['/assets/stylesheet.css', dbc.themes.BOOTSTRAP]
 mapbox_access_token = open('.mapbox_token').read()
-df1 = pd.read_excel('All_Teams_Coordinates.xlsx', sheet_name=None)
+dataset = load_dataset()
+df1 = dataset.coordinates
 df1_all = df1['All'].set_index('Team')
-df2 = pd.read_excel('All_Team_Data.xlsx', sheet_name=None)
-df3 = pd.read_csv('All_Matches_Data.csv')
+df2 = dataset.teams
+df2.prefix_sums()
+df3 = dataset.matches
+head_to_head = HeadToHead(df3, dataset.version)
+opponent_options = dict(
+    (team, [{'label': '%s (%d)' % (opponent, games), 'value': opponent}
+            for opponent, games in head_to_head.opponents(team) if opponent in df1_all.index])
+    for team in df1_all.index)
+figure_templates = FigureTemplates()
+team_store = dict(
+    (team, dict(colour=row['colour'], colour_away=row['colour_away'], suffix=row['suffix'],
+                wiki=row['wiki'], website=row['website'] if pd.notnull(row['website']) else None))
+    for team, row in df1_all.iterrows())
+
+
+def _team_from_click(chosen_team):
+    team = chosen_team['points'][0]['text']
+    return (team.encode('utf-8')).encode('ascii', 'ignore')
+
+
+CALLBACK_CACHE_SIZE = 1024
+CALLBACK_CACHE_FILES = 100000
+# Every module whose code the memoized callbacks' results come from.
+CALLBACK_SOURCES = RENDERER_SOURCES + ['head_to_head.py']
+
+# Results of the server callbacks, which depend only on their inputs and the
+# data and code (app_version).  With CALLBACK_CACHE_DIR set they are kept on
+# disk there, shared by the workers and across restarts, instead of in each
+# worker's memory; CALLBACK_CACHE_TTL (seconds) limits how long they are used.
+callback_cache_ttl = float(os.environ['CALLBACK_CACHE_TTL']) if os.environ.get('CALLBACK_CACHE_TTL') else None
+if os.environ.get('CALLBACK_CACHE_DIR'):
+    callback_backend = FileCache(os.environ['CALLBACK_CACHE_DIR'], CALLBACK_CACHE_FILES, callback_cache_ttl)
+else:
+    callback_backend = LRUCache(CALLBACK_CACHE_SIZE, callback_cache_ttl)
+app_version = render_version(dataset.version, CALLBACK_SOURCES)
+callback_cache = Memoizer(callback_backend, app_version)
+
+
+def _callback_key(*args):
+    # A Map click also carries the point's position and trace; only the
+    # team clicked matters.
+    return tuple(_team_from_click(arg) if isinstance(arg, dict) and 'points' in arg else arg
+                 for arg in args)
+
+
+def _encoded(value):
+    # Results are cached encoded, output by output, so a hit is sent without
+    # encoding it again and the cache holds JSON rather than plotly objects.
+    # serialization.encode counts the time in /_payload-stats.
+    if isinstance(value, tuple):
+        return tuple(_encoded(item) for item in value)
+    if value is dash.no_update:
+        return value
+    return serialization.encode(value)
+
 
 LOGO = "/assets/Logo.png"
 
@@ -67,6 +131,26 @@ navbar = dbc.Navbar(
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
 
 server = app.server
+serialization.install()
+
+# What the app serves and caches, for tuning; served only with STATS_ROUTES
+# set, so that a public deployment does not expose them.
+if os.environ.get('STATS_ROUTES'):
+    @server.route('/_payload-stats')
+    def payload_stats():
+        return flask.jsonify(serialization.payload_stats())
+
+    @server.route('/_cache-stats')
+    def cache_stats():
+        return flask.jsonify(dict(
+            callbacks=callback_cache.stats(),
+            render_cache=render_cache.stats(),
+            head_to_head=head_to_head.stats(),
+            team_frames=df2.stats(),
+        ))
+
+# Filled in once the team charts' figure templates are built, below.
+templates_store = dcc.Store(id='figure-templates')
 
 app.layout = html.Div([
     html.Div(navbar),
@@ -80,6 +164,8 @@ app.layout = html.Div([
                         id='Map',
                         config=dict(displayModeBar=False,),
                     ),
+                    dcc.Store(id='map-base'),
+                    dcc.Store(id='team-click'),
                     dcc.Dropdown(
                         id='L-NL-D-option',
                         options=[
@@ -111,6 +197,10 @@ app.layout = html.Div([
                         id='line',
                         config=dict(displayModeBar=False)
                     ),
+                    dcc.Store(
+                        id='team-store',
+                        data=team_store,
+                    ),
                     html.A(id='chosen-team-wiki',
                            children="Team Wiki",
                            href='https://plot.ly',
@@ -139,14 +229,18 @@ app.layout = html.Div([
                         id='team-pos',
                         config=dict(displayModeBar=False,),
                     ),
+                    dcc.Store(id='team-pos-patch'),
                     dcc.Graph(
                         id='team-WDL',
                         config=dict(displayModeBar=False,),
                     ),
+                    dcc.Store(id='team-WDL-patch'),
                     dcc.Graph(
                         id='team-GD',
                         config=dict(displayModeBar=False,),
                     ),
+                    dcc.Store(id='team-GD-patch'),
+                    templates_store,
                     dcc.Dropdown(
                         id='tot-pos-dropdown',
                         options=[
@@ -210,6 +304,11 @@ app.layout = html.Div([
                                 textAlign='center', color='white', fontSize=13,
                                 padding = '0px 8px 8px 8px'),
                     ),
+                    dcc.Store(id='team-seasons'),
+                    dcc.Store(
+                        id='season-labels',
+                        data=[str(season) for season in df2['Master']['Season']],
+                    ),
                     dcc.RangeSlider(
                         id='range-slider-all-pies',
                         min=0,
@@ -311,11 +410,26 @@ app.layout = html.Div([
                                 padding='0px 0px 10px 0px', height='60px',
                              )
                     ),
-                    dcc.Graph(
-                        className='twelve columns',
+                    dash_table.DataTable(
                         id='matches-table',
-                        config=dict(displayModeBar=False),
-                        style=dict(padding='0px 0px 0px 0px')
+                        columns=[{'name': name, 'id': column} for name, column in
+                                 [('Date', 'Date'), ('Home', 'home'), ('Away', 'visitor'), ('Score', 'FT'), ('Tier', 'tier')]],
+                        data=[],
+                        page_action='custom',
+                        page_current=0,
+                        page_size=9,
+                        page_count=1,
+                        sort_action='custom',
+                        sort_mode='single',
+                        sort_by=[],
+                        style_as_list_view=True,
+                        style_header=dict(backgroundColor='#343a40', color='white'),
+                        style_cell=dict(backgroundColor='#111111', color='white', textAlign='center',
+                                        fontSize=12, padding='2px', border='1px solid #506784'),
+                        style_cell_conditional=[
+                            {'if': {'column_id': column}, 'width': width} for column, width in
+                            [('Date', '18%'), ('home', '30%'), ('visitor', '30%'), ('FT', '9%'), ('tier', '12%')]],
+                        style_table=dict(height='248px', overflowY='auto'),
                     ),
                 ], style=dict(padding = '8px 8px 8px 0px')
             ),
@@ -327,8 +441,9 @@ app.layout = html.Div([
     [Output('biggest-win', 'children'),
      Output('biggest-loss', 'children'),
      Output('most-goals', 'children'),],
-    [Input('Map', 'clickData'),
+    [Input('team-click', 'data'),
      Input('versus-team-dropdown', 'value'),])
+@callback_cache.memoize('biggest-win', key=_callback_key, encode=_encoded)
 def update_output(chosen_team, chosen_opposition):
     biggest_win = """Biggest Win:\nN/A"""
     biggest_loss = """Biggest Loss:\nN/A"""
@@ -337,284 +452,368 @@ def update_output(chosen_team, chosen_opposition):
     if chosen_opposition == None:
         pass
     else:
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
+        team = _team_from_click(chosen_team)
 
         team_name = team
         versus_name = chosen_opposition
 
-        df3_team = df3.loc[((df3['home'] == team_name) | (df3['visitor'] == team_name))
-                            & ((df3['home'] == versus_name) | (df3['visitor'] == versus_name))].copy()
+        df_3 = head_to_head.record_matches('win', team_name, versus_name)
 
-        if len(df3_team['Season']) == 0:
+        if len(df_3['FT']) == 0:
             pass
+        elif len(df_3['FT']) == 1:
+            biggest_win = 'Biggest Win:\n%s (%s, %s)' % ((df_3.reset_index()).at[0, 'FT'], (df_3.reset_index()).at[0, 'result'], (df_3.reset_index()).at[0, 'Season'])
         else:
-            df3_team.insert(13, "WDL", None, True)
-            df3_team.insert(14, "GF", None, True,)
-            df3_team.insert(15, "zeros", '1', True)
-            df3_team.insert(16, "diff", '0', True)
-            df3_team.insert(17, "HA", 'H', True)
-
-            df3_team.loc[((df3_team.result == 'H') & (df3.home == team_name)), 'WDL'] = 'W'
-            df3_team.loc[((df3_team.result == 'A') & (df3.home == team_name)), 'WDL'] = 'L'
-            df3_team.loc[((df3_team.result == 'H') & (df3.home != team_name)), 'WDL'] = 'L'
-            df3_team.loc[((df3_team.result == 'A') & (df3.home != team_name)), 'WDL'] = 'W'
-            df3_team.loc[df3_team.result == 'D', 'WDL'] = 'D'
-            df3_team.loc[(df3_team.home != team_name), 'HA'] = 'A'
-            df3_team.loc[(df3_team.home == team_name), 'GF'] = df3_team['hgoal']
-            df3_team.loc[(df3_team.visitor == team_name), 'GF'] = df3_team['vgoal']
-            df3_team.loc[(df3_team.home != team_name), 'GA'] = df3_team['hgoal']
-            df3_team.loc[(df3_team.visitor != team_name), 'GA'] = df3_team['vgoal']
-            df3_team.loc[(df3_team.home == team_name), 'diff'] = (df3_team['hgoal'] - df3_team['vgoal'])
-            df3_team.loc[(df3_team.home != team_name), 'diff'] = (df3_team['vgoal'] - df3_team['hgoal'])
-
-            df3_team.insert(17, "totgoals", (df3_team['GF'] + df3_team['GA']), True)
+            biggest_win_years_list = []
+            for result, season in zip(df_3['result'], df_3['Season']):
+                biggest_win_years_list.append('(%s, %s)' % (result, season))
+                biggest_win_years = ', '.join(map(str, biggest_win_years_list))
+                biggest_win = 'Biggest Win:\n%s %s' % ((df_3.reset_index()).at[0, 'FT'], biggest_win_years)
 
-            df3_team_wins = df3_team.loc[(df3_team['WDL'] == 'W')].copy()
-            df3_team_draws = df3_team.loc[(df3_team['WDL'] == 'D')].copy()
-            df3_team_losses = df3_team.loc[(df3_team['WDL'] == 'L')].copy()
+        df_3 = head_to_head.record_matches('loss', team_name, versus_name)
 
-            max_diff = df3_team_wins['diff'].max()
-            df_2 = df3_team_wins.loc[df3_team_wins['diff'] == max_diff]
+        if len(df_3['FT']) == 0:
+            pass
+        elif len(df_3['FT']) == 1:
+            biggest_loss = 'Biggest Loss:\n%s (%s, %s)' % ((df_3.reset_index()).at[0, 'FT'], (df_3.reset_index()).at[0, 'result'], (df_3.reset_index()).at[0, 'Season'])
+        else:
+            biggest_loss_years_list = []
+            for result, season in zip(df_3['result'], df_3['Season']):
+                biggest_loss_years_list.append('(%s, %s)' % (result, season))
+                biggest_loss_years = ', '.join(map(str, biggest_loss_years_list))
+                biggest_loss = 'Biggest Loss:\n%s %s' % ((df_3.reset_index()).at[0, 'FT'], biggest_loss_years)
 
-            if max_diff <= 0:
-                pass
-            elif len(df_2['FT']) == 1:
-                biggest_win = 'Biggest Win:\n%s (%s, %s)' % ((df_2.reset_index()).at[0, 'FT'], (df_2.reset_index()).at[0, 'result'], (df_2.reset_index()).at[0, 'Season'])
-            else:
-                max_goals = df_2['GF'].max()
-                df_3 = df_2.loc[df_2['GF'] == max_goals]
+        df_2 = head_to_head.record_matches('goals', team_name, versus_name)
 
-                if len(df_3['FT']) == 1:
-                    biggest_win = 'Biggest Win:\n%s (%s, %s)' % ((df_3.reset_index()).at[0, 'FT'], (df_3.reset_index()).at[0, 'result'], (df_3.reset_index()).at[0, 'Season'])
-                else:
-                    biggest_win_years_list = []
-                    for result, season in zip(df_3['result'], df_3['Season']):
-                        biggest_win_years_list.append('(%s, %s)' % (result, season))
-                        biggest_win_years = ', '.join(map(str, biggest_win_years_list))
-                        biggest_win = 'Biggest Win:\n%s %s' % ((df_3.reset_index()).at[0, 'FT'], biggest_win_years)
+        if len(df_2['FT']) == 0:
+            pass
+        elif len(df_2['FT']) == 1:
+            most_goals = 'Most Goals:\n%s (%s, %s)' % ((df_2.reset_index()).at[0, 'FT'], (df_2.reset_index()).at[0, 'result'], (df_2.reset_index()).at[0, 'Season'])
+        else:
+            most_goals_list = []
+            for ft, result, season in zip(df_2['FT'], df_2['result'], df_2['Season']):
+                most_goals_list.append('%s (%s, %s)' % (ft, result, season))
+                most_goals_list_all = ', '.join(map(str, most_goals_list))
+                most_goals = 'Most Goals:\n %s' % most_goals_list_all
 
-            max_diff = df3_team_losses['diff'].min()
-            df_2 = df3_team_losses.loc[df3_team_losses['diff'] == max_diff]
+    return biggest_win, biggest_loss, most_goals
 
-            if max_diff >= 0:
-                pass
-            elif len(df_2['FT']) == 1:
-                biggest_loss = 'Biggest Loss:\n%s (%s, %s)' % ((df_2.reset_index()).at[0, 'FT'], (df_2.reset_index()).at[0, 'result'], (df_2.reset_index()).at[0, 'Season'])
-            else:
-                max_goals = df_2['GA'].max()
-                df_3 = df_2.loc[df_2['GA'] == max_goals]
+def opposition_tot_pos_base(option):
+    dff2 = df2['Master']
 
-                if len(df_3['FT']) == 1:
-                    biggest_loss = 'Biggest Loss:\n%s (%s, %s)' % ((df_3.reset_index()).at[0, 'FT'], (df_3.reset_index()).at[0, 'result'], (df_3.reset_index()).at[0, 'Season'])
-                else:
-                    biggest_loss_years_list = []
-                    for result, season in zip(df_3['result'], df_3['Season']):
-                        biggest_loss_years_list.append('(%s, %s)' % (result, season))
-                        biggest_loss_years = ', '.join(map(str, biggest_loss_years_list))
-                        biggest_loss = 'Biggest Loss:\n%s %s' % ((df_3.reset_index()).at[0, 'FT'], biggest_loss_years)
+    if option == 'default':
+        fig = go.Figure()
 
-            max_goals = df3_team['totgoals'].max()
-            df_2 = df3_team.loc[df3_team['totgoals'] == max_goals]
+        fig = make_subplots(rows=2, cols=1, specs=[[{'type':'xy'}], [{'type':'bar'}]], row_width=[1, 10], vertical_spacing = 0)
 
-            if len(df_2['FT']) == 1:
-                most_goals = 'Most Goals:\n%s (%s, %s)' % ((df_2.reset_index()).at[0, 'FT'], (df_2.reset_index()).at[0, 'result'], (df_2.reset_index()).at[0, 'Season'])
-            else:
-                most_goals_list = []
-                for ft, result, season in zip(df_2['FT'], df_2['result'], df_2['Season']):
-                    most_goals_list.append('%s (%s, %s)' % (ft, result, season))
-                    most_goals_list_all = ', '.join(map(str, most_goals_list))
-                    most_goals = 'Most Goals:\n %s' % most_goals_list_all
+        fig.add_trace(go.Scatter(
+            name='team_trace',
+            visible=False,
+            ),
+            row=1,
+            col=1,)
 
-    return biggest_win, biggest_loss, most_goals
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_1'],
+            hoverinfo='none'
+            ),
+            row=1,
+            col=1,)
 
-@app.callback(
-    Output('opposition-tot-pos', 'figure'),
-    [Input('Map', 'clickData'),
-     Input('versus-team-dropdown', 'value'),])
-def update_output(chosen_team, chosen_opposition):
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
+            hoverinfo='none'
+            ),
+            row=1,
+            col=1,)
 
-    dff2 = df2['Master']
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
+            hoverinfo='none'
+            ),
+            row=1,
+            col=1,)
 
-    fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_4'] + dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
+            hoverinfo='none'
+            ),
+            row=1,
+            col=1,)
 
-    fig = make_subplots(rows=2, cols=1, specs=[[{'type':'xy'}], [{'type':'bar'}]], row_width=[1, 10], vertical_spacing = 0)
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '1st Tier',
+                                            font=dict(size=8),
+                                            x = 122,
+                                            y = 6.5,
+                                            showarrow = False,
+                                            valign = 'middle',),
+                          row=1,
+                          col=1,)
 
-    fig.add_trace(go.Scatter(
-        name='team_trace',
-        visible=False,
-        ),
-        row=1,
-        col=1,)
-
-    fig.add_trace(go.Scatter(
-        line=dict(color='white'),
-        x=dff2['Season'],
-        y=dff2['Teams_in_Tier_1'],
-        hoverinfo='none'
-        ),
-        row=1,
-        col=1,)
-
-    fig.add_trace(go.Scatter(
-        line=dict(color='white'),
-        x=dff2['Season'],
-        y=dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
-        hoverinfo='none'
-        ),
-        row=1,
-        col=1,)
-
-    fig.add_trace(go.Scatter(
-        line=dict(color='white'),
-        x=dff2['Season'],
-        y=dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
-        hoverinfo='none'
-        ),
-        row=1,
-        col=1,)
-
-    fig.add_trace(go.Scatter(
-        line=dict(color='white'),
-        x=dff2['Season'],
-        y=dff2['Teams_in_Tier_4'] + dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
-        hoverinfo='none'
-        ),
-        row=1,
-        col=1,)
-
-    fig.add_annotation(go.layout.Annotation(
-                                        text = '1st Tier',
-                                        font=dict(size=8),
-                                        x = 122,
-                                        y = 6.5,
-                                        showarrow = False,
-                                        valign = 'middle',),
-                      row=1,
-                      col=1,)
-
-    fig.add_annotation(go.layout.Annotation(
-                                        text = '2nd Tier',
-                                        font=dict(size=8),
-                                        x = 122,
-                                        y = 26,
-                                        showarrow = False,
-                                        valign = 'middle',),
-                      row=1,
-                      col=1,)
-
-    fig.add_annotation(go.layout.Annotation(
-                                        text = '3rd Tier',
-                                        font=dict(size=8),
-                                        x = 122,
-                                        y = 50,
-                                        showarrow = False,
-                                        valign = 'middle',),
-                      row=1,
-                      col=1,)
-
-    fig.add_annotation(go.layout.Annotation(
-                                        text = '4th Tier',
-                                        font=dict(size=8),
-                                        x = 122,
-                                        y = 74,
-                                        showarrow = False,
-                                        valign = 'middle',),
-                      row=1,
-                      col=1,)
-
-    fig.add_trace(go.Bar(
-                    x = [1],
-                    y= [1],
-                    marker = dict(color='#111111',
-                                  line=dict(color='#111111',
-                                            width=0.75),),
-                    ),
-                row=2,
-                col=1,
-                )
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '2nd Tier',
+                                            font=dict(size=8),
+                                            x = 122,
+                                            y = 26,
+                                            showarrow = False,
+                                            valign = 'middle',),
+                          row=1,
+                          col=1,)
 
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '3rd Tier',
+                                            font=dict(size=8),
+                                            x = 122,
+                                            y = 50,
+                                            showarrow = False,
+                                            valign = 'middle',),
+                          row=1,
+                          col=1,)
 
-    fig.update_layout(
-        template='plotly_dark',
-        showlegend=False,
-        xaxis1 = dict(range = (-0.5, 130.5),
-            fixedrange=True,
-            showgrid=False,
-            zeroline=False,
-            showticklabels=False,
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '4th Tier',
+                                            font=dict(size=8),
+                                            x = 122,
+                                            y = 74,
+                                            showarrow = False,
+                                            valign = 'middle',),
+                          row=1,
+                          col=1,)
+
+        fig.add_trace(go.Bar(
+                        x = [1],
+                        y= [1],
+                        marker = dict(color='#111111',
+                                      line=dict(color='#111111',
+                                                width=0.75),),
+                        ),
+                    row=2,
+                    col=1,
+                    )
+
+
+        fig.update_layout(
+            template='plotly_dark',
+            showlegend=False,
+            xaxis1 = dict(range = (-0.5, 130.5),
+                fixedrange=True,
+                showgrid=False,
+                zeroline=False,
+                showticklabels=False,
+                ),
+            yaxis1 = dict(
+                zeroline=False,
+                showgrid=False,
+                range = (95.5, -0.5),
+                tickmode = 'array',
+                tickvals = [1, 20, 40, 60, 80],
+                title=dict(text='Final League Position', font=dict(size=13), standoff=10),
+                ),
+            xaxis2=dict(
+                fixedrange=True,
+                type='date',
+                range = ('1888-01-01', '2019-07-01'),
+                zeroline=False,
+                showgrid=False,
+                mirror=False,
+                ticks='',
+                linecolor='#343a40',
+                showline=True,
             ),
-        yaxis1 = dict(
-            zeroline=False,
-            showgrid=False,
-            range = (95.5, -0.5),
-            tickmode = 'array',
-            tickvals = [1, 20, 40, 60, 80],
-            title=dict(text='Final League Position', font=dict(size=13), standoff=10),
+            yaxis2=dict(
+                range = (0, 0.85),
+                showticklabels=False,
+                zeroline=False,
+                showgrid=False,
             ),
-        xaxis2=dict(
-            fixedrange=True,
-            type='date',
-            range = ('1888-01-01', '2019-07-01'),
-            zeroline=False,
-            showgrid=False,
-            mirror=False,
-            ticks='',
-            linecolor='#343a40',
-            showline=True,
-        ),
-        yaxis2=dict(
-            range = (0, 0.85),
-            showticklabels=False,
-            zeroline=False,
-            showgrid=False,
-        ),
-        margin=dict(
-            l=0,
-            r=0,
-            t=0,
-            b=0,
-        ),
-        height=180,
-    )
+            margin=dict(
+                l=0,
+                r=0,
+                t=0,
+                b=0,
+            ),
+            height=180,
+        )
+
+    elif option == 'versus':
+        fig = go.Figure()
+
+        fig = make_subplots(rows=2, cols=1, specs=[[{'type':'xy'}], [{'type':'bar'}]], row_width=[1, 10], vertical_spacing = 0)
+
+        fig.add_trace(go.Scatter(
+            name='team_trace',
+            visible=False,
+            showlegend=False,
+            ),
+            row=1,
+            col=1,)
+
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_1'],
+            hoverinfo='none',
+            showlegend=False,
+            ),
+            row=1,
+            col=1,)
+
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
+            hoverinfo='none',
+            showlegend=False,
+            ),
+            row=1,
+            col=1,)
+
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
+            hoverinfo='none',
+            showlegend=False,
+            ),
+            row=1,
+            col=1,)
+
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_4'] + dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
+            hoverinfo='none',
+            showlegend=False,
+            ),
+            row=1,
+            col=1,)
+
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '1st Tier',
+                                            font=dict(size=8),
+                                            x = 122,
+                                            y = 6.5,
+                                            showarrow = False,
+                                            valign = 'middle',
+                                            ),
+                          row=1,
+                          col=1,)
+
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '2nd Tier',
+                                            font=dict(size=8),
+                                            x = 122,
+                                            y = 26,
+                                            showarrow = False,
+                                            valign = 'middle',
+                                            ),
+                          row=1,
+                          col=1,)
+
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '3rd Tier',
+                                            font=dict(size=8),
+                                            x = 122,
+                                            y = 50,
+                                            showarrow = False,
+                                            valign = 'middle',
+                                            ),
+                          row=1,
+                          col=1,)
+
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '4th Tier',
+                                            font=dict(size=8),
+                                            x = 122,
+                                            y = 74,
+                                            showarrow = False,
+                                            valign = 'middle',
+                                            ),
+                          row=1,
+                          col=1,)
+
+        fig.update_layout(
+            template='plotly_dark',
+            showlegend=True,
+            legend=dict(traceorder='reversed',
+                        tracegroupgap=5,
+                        font=dict(size=10),
+                        x=0,
+                        y=0.1),
+            xaxis1 = dict(range = (-0.5, 130.5),
+                showgrid=False,
+                zeroline=False,
+                showticklabels=False,
+                ),
+            yaxis1 = dict(
+                zeroline=False,
+                showgrid=False,
+                range = (95.5, -0.5),
+                tickmode = 'array',
+                tickvals = [1, 20, 40, 60, 80],
+                title=dict(text='Final League Position', font=dict(size=13), standoff=10),
+                ),
+            xaxis2=dict(
+                type='date',
+                range = ('1888-01-01', '2019-07-01'),
+                zeroline=False,
+                showgrid=False,
+                mirror=False,
+                ticks='',
+                linecolor='#343a40',
+                showline=True,
+            ),
+            yaxis2=dict(
+                range = (0, 0.8),
+                showticklabels=False,
+                zeroline=False,
+                showgrid=False,
+            ),
+            margin=dict(
+                l=0,
+                r=0,
+                t=0,
+                b=0,
+            ),
+            height=180,
+        )
+
+    return fig
+
+for option in ['default', 'versus']:
+    figure_templates.add(('opposition-tot-pos', option), opposition_tot_pos_base(option))
+
+@app.callback(
+    Output('opposition-tot-pos', 'figure'),
+    [Input('team-click', 'data'),
+     Input('versus-team-dropdown', 'value'),])
+@callback_cache.memoize('opposition-tot-pos', key=_callback_key, encode=_encoded)
+def update_output(chosen_team, chosen_opposition):
+
+    fig = figure_templates.get(('opposition-tot-pos', 'default'))
 
     if chosen_opposition == None:
         pass
 
     else:
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
+        team = _team_from_click(chosen_team)
 
         team_name = team
         versus_name = chosen_opposition
 
-        df3_team = df3.loc[((df3['home'] == team_name) | (df3['visitor'] == team_name))
-                                    & ((df3['home'] == versus_name) | (df3['visitor'] == versus_name))].copy()
+        df3_team = head_to_head.between(team_name, versus_name)
         if len(df3_team['Season']) == 0:
             pass
         else:
-            df3_team.insert(13, "WDL", None, True)
-            df3_team.insert(14, "GF", None, True,)
-            df3_team.insert(15, "zeros", '1', True)
-            df3_team.loc[((df3_team.result == 'H') & (df3.home == team_name)), 'WDL'] = 'W'
-            df3_team.loc[((df3_team.result == 'A') & (df3.home == team_name)), 'WDL'] = 'L'
-            df3_team.loc[((df3_team.result == 'H') & (df3.home != team_name)), 'WDL'] = 'L'
-            df3_team.loc[((df3_team.result == 'A') & (df3.home != team_name)), 'WDL'] = 'W'
-            df3_team.loc[df3_team.result == 'D', 'WDL'] = 'D'
-            df3_team.loc[(df3.home == team_name), 'GF'] = df3_team['hgoal']
-            df3_team.loc[(df3.visitor == team_name), 'GF'] = df3_team['vgoal']
-            df3_team.loc[(df3.home != team_name), 'GA'] = df3_team['hgoal']
-            df3_team.loc[(df3.visitor != team_name), 'GA'] = df3_team['vgoal']
-
-            wins = (df3_team.WDL == 'W').sum(skipna=True)
-            draws = (df3_team.WDL == 'D').sum(skipna=True)
-            losses = (df3_team.WDL == 'L').sum(skipna=True)
-            pld = wins + draws + losses
-
-            gf = (df3_team['GF']).sum(skipna=True)
-            ga = (df3_team['GA']).sum(skipna=True)
-            allgoals = gf + ga
-
             df3_team_wins = df3_team.loc[(df3_team['WDL'] == 'W')].copy()
             df3_team_draws = df3_team.loc[(df3_team['WDL'] == 'D')].copy()
             df3_team_losses = df3_team.loc[(df3_team['WDL'] == 'L')].copy()
@@ -629,57 +828,7 @@ def update_output(chosen_team, chosen_opposition):
             else:
                 versus_color = df1_all.at[versus_name, 'colour']
 
-            fig = go.Figure()
-
-            fig = make_subplots(rows=2, cols=1, specs=[[{'type':'xy'}], [{'type':'bar'}]], row_width=[1, 10], vertical_spacing = 0)
-
-            fig.add_trace(go.Scatter(
-                name='team_trace',
-                visible=False,
-                showlegend=False,
-                ),
-                row=1,
-                col=1,)
-
-            fig.add_trace(go.Scatter(
-                line=dict(color='white'),
-                x=dff2['Season'],
-                y=dff2['Teams_in_Tier_1'],
-                hoverinfo='none',
-                showlegend=False,
-                ),
-                row=1,
-                col=1,)
-
-            fig.add_trace(go.Scatter(
-                line=dict(color='white'),
-                x=dff2['Season'],
-                y=dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
-                hoverinfo='none',
-                showlegend=False,
-                ),
-                row=1,
-                col=1,)
-
-            fig.add_trace(go.Scatter(
-                line=dict(color='white'),
-                x=dff2['Season'],
-                y=dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
-                hoverinfo='none',
-                showlegend=False,
-                ),
-                row=1,
-                col=1,)
-
-            fig.add_trace(go.Scatter(
-                line=dict(color='white'),
-                x=dff2['Season'],
-                y=dff2['Teams_in_Tier_4'] + dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
-                hoverinfo='none',
-                showlegend=False,
-                ),
-                row=1,
-                col=1,)
+            fig = figure_templates.get(('opposition-tot-pos', 'versus'))
 
             fig.add_trace(go.Scatter(
                 name=versus_name,
@@ -691,9 +840,7 @@ def update_output(chosen_team, chosen_opposition):
                       "League Position: %{customdata}<br>" +
                       "Full League Position: %{y}<br>" +
                       "<extra></extra>",
-                showlegend=True,),
-                row=1,
-                col=1,)
+                showlegend=True,))
 
             fig.add_trace(go.Scatter(
                 name=team_name,
@@ -705,53 +852,7 @@ def update_output(chosen_team, chosen_opposition):
                       "League Position: %{customdata}<br>" +
                       "Full League Position: %{y}<br>" +
                       "<extra></extra>",
-                showlegend=True,),
-                row=1,
-                col=1,)
-
-            fig.add_annotation(go.layout.Annotation(
-                                                text = '1st Tier',
-                                                font=dict(size=8),
-                                                x = 122,
-                                                y = 6.5,
-                                                showarrow = False,
-                                                valign = 'middle',
-                                                ),
-                              row=1,
-                              col=1,)
-
-            fig.add_annotation(go.layout.Annotation(
-                                                text = '2nd Tier',
-                                                font=dict(size=8),
-                                                x = 122,
-                                                y = 26,
-                                                showarrow = False,
-                                                valign = 'middle',
-                                                ),
-                              row=1,
-                              col=1,)
-
-            fig.add_annotation(go.layout.Annotation(
-                                                text = '3rd Tier',
-                                                font=dict(size=8),
-                                                x = 122,
-                                                y = 50,
-                                                showarrow = False,
-                                                valign = 'middle',
-                                                ),
-                              row=1,
-                              col=1,)
-
-            fig.add_annotation(go.layout.Annotation(
-                                                text = '4th Tier',
-                                                font=dict(size=8),
-                                                x = 122,
-                                                y = 74,
-                                                showarrow = False,
-                                                valign = 'middle',
-                                                ),
-                              row=1,
-                              col=1,)
+                showlegend=True,))
 
             fig.add_trace(go.Bar(
                             x = wins_date,
@@ -759,83 +860,35 @@ def update_output(chosen_team, chosen_opposition):
                             marker = dict(color='#56b36f',
                                           line=dict(color='#56b36f',
                                                     width=0.9),),
-                            showlegend=False,),
-                        row=2,
-                        col=1,
-                        )
+                            showlegend=False,
+                            xaxis='x2',
+                            yaxis='y2',))
             fig.add_trace(go.Bar(
                             x = draws_date,
                             y= zeros,
                             marker = dict(color='white',
                                           line=dict(color='white',
                                                     width=0.9),),
-                            showlegend=False,),
-                        row=2,
-                        col=1,
-                        )
+                            showlegend=False,
+                            xaxis='x2',
+                            yaxis='y2',))
             fig.add_trace(go.Bar(
                             x = losses_date,
                             y= zeros,
                             marker = dict(color='#eb5a4e',
                                           line=dict(color='#eb5a4e',
                                                     width=0.9),),
-                            showlegend=False,),
-                        row=2,
-                        col=1,
-                        )
-
-            fig.update_layout(
-                template='plotly_dark',
-                showlegend=True,
-                legend=dict(traceorder='reversed',
-                            tracegroupgap=5,
-                            font=dict(size=10),
-                            x=0,
-                            y=0.1),
-                xaxis1 = dict(range = (-0.5, 130.5),
-                    showgrid=False,
-                    zeroline=False,
-                    showticklabels=False,
-                    ),
-                yaxis1 = dict(
-                    zeroline=False,
-                    showgrid=False,
-                    range = (95.5, -0.5),
-                    tickmode = 'array',
-                    tickvals = [1, 20, 40, 60, 80],
-                    title=dict(text='Final League Position', font=dict(size=13), standoff=10),
-                    ),
-                xaxis2=dict(
-                    type='date',
-                    range = ('1888-01-01', '2019-07-01'),
-                    zeroline=False,
-                    showgrid=False,
-                    mirror=False,
-                    ticks='',
-                    linecolor='#343a40',
-                    showline=True,
-                ),
-                yaxis2=dict(
-                    range = (0, 0.8),
-                    showticklabels=False,
-                    zeroline=False,
-                    showgrid=False,
-                ),
-                margin=dict(
-                    l=0,
-                    r=0,
-                    t=0,
-                    b=0,
-                ),
-                height=180,
-            )
+                            showlegend=False,
+                            xaxis='x2',
+                            yaxis='y2',))
 
     return fig
 
 @app.callback(
     Output('opposition-pies', 'figure'),
-    [Input('Map', 'clickData'),
+    [Input('team-click', 'data'),
      Input('versus-team-dropdown', 'value'),])
+@callback_cache.memoize('opposition-pies', key=_callback_key, encode=_encoded)
 def update_output(chosen_team, chosen_opposition):
     fig = go.Figure()
 
@@ -904,38 +957,23 @@ def update_output(chosen_team, chosen_opposition):
     if chosen_opposition == None:
         pass
     else:
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
+        team = _team_from_click(chosen_team)
 
         team_name = team
         versus_name = chosen_opposition
 
-        df3_team = df3.loc[((df3['home'] == team_name) | (df3['visitor'] == team_name))
-                            & ((df3['home'] == versus_name) | (df3['visitor'] == versus_name))].copy()
+        summary = head_to_head.summary(team_name, versus_name)
 
-        if len(df3_team['Season']) == 0:
+        if summary['games'] == 0:
             pass
         else:
-            df3_team.insert(13, "WDL", None, True)
-            df3_team.insert(14, "GF", None, True,)
-
-            df3_team.loc[((df3_team.result == 'H') & (df3.home == team_name)), 'WDL'] = 'W'
-            df3_team.loc[((df3_team.result == 'A') & (df3.home == team_name)), 'WDL'] = 'L'
-            df3_team.loc[((df3_team.result == 'H') & (df3.home != team_name)), 'WDL'] = 'L'
-            df3_team.loc[((df3_team.result == 'A') & (df3.home != team_name)), 'WDL'] = 'W'
-            df3_team.loc[df3_team.result == 'D', 'WDL'] = 'D'
-            df3_team.loc[(df3.home == team_name), 'GF'] = df3_team['hgoal']
-            df3_team.loc[(df3.visitor == team_name), 'GF'] = df3_team['vgoal']
-            df3_team.loc[(df3.home != team_name), 'GA'] = df3_team['hgoal']
-            df3_team.loc[(df3.visitor != team_name), 'GA'] = df3_team['vgoal']
-
-            wins = (df3_team.WDL == 'W').sum(skipna=True)
-            draws = (df3_team.WDL == 'D').sum(skipna=True)
-            losses = (df3_team.WDL == 'L').sum(skipna=True)
-            pld = wins + draws + losses
-
-            gf = (df3_team['GF']).sum(skipna=True)
-            ga = (df3_team['GA']).sum(skipna=True)
+            wins = summary['W']
+            draws = summary['D']
+            losses = summary['L']
+            pld = summary['games']
+
+            gf = summary['GF']
+            ga = summary['GA']
             allgoals = gf + ga
 
             fig = go.Figure()
@@ -1007,62 +1045,21 @@ def update_output(chosen_team, chosen_opposition):
 
     return fig
 
-@app.callback(
-    Output('line-opposition', 'figure'),
-    [Input('Map', 'clickData')])
-def update_output(chosen_team):
-    fig = go.Figure()
-
-    fig.update_layout(
-        margin=go.layout.Margin(
-                l=0,
-                r=0,
-                b=4,
-                t=0,
-        ),
-        xaxis=dict(range=(0, 0),
-                       visible=False,
-                       showgrid=False,
-                       showticklabels=False,),
-        yaxis=dict(range=(0, 0),
-                      visible=False,
-                      showgrid=False,
-                      showticklabels=False,),
-        height=10,
-        plot_bgcolor='#111111',
-        paper_bgcolor='white',
-    )
-    if chosen_team == None:
-        pass
-    else:
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
-        team_primary_color = df1_all.at[team, 'colour']
-
-        fig.update_layout(
-        paper_bgcolor=team_primary_color,
-        )
-
-    return fig
-
 @app.callback(
     Output('opposition-games-bar-title', 'children'),
-    [Input('Map', 'clickData'),
+    [Input('team-click', 'data'),
      Input('versus-team-dropdown', 'value'),])
+@callback_cache.memoize('opposition-games-bar-title', key=_callback_key, encode=_encoded)
 def update_output(chosen_team, chosen_opposition):
     if chosen_opposition == None:
         return "Games Played: N/A"
     elif chosen_opposition != None:
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
+        team = _team_from_click(chosen_team)
 
         team_name = team
         versus_name = chosen_opposition
 
-        df3_team = df3.loc[((df3['home'] == team_name) | (df3['visitor'] == team_name))
-                            & ((df3['home'] == versus_name) | (df3['visitor'] == versus_name))].copy()
-
-        games_played = len(df3_team['Season'])
+        games_played = head_to_head.summary(team_name, versus_name)['games']
 
         if games_played == None:
             games_played = '0'
@@ -1071,138 +1068,74 @@ def update_output(chosen_team, chosen_opposition):
 
         return 'Games Played: {}'.format(games_played)
 
-@app.callback(
-    Output('team-name-vs', 'children'),
-    [Input('Map', 'clickData')])
-def update_output(chosen_team):
-    if chosen_team == None:
-        return "Team"
-    else:
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
-
-        return '{}'.format(team)
-
-@app.callback(
-    [Output('versus-team-dropdown', 'options'),
-    Output('versus-team-dropdown', 'disabled')],
-    [Input('Map', 'clickData'),])
-def update_output(chosen_team):
-    if chosen_team == 'None':
-        pass
-    else:
-        return [{'label': i, 'value': i} for i in df1['All']['Team']], False
+# A new team, opponent or order starts the table at its first page.
+MATCHES_TABLE_RESETS = ['team-click.data', 'versus-team-dropdown.value', 'matches-table.sort_by']
 
 @app.callback(
-    Output('matches-table', 'figure'),
-    [Input('Map', 'clickData'),
-     Input('versus-team-dropdown', 'value')])
-def update_output(chosen_team, chosen_opposition):
-
-    fig = go.Figure()
-
-    zeros = ['-', '-', '-', '-', '-', '-', '-', '-', '-', '-']
-
-    fig.add_trace(go.Table(
-        header = dict(values = ['Date', 'Home', 'Away', 'Score', 'Tier'],
-                      fill = dict(color = '#343a40')),
-        cells = dict(values = [zeros, zeros, zeros, zeros, zeros],
-                     align = 'center',
-                     fill = dict(color = '#111111')
-                     ),
-        columnwidth=[0.6, 1, 1, 0.3, 0.4],
-    ))
-
-    fig.update_layout(
-        template='plotly_dark',
-        margin = dict(t=0, l=0, r=0, b=0),
-        height=248,)
+    [Output('matches-table', 'data'),
+     Output('matches-table', 'page_count'),
+     Output('matches-table', 'style_data_conditional'),
+     Output('matches-table', 'page_current')],
+    [Input('team-click', 'data'),
+     Input('versus-team-dropdown', 'value'),
+     Input('matches-table', 'page_current'),
+     Input('matches-table', 'page_size'),
+     Input('matches-table', 'sort_by')])
+def update_output(chosen_team, chosen_opposition, page_current, page_size, sort_by):
+    triggered = [trigger['prop_id'] for trigger in dash.callback_context.triggered]
+    if any(prop in MATCHES_TABLE_RESETS for prop in triggered):
+        page_current = 0
+    return matches_table_page(chosen_team, chosen_opposition, page_current or 0, page_size, sort_by)
+
+@callback_cache.memoize('matches-table', key=_callback_key, encode=_encoded)
+def matches_table_page(chosen_team, chosen_opposition, page_current, page_size, sort_by):
+    # The table's rows, page count and result colours for the page, and the
+    # page shown, which is page_current unless that is past the last page.
+
+    zeros = [dict(Date='-', home='-', visitor='-', FT='-', tier='-') for i in range(page_size)]
+    data, page_count, style_data_conditional, page_shown = zeros, 1, [], 0
 
     if chosen_opposition == None:
         pass
     else:
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
+        team = _team_from_click(chosen_team)
 
         team_name = team
         versus_name = chosen_opposition
 
-        df3_team = df3.loc[((df3['home'] == team_name) | (df3['visitor'] == team_name))
-                    & ((df3['home'] == versus_name) | (df3['visitor'] == versus_name))].copy()
-
-        if len(df3_team['Season']) == 0:
-            pass
+        if sort_by:
+            sort_column = sort_by[0]['column_id']
+            descending = sort_by[0]['direction'] == 'desc'
         else:
-            df3_team.insert(13, "WDL", None, True)
-
-            df3_team.loc[((df3_team.result == 'H') & (df3.home == team_name)), 'WDL'] = 'W'
-            df3_team.loc[((df3_team.result == 'A') & (df3.home == team_name)), 'WDL'] = 'L'
-            df3_team.loc[((df3_team.result == 'H') & (df3.home != team_name)), 'WDL'] = 'L'
-            df3_team.loc[((df3_team.result == 'A') & (df3.home != team_name)), 'WDL'] = 'W'
-            df3_team.loc[df3_team.result == 'D', 'WDL'] = 'D'
-
-            fig = go.Figure()
-
-            cell_colors = {'W': '#56b36f', 'D': 'white', 'L': '#eb5a4e',}
-            text_colors = {'W': 'white', 'D': '#111111', 'L': 'white'}
-
-            fig.add_trace(go.Table(
-                header = dict(values = ['Date', 'Home', 'Away', 'Score', 'Tier'],
-                              fill = dict(color = '#343a40')),
-                cells = dict(values = [df3_team['Date'], df3_team['home'], df3_team['visitor'], df3_team['FT'], df3_team['tier']],
-                             align = 'center',
-                             font = dict(color = ['white',
-                                                  'white',
-                                                  'white',
-                                                  '#111111',
-                                                  'white',]
-                             ),
-                             fill = dict(color = ['#111111',
-                                                  '#111111',
-                                                  '#111111',
-                                                  [cell_colors[score] for score in df3_team['WDL']],
-                                                  '#111111',]),
-                             ),
-                columnwidth=[0.6, 1, 1, 0.3, 0.4],
-            ))
-
-            fig.update_layout(
-                template='plotly_dark',
-                margin = dict(t=0, l=0, r=0, b=0),
-                height=248,)
-
-    return fig
+            sort_column, descending = None, False
 
+        df3_page, page_count, page_shown = head_to_head.page(team_name, versus_name, page_current,
+                                                             page_size, sort_column, descending)
 
+        if len(df3_page['Season']) == 0:
+            pass
+        else:
+            wdl = np.asarray(df3_page['WDL'])
+            cell_colors = np.select([wdl == 'W', wdl == 'L'], ['#56b36f', '#eb5a4e'], 'white')
 
+            data = pd.DataFrame(dict(
+                Date=df3_page['Date'].dt.strftime('%Y-%m-%d').values,
+                home=np.asarray(df3_page['home'].astype(str)),
+                visitor=np.asarray(df3_page['visitor'].astype(str)),
+                FT=np.asarray(df3_page['FT'].astype(str)),
+                tier=np.asarray(df3_page['tier'].astype(str)),
+            )).to_dict('records')
+            style_data_conditional = [
+                {'if': {'row_index': i, 'column_id': 'FT'}, 'backgroundColor': color, 'color': '#111111'}
+                for i, color in enumerate(cell_colors)]
 
+    return data, page_count, style_data_conditional, page_shown
 
-@app.callback(
-    Output('range-dates', 'children'),
-    [Input('Map', 'clickData'),
-     Input('range-slider-all-pies', 'value'),])
-def update_output(chosen_team, range_values):
-    if chosen_team == None:
-        return '1888/89 - 2018/19'
-    else:
-        text = '%s - %s' % (df2['Master'].at[range_values[0], 'Season'], df2['Master'].at[range_values[1], 'Season'])
-        return text
 
-@app.callback(
-    Output('range-slider-all-pies', 'disabled'),
-    [Input('Map', 'clickData'),])
-def update_output(chosen_team):
-    if chosen_team == None:
-        return True
-    else:
-        return False
 
-@app.callback(
-    Output('gd-pie', 'figure'),
-    [Input('Map', 'clickData'),
-    Input('range-slider-all-pies', 'value')])
-def update_output(chosen_team, years_range):
 
+def pie_base(title, height, bottom):
+    # The grey ring the season-range pies show before a team is clicked.
     fig = go.Figure()
 
     fig.add_trace(go.Pie(
@@ -1219,7 +1152,7 @@ def update_output(chosen_team, years_range):
 
     fig.update_layout(
         annotations=[
-            dict(text="Goals For / Against",
+            dict(text=title,
                  font=dict(color='white'),
                  xref='paper',
                  yref='paper',
@@ -1230,113 +1163,118 @@ def update_output(chosen_team, years_range):
         ],
         showlegend=False,
         template='plotly_dark',
-        margin = dict(t=35, l=0, r=0, b=3),
-        height=148,
+        margin = dict(t=35, l=0, r=0, b=bottom),
+        height=height,
     )
 
-    if chosen_team == None:
-        pass
-    else:
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
-
-        df2_team = df2[team][years_range[0]:years_range[1]+1]
-
-        HF = df2_team['HF'].sum(skipna=True)
-        HA = df2_team['HA'].sum(skipna=True)
-        AF = df2_team['AF'].sum(skipna=True)
-        AA = df2_team['AA'].sum(skipna=True)
-        Pld = df2_team['Pld'].sum(skipna=True)
-
-        if Pld == 0:
-            pass
-        else:
-
-            fig = go.Figure()
+    return fig
 
-            fig.add_trace(go.Pie(
-                ids=['Home', 'Away'],
-                labels=['Home', 'Away'],
-                values=[(HF+HA),(AF+AA)],
-                marker=dict(colors=[df1_all.at[team, 'colour'], df1_all.at[team, 'colour_away']],
-                           line=dict(color='#111111',
-                                     width=3,)
-                ),
-                rotation=(AF+AA)/(AF+AA+HF+HA)*360,
-                hole=0,
-                textinfo='none',
-                hoverinfo='none',
-                sort=False,
-                customdata=[],
-                meta=[],
-                hovertemplate= "%{label}<br>" +
-                               "<extra></extra>",
-            ))
+# The team versions of the pies are drawn with placeholder values, colours
+# and rotations; the seasonPies clientside function fills them in from the
+# team's season totals for the slider's range.
+def gd_pie_base(option):
+    if option == 'empty':
+        return pie_base("Goals For / Against", 148, 3)
 
+    fig = go.Figure()
 
+    fig.add_trace(go.Pie(
+        ids=['Home', 'Away'],
+        labels=['Home', 'Away'],
+        values=[1, 1],
+        marker=dict(colors=['white', 'white'],
+                   line=dict(color='#111111',
+                             width=3,)
+        ),
+        rotation=0,
+        hole=0,
+        textinfo='none',
+        hoverinfo='none',
+        sort=False,
+        customdata=[],
+        meta=[],
+        hovertemplate= "%{label}<br>" +
+                       "<extra></extra>",
+    ))
 
-            fig.add_trace(go.Pie(
-                ids=['Away For', 'Home For', 'Home Against', 'Away Against',],
-                labels=['Away For', 'Home For', 'Home Against', 'Away Against',],
-                values=[100*(AF/(AF+HF+HA+AA)),
-                        100*(HF/(AF+HF+HA+AA)),
-                        100*(HA/(AF+HF+HA+AA)),
-                        100*(AA/(AF+HF+HA+AA)),
-                       ],
-                marker=dict(colors=['#39a757', '#39a757', '#ea4335', '#ea4335',],
-                           line=dict(color='#111111',
-                                     width=3,)
-                ),
-                hole=0.5,
-                textinfo='none',
-                sort=False,
-                customdata=['For', 'For', 'Against', 'Against',],
-                meta=[(100*((AF+HF)/(AF+HF+HA+AA))),
-                      (100*((AF+HF)/(AF+HF+HA+AA))),
-                      (100*((AA+HA)/(AF+HF+HA+AA))),
-                      (100*((AA+HA)/(AF+HF+HA+AA))),],
-                hovertemplate= "%{label} %: %{percent}<br>" +
-                               "Total %{customdata} %: %{meta:.1f}%<br>"
-                                    "<extra></extra>",
-            ))
+    fig.add_trace(go.Pie(
+        ids=['Away For', 'Home For', 'Home Against', 'Away Against',],
+        labels=['Away For', 'Home For', 'Home Against', 'Away Against',],
+        values=[1, 1, 1, 1],
+        marker=dict(colors=['#39a757', '#39a757', '#ea4335', '#ea4335',],
+                   line=dict(color='#111111',
+                             width=3,)
+        ),
+        hole=0.5,
+        textinfo='none',
+        sort=False,
+        customdata=['For', 'For', 'Against', 'Against',],
+        meta=[0, 0, 0, 0],
+        hovertemplate= "%{label} %: %{percent}<br>" +
+                       "Total %{customdata} %: %{meta:.1f}%<br>"
+                            "<extra></extra>",
+    ))
 
-            fig.update_layout(
-                annotations=[
-                    dict(text="Goals For / Against",
-                         font=dict(color='white'),
-                         xref='paper',
-                         yref='paper',
-                         x=0.5,
-                         y=1.25,
-                         showarrow=False,
-                    )
-                ],
-                showlegend=False,
-                template='plotly_dark',
-                margin = dict(t=32, l=0, r=0, b=0),
-                height=148,
-                legend=dict(traceorder='normal'))
+    fig.update_layout(
+        annotations=[
+            dict(text="Goals For / Against",
+                 font=dict(color='white'),
+                 xref='paper',
+                 yref='paper',
+                 x=0.5,
+                 y=1.25,
+                 showarrow=False,
+            )
+        ],
+        showlegend=False,
+        template='plotly_dark',
+        margin = dict(t=32, l=0, r=0, b=0),
+        height=148,
+        legend=dict(traceorder='normal'))
 
     return fig
 
-@app.callback(
-    Output('wdl-pie', 'figure'),
-    [Input('Map', 'clickData'),
-    Input('range-slider-all-pies', 'value')])
-def update_output(chosen_team, years_range):
+def wdl_pie_base(option):
+    if option == 'empty':
+        return pie_base("Win / Draw / Loss", 180, 35)
 
     fig = go.Figure()
 
     fig.add_trace(go.Pie(
-        labels=['A'],
-        values=[1],
-        marker=dict(colors=['#111111'],
-                   line=dict(color='white',
+        ids=['Home', 'Away'],
+        labels=['Home', 'Away'],
+        values=[1,1],
+        marker=dict(colors=['white', 'white'],
+                   line=dict(color='#111111',
                              width=3,)
         ),
-        hole=0.5,
+        rotation=180,
+        hole=0,
         textinfo='none',
         hoverinfo='none',
+        sort=False,
+        customdata=[],
+        meta=[],
+        hovertemplate= "%{label}<br>" +
+                       "<extra></extra>",
+    ))
+
+    fig.add_trace(go.Pie(
+        ids=['Away Win', 'Home Win', 'Home Draw', 'Home Loss', 'Away Loss', 'Away Draw'],
+        labels=['Away Win', 'Home Win', 'Home Draw', 'Home Loss', 'Away Loss', 'Away Draw'],
+        values=[1, 1, 1, 1, 1, 1],
+        marker=dict(colors=['#39a757', '#39a757', 'white', '#ea4335', '#ea4335', 'white'],
+                   line=dict(color='#111111',
+                             width=3,)
+        ),
+        hole=0.5,
+        textinfo='none',
+        sort=False,
+        customdata=['Win', 'Win', 'Draw', 'Loss', 'Loss', 'Draw',],
+        meta=[0, 0, 0, 0, 0, 0],
+        hovertemplate= "%{label} %: %{percent}<br>" +
+                       "Total %{customdata} %: %{meta:.1f}%<br>"
+                            "<extra></extra>",
     ))
 
     fig.update_layout(
@@ -1354,112 +1292,29 @@ def update_output(chosen_team, years_range):
         template='plotly_dark',
         margin = dict(t=35, l=0, r=0, b=35),
         height=180,
-    )
-
-    if chosen_team == None:
-        pass
-    else:
-
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
-
-        df2_team = df2[team][years_range[0]:years_range[1]+1]
-
-        fig = go.Figure()
-
-        HW = df2_team['HW'].sum(skipna=True)
-        HD = df2_team['HD'].sum(skipna=True)
-        HL = df2_team['HL'].sum(skipna=True)
-        AW = df2_team['AW'].sum(skipna=True)
-        AD = df2_team['AD'].sum(skipna=True)
-        AL = df2_team['AL'].sum(skipna=True)
-        Pld = df2_team['Pld'].sum(skipna=True)
-
-
-        fig.add_trace(go.Pie(
-            ids=['Home', 'Away'],
-            labels=['Home', 'Away'],
-            values=[1,1],
-            marker=dict(colors=[df1_all.at[team, 'colour'], df1_all.at[team, 'colour_away']],
-                       line=dict(color='#111111',
-                                 width=3,)
-            ),
-            rotation=180,
-            hole=0,
-            textinfo='none',
-            hoverinfo='none',
-            sort=False,
-            customdata=[],
-            meta=[],
-            hovertemplate= "%{label}<br>" +
-                           "<extra></extra>",
-        ))
-
-        fig.add_trace(go.Pie(
-            ids=['Away Win', 'Home Win', 'Home Draw', 'Home Loss', 'Away Loss', 'Away Draw'],
-            labels=['Away Win', 'Home Win', 'Home Draw', 'Home Loss', 'Away Loss', 'Away Draw'],
-            values=[AW,
-                    HW,
-                    HD,
-                    HL,
-                    AL,
-                    AD],
-            marker=dict(colors=['#39a757', '#39a757', 'white', '#ea4335', '#ea4335', 'white'],
-                       line=dict(color='#111111',
-                                 width=3,)
-            ),
-            hole=0.5,
-            textinfo='none',
-            sort=False,
-            customdata=['Win', 'Win', 'Draw', 'Loss', 'Loss', 'Draw',],
-            meta=[(100*((AW+HW)/Pld)),
-                  (100*((AW+HW)/Pld)),
-                  (100*((AD+HD)/Pld)),
-                  (100*((AL+HL)/Pld)),
-                  (100*((AL+HL)/Pld)),
-                  (100*((AD+HD)/Pld)),],
-            hovertemplate= "%{label} %: %{percent}<br>" +
-                           "Total %{customdata} %: %{meta:.1f}%<br>"
-                                "<extra></extra>",
-        ))
-
-        fig.update_layout(
-            annotations=[
-                dict(text="Win / Draw / Loss",
-                     font=dict(color='white'),
-                     xref='paper',
-                     yref='paper',
-                     x=0.5,
-                     y=1.25,
-                     showarrow=False,
-                )
-            ],
-            showlegend=False,
-            template='plotly_dark',
-            margin = dict(t=35, l=0, r=0, b=35),
-            height=180,
-            legend=dict(traceorder='normal'))
+        legend=dict(traceorder='normal'))
 
     return fig
 
+def pts_pie_base(option):
+    if option == 'empty':
+        return pie_base("Points", 180, 35)
 
-@app.callback(
-    Output('pts-pie', 'figure'),
-    [Input('Map', 'clickData'),
-    Input('range-slider-all-pies', 'value')])
-def update_output(chosen_team, years_range):
     fig = go.Figure()
 
     fig.add_trace(go.Pie(
-        labels=['A'],
-        values=[1],
-        marker=dict(colors=['#111111'],
-                   line=dict(color='white',
+        ids=['Home', 'Away'],
+        labels=['Home', 'Away'],
+        values=[1, 1],
+        marker=dict(colors=['white', 'white'],
+                   line=dict(color='#111111',
                              width=3,)
         ),
+        rotation=0,
         hole=0.5,
         textinfo='none',
-        hoverinfo='none',
+        hovertemplate= "%{label} Pts: %{percent}<br>" +
+                            "<extra></extra>",
     ))
 
     fig.update_layout(
@@ -1472,90 +1327,61 @@ def update_output(chosen_team, years_range):
                  y=1.25,
                  showarrow=False,
             ),
+            dict(text="Home",
+                 font=dict(color='white'),
+                 xref='paper',
+                 yref='paper',
+                 x=0.05,
+                 y=0,
+                 showarrow=False,
+            ),
+            dict(text="Away",
+                 font=dict(color='white'),
+                 xref='paper',
+                 yref='paper',
+                 x=0.95,
+                 y=0,
+                 showarrow=False,
+            )
         ],
         showlegend=False,
         template='plotly_dark',
         margin = dict(t=35, l=0, r=0, b=35),
-        height=180,
-    )
-
-    if chosen_team == None:
-        pass
-
-    else:
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
-
-        df2_team = df2[team][years_range[0]:years_range[1]+1]
-
-
-        HPts = df2_team['HPts'].sum(skipna=True)
-        APts = df2_team['APts'].sum(skipna=True)
-
-        if HPts == 0 or APts == 0:
-            pass
-        else:
+        height=180,)
 
-            fig = go.Figure()
+    return fig
 
-            fig.add_trace(go.Pie(
-                ids=['Home', 'Away'],
-                labels=['Home', 'Away'],
-                values=[HPts, APts],
-                marker=dict(colors=[df1_all.at[team, 'colour'], df1_all.at[team, 'colour_away']],
-                           line=dict(color='#111111',
-                                     width=3,)
-                ),
-                rotation=APts/(HPts+APts)*360,
-                hole=0.5,
-                textinfo='none',
-                hovertemplate= "%{label} Pts: %{percent}<br>" +
-                                    "<extra></extra>",
-            ))
+for option in ['empty', 'team']:
+    figure_templates.add(('gd-pie', option), gd_pie_base(option))
+    figure_templates.add(('wdl-pie', option), wdl_pie_base(option))
+    figure_templates.add(('pts-pie', option), pts_pie_base(option))
 
-            fig.update_layout(
-                annotations=[
-                    dict(text="Points",
-                         font=dict(color='white'),
-                         xref='paper',
-                         yref='paper',
-                         x=0.5,
-                         y=1.25,
-                         showarrow=False,
-                    ),
-                    dict(text="Home",
-                         font=dict(color=df1_all.at[team, 'colour']),
-                         xref='paper',
-                         yref='paper',
-                         x=0.05,
-                         y=0,
-                         showarrow=False,
-                    ),
-                    dict(text="Away",
-                         font=dict(color=df1_all.at[team, 'colour_away']),
-                         xref='paper',
-                         yref='paper',
-                         x=0.95,
-                         y=0,
-                         showarrow=False,
-                    )
-                ],
-                showlegend=False,
-                template='plotly_dark',
-                margin = dict(t=35, l=0, r=0, b=35),
-                height=180,)
+# The season totals (all counts) the pies are drawn from, per team: row s
+# of each column is the total over the seasons before s, so any range is a
+# subtraction.
+PIE_COLUMNS = ['Pld', 'HW', 'HD', 'HL', 'HF', 'HA', 'AW', 'AD', 'AL', 'AF', 'AA', 'HPts', 'APts']
 
-    return fig
+def team_seasons(team):
+    sums = df2.prefix_sums()[df2.team_ids[team]]
+    return dict(team=team, totals=dict(
+        (column, sums[:, STAT_COLUMNS.index(column)].astype(np.int64)) for column in PIE_COLUMNS))
 
+app.clientside_callback(
+    ClientsideFunction(namespace='football', function_name='seasonPies'),
+    [Output('range-dates', 'children'),
+     Output('gd-pie', 'figure'),
+     Output('wdl-pie', 'figure'),
+     Output('pts-pie', 'figure')],
+    [Input('team-seasons', 'data'),
+     Input('range-slider-all-pies', 'value')],
+    [State('figure-templates', 'data'),
+     State('team-store', 'data'),
+     State('season-labels', 'data')])
 
 
 
-@app.callback(
-    Output('team-GD', 'figure'),
-    [Input('GD-graph-dropdown', 'value'),
-    Input('Map', 'clickData')])
-def team_GD_generator(graph_option, chosen_team):
 
+def team_GD_base(graph_option):
     if graph_option == 'All':
         fig = go.Figure()
 
@@ -1643,81 +1469,183 @@ def team_GD_generator(graph_option, chosen_team):
                   height=210,
                   )
 
-        if chosen_team == None:
-            pass
-
-        else:
-            team = chosen_team['points'][0]['text']
-            team = (team.encode('utf-8')).encode('ascii', 'ignore')
-            df2_team = df2[team]
+    elif graph_option == 'Home':
+        fig = go.Figure()
 
-            if df2_team['GD'].sum(skipna=True) == 0:
-                pass
-            else:
+        dff2 = df2['Master']
 
-                best_gd = int(df2_team['GD'].max())
-                worst_gd = int(df2_team['GD'].min())
+        fig.add_trace(go.Bar(
+            name='for',
+            x = dff2['Season'],
+            y = dff2['Zeros'],
+            marker=dict(
+                color='#111111',
+                colorbar=dict(
+                    thickness=15,
+                    showticklabels=False,
+                    title=dict(text='Goal Difference',
+                            side='right',)
+                            ),
+                colorscale=[[0, '#ea4335'], [0.5, '#f0f0f0'],  [1, '#39a757']],
+            ),
+            hoverinfo='none'
+        ))
+        fig.add_trace(go.Bar(
+            name='against',
+            x = dff2['Season'],
+            y = dff2['Zeros'],
+            marker=dict(
+                color='#111111',
+                colorbar=dict(
+                    thickness=15,
+                    showticklabels=False,
+                    title=dict(text='Goal Difference',
+                            side='right',)
+                            ),
+                colorscale=[[0, '#ea4335'], [0.5, '#f0f0f0'],  [1, '#39a757']],
+            ),
+            hoverinfo='none'
+        ))
 
-                color_list = []
+        fig.add_annotation(
+                                        name='for',
+                                        text = 'For',
+                                        textangle = 270,
+                                        x = 0,
+                                        y = 80,
+                                        xshift = -35,
+                                        font = dict(size=12),
+                                        showarrow = False,
+                                        valign = 'middle',
+        )
 
-                if best_gd >= worst_gd:
-                    largest_mag_gd = abs(best_gd)
-                else:
-                    largest_mag_gd = abs(worst_gd)
+        fig.add_annotation(go.layout.Annotation(
+                                        name='against',
+                                        text = 'Against',
+                                        textangle = 270,
+                                        x = 0,
+                                        y = -100,
+                                        xshift = -35,
+                                        font = dict(size=12),
+                                        showarrow = False,
+                                        valign = 'middle',
+        ))
+        fig.update_layout(template = 'plotly_dark',
+                  barmode='relative',
+                  bargap = 0,
+                  xaxis = dict(range = (-0.5, 130.5),
+                               showgrid=False,
+                               tickangle=0,
+                               tickmode = 'array',
+                               tickvals = [0, 32, 65, 97, 130],
+                               fixedrange=True,),
+                  yaxis = dict(range = (-135, 135),
+                               zeroline=False,
+                               showgrid=False,
+                               tickmode='array',
+                               tickvals=[-100, -50, 0, 50, 100],
+                               ticktext=[100, 50, 0, 50, 100],
+                               title=dict(text='Goals', standoff=10),
+                               fixedrange=True,),
+                  xaxis_title = 'Season',
+                  showlegend = False,
+                  margin=dict(
+                      l=0,
+                      r=0,
+                      t=0,
+                      b=0,
+                  ),
+                  height=210,
+                  )
 
-                for i in range((largest_mag_gd)*(-1), (largest_mag_gd+1)):
-                    color_list.append(i)
+    elif graph_option == 'Away':
+        fig = go.Figure()
 
-                fig.update_traces(
-                    selector=dict(name='against'),
-                    x = df2_team['Season'],
-                    y = -(df2_team['GA']),
-                    marker=dict(
-                        cmin=largest_mag_gd*(-1),
-                        cmax=largest_mag_gd,
-                        color=df2_team['GD'],
-                        colorbar=dict(
-                            thickness=15,
-                            showticklabels=False,
-                            title=dict(text='Goal Difference',
-                                    side='right',)
-                                    ),
-                        colorscale=[[0, '#ea4335'], [0.5, '#f0f0f0'],  [1, '#39a757']],
-                        ),
-                    meta=df2_team['GA'],
-                    customdata=df2_team['GD'],
-                    hovertemplate="Season: %{x}<br>" +
-                            "Goals Against: %{meta}<br>" +
-                            "Goal Difference: %{customdata}<br>" +
-                            "<extra></extra>",
-                )
+        dff2 = df2['Master']
 
-                fig.update_traces(
-                    selector=dict(name='for'),
-                    x = df2_team['Season'],
-                    y = df2_team['GF'],
-                    marker=dict(
-                        cmin=largest_mag_gd*(-1),
-                        cmax=largest_mag_gd,
-                        color=(df2_team['GD']),
-                        colorbar=dict(
-                            thickness=15,
-                            showticklabels=False,
-                            title=dict(text='Goal Difference',
-                                    side='right',)
-                        ),
-                        colorscale=[[0, '#ea4335'], [0.5, '#f0f0f0'],  [1, '#39a757']],
-                        ),
-                        customdata=df2_team['GD'],
-                        hovertemplate="Season: %{x}<br>" +
-                          "Goals For: %{y}<br>" +
-                          "Goal Difference: %{customdata}<br>" +
-                          "<extra></extra>",
-                )
+        fig.add_trace(go.Bar(
+            name='for',
+            x = dff2['Season'],
+            y = dff2['Zeros'],
+            marker=dict(
+                color='#111111',
+                colorbar=dict(
+                    thickness=15,
+                    showticklabels=False,
+                    title=dict(text='Goal Difference',
+                            side='right',)
+                            ),
+                colorscale=[[0, '#ea4335'], [0.5, '#f0f0f0'],  [1, '#39a757']],
+            ),
+            hoverinfo='none'
+        ))
+        fig.add_trace(go.Bar(
+            name='against',
+            x = dff2['Season'],
+            y = dff2['Zeros'],
+            marker=dict(
+                color='#111111',
+                colorbar=dict(
+                    thickness=15,
+                    showticklabels=False,
+                    title=dict(text='Goal Difference',
+                            side='right',)
+                            ),
+                colorscale=[[0, '#ea4335'], [0.5, '#f0f0f0'],  [1, '#39a757']],
+            ),
+            hoverinfo='none'
+        ))
 
-        return fig
+        fig.add_annotation(go.layout.Annotation(
+                                        text = 'For',
+                                        textangle = 270,
+                                        x = 0,
+                                        y = 80,
+                                        xshift = -35,
+                                        font = dict(size=12),
+                                        showarrow = False,
+                                        valign = 'middle',
+        ))
 
-    elif graph_option == 'Home':
+        fig.add_annotation(go.layout.Annotation(
+                                        text = 'Against',
+                                        textangle = 270,
+                                        x = 0,
+                                        y = -100,
+                                        xshift = -35,
+                                        font = dict(size=12),
+                                        showarrow = False,
+                                        valign = 'middle',
+        ))
+        fig.update_layout(template = 'plotly_dark',
+                  barmode='relative',
+                  bargap = 0,
+                  xaxis = dict(range = (-0.5, 130.5),
+                               showgrid=False,
+                               tickangle=0,
+                               tickmode = 'array',
+                               tickvals = [0, 32, 65, 97, 130],
+                               fixedrange=True,),
+                  yaxis = dict(range = (-135, 135),
+                               zeroline=False,
+                               showgrid=False,
+                               tickmode='array',
+                               tickvals=[-100, -50, 0, 50, 100],
+                               ticktext=[100, 50, 0, 50, 100],
+                               title=dict(text='Goals', standoff=10),
+                               fixedrange=True,),
+                  xaxis_title = 'Season',
+                  showlegend = False,
+                  margin=dict(
+                      l=0,
+                      r=0,
+                      t=0,
+                      b=0,
+                  ),
+                  height=210,
+                  )
+
+    elif graph_option == 'Home & Away':
         fig = go.Figure()
 
         dff2 = df2['Master']
@@ -1755,8 +1683,7 @@ def team_GD_generator(graph_option, chosen_team):
             hoverinfo='none'
         ))
 
-        fig.add_annotation(
-                                        name='for',
+        fig.add_annotation(go.layout.Annotation(
                                         text = 'For',
                                         textangle = 270,
                                         x = 0,
@@ -1765,10 +1692,9 @@ def team_GD_generator(graph_option, chosen_team):
                                         font = dict(size=12),
                                         showarrow = False,
                                         valign = 'middle',
-        )
+        ))
 
         fig.add_annotation(go.layout.Annotation(
-                                        name='against',
                                         text = 'Against',
                                         textangle = 270,
                                         x = 0,
@@ -1806,12 +1732,97 @@ def team_GD_generator(graph_option, chosen_team):
                   height=210,
                   )
 
+    return fig
+
+for option in ['All', 'Home', 'Away', 'Home & Away']:
+    figure_templates.add(('team-GD', option), team_GD_base(option))
+
+def team_GD_figure(graph_option, chosen_team):
+
+    if graph_option == 'All':
+        fig = figure_templates.get(('team-GD', graph_option))
+
+        if chosen_team == None:
+            pass
+
+        else:
+            team = _team_from_click(chosen_team)
+            df2_team = df2[team]
+
+            if df2_team['GD'].sum(skipna=True) == 0:
+                pass
+            else:
+
+                best_gd = int(df2_team['GD'].max())
+                worst_gd = int(df2_team['GD'].min())
+
+                color_list = []
+
+                if best_gd >= worst_gd:
+                    largest_mag_gd = abs(best_gd)
+                else:
+                    largest_mag_gd = abs(worst_gd)
+
+                for i in range((largest_mag_gd)*(-1), (largest_mag_gd+1)):
+                    color_list.append(i)
+
+                fig.update_traces(
+                    selector=dict(name='against'),
+                    x = df2_team['Season'],
+                    y = -(df2_team['GA']),
+                    marker=dict(
+                        cmin=largest_mag_gd*(-1),
+                        cmax=largest_mag_gd,
+                        color=df2_team['GD'],
+                        colorbar=dict(
+                            thickness=15,
+                            showticklabels=False,
+                            title=dict(text='Goal Difference',
+                                    side='right',)
+                                    ),
+                        colorscale=[[0, '#ea4335'], [0.5, '#f0f0f0'],  [1, '#39a757']],
+                        ),
+                    meta=df2_team['GA'],
+                    customdata=df2_team['GD'],
+                    hovertemplate="Season: %{x}<br>" +
+                            "Goals Against: %{meta}<br>" +
+                            "Goal Difference: %{customdata}<br>" +
+                            "<extra></extra>",
+                )
+
+                fig.update_traces(
+                    selector=dict(name='for'),
+                    x = df2_team['Season'],
+                    y = df2_team['GF'],
+                    marker=dict(
+                        cmin=largest_mag_gd*(-1),
+                        cmax=largest_mag_gd,
+                        color=(df2_team['GD']),
+                        colorbar=dict(
+                            thickness=15,
+                            showticklabels=False,
+                            title=dict(text='Goal Difference',
+                                    side='right',)
+                        ),
+                        colorscale=[[0, '#ea4335'], [0.5, '#f0f0f0'],  [1, '#39a757']],
+                        ),
+                        customdata=df2_team['GD'],
+                        hovertemplate="Season: %{x}<br>" +
+                          "Goals For: %{y}<br>" +
+                          "Goal Difference: %{customdata}<br>" +
+                          "<extra></extra>",
+                )
+
+        return fig
+
+    elif graph_option == 'Home':
+        fig = figure_templates.get(('team-GD', graph_option))
+
         if chosen_team == None:
             pass
 
         else:
-            team = chosen_team['points'][0]['text']
-            team = (team.encode('utf-8')).encode('ascii', 'ignore')
+            team = _team_from_click(chosen_team)
             df2_team = df2[team]
 
             best_gd = int(df2_team['HGD'].max())
@@ -1889,121 +1900,36 @@ def team_GD_generator(graph_option, chosen_team):
                     y = -52,
                     xshift = -35,
                     font = dict(size=12),
-                    showarrow = False,
-                    valign = 'middle',
-            ))
-            fig.update_layout(
-                xaxis = dict(range = (-0.5, 130.5),
-                             showgrid=False,
-                             tickangle=0,
-                             tickmode = 'array',
-                             tickvals = [0, 32, 65, 97, 130],
-                             fixedrange=True,),
-                yaxis = dict(range = (-75, 75),
-                             zeroline=False,
-                             showgrid=False,
-                             tickmode='array',
-                             tickvals=[-60, -30, 0, 30, 60],
-                             ticktext=[60, 30, 0, 30, 60],
-                             title=dict(text='Goals', standoff=16),
-                             fixedrange=True,),
-            )
-
-        return fig
-
-    elif graph_option == 'Away':
-        fig = go.Figure()
-
-        dff2 = df2['Master']
-
-        fig.add_trace(go.Bar(
-            name='for',
-            x = dff2['Season'],
-            y = dff2['Zeros'],
-            marker=dict(
-                color='#111111',
-                colorbar=dict(
-                    thickness=15,
-                    showticklabels=False,
-                    title=dict(text='Goal Difference',
-                            side='right',)
-                            ),
-                colorscale=[[0, '#ea4335'], [0.5, '#f0f0f0'],  [1, '#39a757']],
-            ),
-            hoverinfo='none'
-        ))
-        fig.add_trace(go.Bar(
-            name='against',
-            x = dff2['Season'],
-            y = dff2['Zeros'],
-            marker=dict(
-                color='#111111',
-                colorbar=dict(
-                    thickness=15,
-                    showticklabels=False,
-                    title=dict(text='Goal Difference',
-                            side='right',)
-                            ),
-                colorscale=[[0, '#ea4335'], [0.5, '#f0f0f0'],  [1, '#39a757']],
-            ),
-            hoverinfo='none'
-        ))
+                    showarrow = False,
+                    valign = 'middle',
+            ))
+            fig.update_layout(
+                xaxis = dict(range = (-0.5, 130.5),
+                             showgrid=False,
+                             tickangle=0,
+                             tickmode = 'array',
+                             tickvals = [0, 32, 65, 97, 130],
+                             fixedrange=True,),
+                yaxis = dict(range = (-75, 75),
+                             zeroline=False,
+                             showgrid=False,
+                             tickmode='array',
+                             tickvals=[-60, -30, 0, 30, 60],
+                             ticktext=[60, 30, 0, 30, 60],
+                             title=dict(text='Goals', standoff=16),
+                             fixedrange=True,),
+            )
 
-        fig.add_annotation(go.layout.Annotation(
-                                        text = 'For',
-                                        textangle = 270,
-                                        x = 0,
-                                        y = 80,
-                                        xshift = -35,
-                                        font = dict(size=12),
-                                        showarrow = False,
-                                        valign = 'middle',
-        ))
+        return fig
 
-        fig.add_annotation(go.layout.Annotation(
-                                        text = 'Against',
-                                        textangle = 270,
-                                        x = 0,
-                                        y = -100,
-                                        xshift = -35,
-                                        font = dict(size=12),
-                                        showarrow = False,
-                                        valign = 'middle',
-        ))
-        fig.update_layout(template = 'plotly_dark',
-                  barmode='relative',
-                  bargap = 0,
-                  xaxis = dict(range = (-0.5, 130.5),
-                               showgrid=False,
-                               tickangle=0,
-                               tickmode = 'array',
-                               tickvals = [0, 32, 65, 97, 130],
-                               fixedrange=True,),
-                  yaxis = dict(range = (-135, 135),
-                               zeroline=False,
-                               showgrid=False,
-                               tickmode='array',
-                               tickvals=[-100, -50, 0, 50, 100],
-                               ticktext=[100, 50, 0, 50, 100],
-                               title=dict(text='Goals', standoff=10),
-                               fixedrange=True,),
-                  xaxis_title = 'Season',
-                  showlegend = False,
-                  margin=dict(
-                      l=0,
-                      r=0,
-                      t=0,
-                      b=0,
-                  ),
-                  height=210,
-                  )
+    elif graph_option == 'Away':
+        fig = figure_templates.get(('team-GD', graph_option))
 
         if chosen_team == None:
             pass
 
         else:
-            team = chosen_team['points'][0]['text']
-            team = (team.encode('utf-8')).encode('ascii', 'ignore')
+            team = _team_from_click(chosen_team)
             df2_team = df2[team]
 
             best_gd = int(df2_team['AGD'].max())
@@ -2105,98 +2031,13 @@ def team_GD_generator(graph_option, chosen_team):
         return fig
 
     elif graph_option == 'Home & Away':
-        fig = go.Figure()
-
-        dff2 = df2['Master']
-
-        fig.add_trace(go.Bar(
-            name='for',
-            x = dff2['Season'],
-            y = dff2['Zeros'],
-            marker=dict(
-                color='#111111',
-                colorbar=dict(
-                    thickness=15,
-                    showticklabels=False,
-                    title=dict(text='Goal Difference',
-                            side='right',)
-                            ),
-                colorscale=[[0, '#ea4335'], [0.5, '#f0f0f0'],  [1, '#39a757']],
-            ),
-            hoverinfo='none'
-        ))
-        fig.add_trace(go.Bar(
-            name='against',
-            x = dff2['Season'],
-            y = dff2['Zeros'],
-            marker=dict(
-                color='#111111',
-                colorbar=dict(
-                    thickness=15,
-                    showticklabels=False,
-                    title=dict(text='Goal Difference',
-                            side='right',)
-                            ),
-                colorscale=[[0, '#ea4335'], [0.5, '#f0f0f0'],  [1, '#39a757']],
-            ),
-            hoverinfo='none'
-        ))
-
-        fig.add_annotation(go.layout.Annotation(
-                                        text = 'For',
-                                        textangle = 270,
-                                        x = 0,
-                                        y = 80,
-                                        xshift = -35,
-                                        font = dict(size=12),
-                                        showarrow = False,
-                                        valign = 'middle',
-        ))
-
-        fig.add_annotation(go.layout.Annotation(
-                                        text = 'Against',
-                                        textangle = 270,
-                                        x = 0,
-                                        y = -100,
-                                        xshift = -35,
-                                        font = dict(size=12),
-                                        showarrow = False,
-                                        valign = 'middle',
-        ))
-        fig.update_layout(template = 'plotly_dark',
-                  barmode='relative',
-                  bargap = 0,
-                  xaxis = dict(range = (-0.5, 130.5),
-                               showgrid=False,
-                               tickangle=0,
-                               tickmode = 'array',
-                               tickvals = [0, 32, 65, 97, 130],
-                               fixedrange=True,),
-                  yaxis = dict(range = (-135, 135),
-                               zeroline=False,
-                               showgrid=False,
-                               tickmode='array',
-                               tickvals=[-100, -50, 0, 50, 100],
-                               ticktext=[100, 50, 0, 50, 100],
-                               title=dict(text='Goals', standoff=10),
-                               fixedrange=True,),
-                  xaxis_title = 'Season',
-                  showlegend = False,
-                  margin=dict(
-                      l=0,
-                      r=0,
-                      t=0,
-                      b=0,
-                  ),
-                  height=210,
-                  )
+        fig = figure_templates.get(('team-GD', graph_option))
 
         if chosen_team == None:
             pass
 
         else:
-            team = chosen_team['points'][0]['text']
-            team = (team.encode('utf-8')).encode('ascii', 'ignore')
+            team = _team_from_click(chosen_team)
             df2_team = df2[team]
 
             fig = go.Figure()
@@ -2437,14 +2278,133 @@ def team_GD_generator(graph_option, chosen_team):
         return fig
 
 
-@app.callback(
-    Output('team-WDL', 'figure'),
-    [Input('WDL-graph-dropdown', 'value'),
-     Input('Map', 'clickData')])
-def update_output(graph_option, chosen_team):
+def team_WDL_base(graph_option):
+    if graph_option == 'All':
+        dff2 = df2['Master']
+
+        fig = go.Figure()
+
+        fig.add_trace(go.Bar(
+                     name='placeholder',
+                     visible=True,
+                     hoverinfo='none',
+                     x = dff2['Season'],
+                     y = dff2['Zeros'],
+                     marker = dict(
+                         color = '#111111',
+        )))
+        fig.add_trace(go.Bar(
+                     name='losses',
+                     visible=False,
+                     x = dff2['Season'],
+                     y = dff2['Zeros'],
+                     marker = dict(
+                         color = '#111111',
+        )))
+        fig.add_trace(go.Bar(
+                     name='draws',
+                     visible=False,
+                     x = dff2['Season'],
+                     y = dff2['Zeros'],
+                     marker = dict(
+                        color = 'white',
+        )))
+        fig.add_trace(go.Bar(
+                     name='wins',
+                     visible=False,
+                     x = dff2['Season'],
+                     y = dff2['Zeros'],
+                     marker = dict(
+                         color = '#56b36f',
+        )))
+
+        fig.add_shape(go.layout.Shape(
+                                  type = 'circle',
+                                  layer = 'above',
+                                  x0 = 0, x1 = 8, y0 = 0, y1 = 8,
+                                  xref='paper',
+                                  yref='paper',
+                                  xsizemode='pixel',
+                                  ysizemode='pixel',
+                                  xanchor='1.05',
+                                  yanchor='0.86',
+                                  line = dict(color = '#56b36f'),
+                                  fillcolor = '#56b36f'
+                                  ))
+        fig.add_shape(go.layout.Shape(
+                                  type = 'circle',
+                                  layer = 'above',
+                                  x0 = 0, x1 = 8, y0 = 0, y1 = 8,
+                                  xref='paper',
+                                  yref='paper',
+                                  xsizemode='pixel',
+                                  ysizemode='pixel',
+                                  xanchor='1.05',
+                                  yanchor='0.64',
+                                  line = dict(color = 'white'),
+                                  fillcolor = 'white'
+                                  ))
+        fig.add_shape(go.layout.Shape(
+                                  type = 'circle',
+                                  layer = 'above',
+                                  x0 = 0, x1 = 8, y0 = 0, y1 = 8,
+                                  xref='paper',
+                                  yref='paper',
+                                  xsizemode='pixel',
+                                  ysizemode='pixel',
+                                  xanchor='1.05',
+                                  yanchor='0.41',
+                                  line = dict(color = '#eb5a4e'),
+                                  fillcolor = '#eb5a4e'
+                                  ))
+        fig.add_annotation(go.layout.Annotation(
+                                            text = 'Win',
+                                            xref='paper',
+                                            yref='paper',
+                                            x = 1.11,
+                                            y = 0.86,
+                                            showarrow = False,
+                                            valign = 'middle',))
+        fig.add_annotation(go.layout.Annotation(
+                                            text = 'Draw',
+                                            xref='paper',
+                                            yref='paper',
+                                            x = 1.115,
+                                            y = 0.59,
+                                            showarrow = False,
+                                            valign = 'middle',))
+        fig.add_annotation(go.layout.Annotation(
+                                            text = 'Loss',
+                                            xref='paper',
+                                            yref='paper',
+                                            x = 1.11,
+                                            y = 0.37,
+                                            showarrow = False,
+                                            valign = 'middle',))
 
-    if graph_option == 'All':
+        fig.update_layout(template = 'plotly_dark',
+                  barmode='stack',
+                  bargap = 0,
+                  xaxis = dict(range = (-0.5, 130.5),
+                      zeroline=False,
+                      showgrid=False,
+                      tickmode = 'array',
+                      tickvals = [0, 32, 65, 97, 130],),
+                  yaxis = dict(range = (-5, 110),
+                      zeroline=False,
+                      showgrid=False,
+                      title=dict(text='Games (%)', standoff=10),
+                      fixedrange=True,),
+                  showlegend = False,
+                  margin=dict(
+                      l=0,
+                      r=61,
+                      t=0,
+                      b=0,
+                  ),
+                  height=180,)
 
+    elif graph_option == 'Home':
         dff2 = df2['Master']
 
         fig = go.Figure()
@@ -2558,8 +2518,7 @@ def update_output(graph_option, chosen_team):
                   yaxis = dict(range = (-5, 110),
                       zeroline=False,
                       showgrid=False,
-                      title=dict(text='Games (%)', standoff=10),
-                      fixedrange=True,),
+                      title=dict(text='Games (%)', standoff=10)),
                   showlegend = False,
                   margin=dict(
                       l=0,
@@ -2569,56 +2528,7 @@ def update_output(graph_option, chosen_team):
                   ),
                   height=180,)
 
-        if chosen_team == None:
-            pass
-        else:
-            team = chosen_team['points'][0]['text']
-            team = (team.encode('utf-8')).encode('ascii', 'ignore')
-            df2_team = df2[team]
-
-            fig.update_traces(
-                         selector=dict(name='placeholder'),
-                         visible=False,
-            ),
-            fig.update_traces(
-                         selector=dict(name='losses'),
-                         visible=True,
-                         x = df2_team['Season'],
-                         y = 100 * (df2_team['L']/df2_team['Pld']),
-                         marker = dict(
-                             color = '#eb5a4e',),
-                         hovertemplate="Season: %{x}<br>" +
-                              "Loss %: %{y:.0f}<br>" +
-                              "<extra></extra>",
-            )
-            fig.update_traces(
-                         selector=dict(name='draws'),
-                         visible=True,
-                         x = df2_team['Season'],
-                         y = 100 * (df2_team['D']/df2_team['Pld']),
-                         marker = dict(
-                            color = '#f0f0f0',),
-                        hovertemplate="Season: %{x}<br>" +
-                             "Draw %: %{y:.0f}<br>" +
-                             "<extra></extra>",
-
-            )
-            fig.update_traces(
-                         selector=dict(name='wins'),
-                         visible=True,
-                         x = df2_team['Season'],
-                         y = 100 * (df2_team['W']/df2_team['Pld']),
-                         marker = dict(
-                             color = '#56b36f',),
-                        hovertemplate="Season: %{x}<br>" +
-                             "Win %: %{y:.0f}<br>" +
-                             "<extra></extra>",
-            )
-
-
-        return fig
-
-    elif graph_option == 'Home':
+    elif graph_option == 'Away':
         dff2 = df2['Master']
 
         fig = go.Figure()
@@ -2742,56 +2652,7 @@ def update_output(graph_option, chosen_team):
                   ),
                   height=180,)
 
-        if chosen_team == None:
-            pass
-        else:
-            team = chosen_team['points'][0]['text']
-            team = (team.encode('utf-8')).encode('ascii', 'ignore')
-            df2_team = df2[team]
-
-            fig.update_traces(
-                         selector=dict(name='placeholder'),
-                         visible=False,
-            ),
-            fig.update_traces(
-                         selector=dict(name='losses'),
-                         visible=True,
-                         x = df2_team['Season'],
-                         y = 100 * (df2_team['HL']/(df2_team['Pld']/2)),
-                         marker = dict(
-                             color = '#eb5a4e',),
-                         hovertemplate="Season: %{x}<br>" +
-                              "Home Loss %: %{y:.0f}<br>" +
-                              "<extra></extra>",
-            )
-            fig.update_traces(
-                         selector=dict(name='draws'),
-                         visible=True,
-                         x = df2_team['Season'],
-                         y = 100 * (df2_team['HD']/(df2_team['Pld']/2)),
-                         marker = dict(
-                            color = '#f0f0f0',),
-                        hovertemplate="Season: %{x}<br>" +
-                             "Home Draw %: %{y:.0f}<br>" +
-                             "<extra></extra>",
-
-            )
-            fig.update_traces(
-                         selector=dict(name='wins'),
-                         visible=True,
-                         x = df2_team['Season'],
-                         y = 100 * (df2_team['HW']/(df2_team['Pld']/2)),
-                         marker = dict(
-                             color = '#56b36f',),
-                        hovertemplate="Season: %{x}<br>" +
-                             "Home Win %: %{y:.0f}<br>" +
-                             "<extra></extra>",
-            )
-
-
-        return fig
-
-    elif graph_option == 'Away':
+    elif graph_option == 'Home & Away':
         dff2 = df2['Master']
 
         fig = go.Figure()
@@ -2915,11 +2776,21 @@ def update_output(graph_option, chosen_team):
                   ),
                   height=180,)
 
+    return fig
+
+for option in ['All', 'Home', 'Away', 'Home & Away']:
+    figure_templates.add(('team-WDL', option), team_WDL_base(option))
+
+def team_WDL_figure(graph_option, chosen_team):
+
+    if graph_option == 'All':
+
+        fig = figure_templates.get(('team-WDL', graph_option))
+
         if chosen_team == None:
             pass
         else:
-            team = chosen_team['points'][0]['text']
-            team = (team.encode('utf-8')).encode('ascii', 'ignore')
+            team = _team_from_click(chosen_team)
             df2_team = df2[team]
 
             fig.update_traces(
@@ -2930,22 +2801,22 @@ def update_output(graph_option, chosen_team):
                          selector=dict(name='losses'),
                          visible=True,
                          x = df2_team['Season'],
-                         y = 100 * (df2_team['AL']/(df2_team['Pld']/2)),
+                         y = 100 * (df2_team['L']/df2_team['Pld']),
                          marker = dict(
                              color = '#eb5a4e',),
                          hovertemplate="Season: %{x}<br>" +
-                              "Away Loss %: %{y:.0f}<br>" +
+                              "Loss %: %{y:.0f}<br>" +
                               "<extra></extra>",
             )
             fig.update_traces(
                          selector=dict(name='draws'),
                          visible=True,
                          x = df2_team['Season'],
-                         y = 100 * (df2_team['AD']/(df2_team['Pld']/2)),
+                         y = 100 * (df2_team['D']/df2_team['Pld']),
                          marker = dict(
                             color = '#f0f0f0',),
                         hovertemplate="Season: %{x}<br>" +
-                             "Away Draw %: %{y:.0f}<br>" +
+                             "Draw %: %{y:.0f}<br>" +
                              "<extra></extra>",
 
             )
@@ -2953,146 +2824,126 @@ def update_output(graph_option, chosen_team):
                          selector=dict(name='wins'),
                          visible=True,
                          x = df2_team['Season'],
-                         y = 100 * (df2_team['AW']/(df2_team['Pld']/2)),
+                         y = 100 * (df2_team['W']/df2_team['Pld']),
                          marker = dict(
                              color = '#56b36f',),
                         hovertemplate="Season: %{x}<br>" +
-                             "Away Win %: %{y:.0f}<br>" +
+                             "Win %: %{y:.0f}<br>" +
                              "<extra></extra>",
             )
 
 
         return fig
 
-    elif graph_option == 'Home & Away':
-        dff2 = df2['Master']
+    elif graph_option == 'Home':
+        fig = figure_templates.get(('team-WDL', graph_option))
 
-        fig = go.Figure()
+        if chosen_team == None:
+            pass
+        else:
+            team = _team_from_click(chosen_team)
+            df2_team = df2[team]
 
-        fig.add_trace(go.Bar(
-                     name='placeholder',
-                     visible=True,
-                     hoverinfo='none',
-                     x = dff2['Season'],
-                     y = dff2['Zeros'],
-                     marker = dict(
-                         color = '#111111',
-        )))
-        fig.add_trace(go.Bar(
-                     name='losses',
-                     visible=False,
-                     x = dff2['Season'],
-                     y = dff2['Zeros'],
-                     marker = dict(
-                         color = '#111111',
-        )))
-        fig.add_trace(go.Bar(
-                     name='draws',
-                     visible=False,
-                     x = dff2['Season'],
-                     y = dff2['Zeros'],
-                     marker = dict(
-                        color = 'white',
-        )))
-        fig.add_trace(go.Bar(
-                     name='wins',
-                     visible=False,
-                     x = dff2['Season'],
-                     y = dff2['Zeros'],
-                     marker = dict(
-                         color = '#56b36f',
-        )))
+            fig.update_traces(
+                         selector=dict(name='placeholder'),
+                         visible=False,
+            ),
+            fig.update_traces(
+                         selector=dict(name='losses'),
+                         visible=True,
+                         x = df2_team['Season'],
+                         y = 100 * (df2_team['HL']/(df2_team['Pld']/2)),
+                         marker = dict(
+                             color = '#eb5a4e',),
+                         hovertemplate="Season: %{x}<br>" +
+                              "Home Loss %: %{y:.0f}<br>" +
+                              "<extra></extra>",
+            )
+            fig.update_traces(
+                         selector=dict(name='draws'),
+                         visible=True,
+                         x = df2_team['Season'],
+                         y = 100 * (df2_team['HD']/(df2_team['Pld']/2)),
+                         marker = dict(
+                            color = '#f0f0f0',),
+                        hovertemplate="Season: %{x}<br>" +
+                             "Home Draw %: %{y:.0f}<br>" +
+                             "<extra></extra>",
+
+            )
+            fig.update_traces(
+                         selector=dict(name='wins'),
+                         visible=True,
+                         x = df2_team['Season'],
+                         y = 100 * (df2_team['HW']/(df2_team['Pld']/2)),
+                         marker = dict(
+                             color = '#56b36f',),
+                        hovertemplate="Season: %{x}<br>" +
+                             "Home Win %: %{y:.0f}<br>" +
+                             "<extra></extra>",
+            )
+
+
+        return fig
+
+    elif graph_option == 'Away':
+        fig = figure_templates.get(('team-WDL', graph_option))
+
+        if chosen_team == None:
+            pass
+        else:
+            team = _team_from_click(chosen_team)
+            df2_team = df2[team]
+
+            fig.update_traces(
+                         selector=dict(name='placeholder'),
+                         visible=False,
+            ),
+            fig.update_traces(
+                         selector=dict(name='losses'),
+                         visible=True,
+                         x = df2_team['Season'],
+                         y = 100 * (df2_team['AL']/(df2_team['Pld']/2)),
+                         marker = dict(
+                             color = '#eb5a4e',),
+                         hovertemplate="Season: %{x}<br>" +
+                              "Away Loss %: %{y:.0f}<br>" +
+                              "<extra></extra>",
+            )
+            fig.update_traces(
+                         selector=dict(name='draws'),
+                         visible=True,
+                         x = df2_team['Season'],
+                         y = 100 * (df2_team['AD']/(df2_team['Pld']/2)),
+                         marker = dict(
+                            color = '#f0f0f0',),
+                        hovertemplate="Season: %{x}<br>" +
+                             "Away Draw %: %{y:.0f}<br>" +
+                             "<extra></extra>",
 
-        fig.add_shape(go.layout.Shape(
-                                  type = 'circle',
-                                  layer = 'above',
-                                  x0 = 0, x1 = 8, y0 = 0, y1 = 8,
-                                  xref='paper',
-                                  yref='paper',
-                                  xsizemode='pixel',
-                                  ysizemode='pixel',
-                                  xanchor='1.05',
-                                  yanchor='0.86',
-                                  line = dict(color = '#56b36f'),
-                                  fillcolor = '#56b36f'
-                                  ))
-        fig.add_shape(go.layout.Shape(
-                                  type = 'circle',
-                                  layer = 'above',
-                                  x0 = 0, x1 = 8, y0 = 0, y1 = 8,
-                                  xref='paper',
-                                  yref='paper',
-                                  xsizemode='pixel',
-                                  ysizemode='pixel',
-                                  xanchor='1.05',
-                                  yanchor='0.64',
-                                  line = dict(color = 'white'),
-                                  fillcolor = 'white'
-                                  ))
-        fig.add_shape(go.layout.Shape(
-                                  type = 'circle',
-                                  layer = 'above',
-                                  x0 = 0, x1 = 8, y0 = 0, y1 = 8,
-                                  xref='paper',
-                                  yref='paper',
-                                  xsizemode='pixel',
-                                  ysizemode='pixel',
-                                  xanchor='1.05',
-                                  yanchor='0.41',
-                                  line = dict(color = '#eb5a4e'),
-                                  fillcolor = '#eb5a4e'
-                                  ))
-        fig.add_annotation(go.layout.Annotation(
-                                            text = 'Win',
-                                            xref='paper',
-                                            yref='paper',
-                                            x = 1.11,
-                                            y = 0.86,
-                                            showarrow = False,
-                                            valign = 'middle',))
-        fig.add_annotation(go.layout.Annotation(
-                                            text = 'Draw',
-                                            xref='paper',
-                                            yref='paper',
-                                            x = 1.115,
-                                            y = 0.59,
-                                            showarrow = False,
-                                            valign = 'middle',))
-        fig.add_annotation(go.layout.Annotation(
-                                            text = 'Loss',
-                                            xref='paper',
-                                            yref='paper',
-                                            x = 1.11,
-                                            y = 0.37,
-                                            showarrow = False,
-                                            valign = 'middle',))
+            )
+            fig.update_traces(
+                         selector=dict(name='wins'),
+                         visible=True,
+                         x = df2_team['Season'],
+                         y = 100 * (df2_team['AW']/(df2_team['Pld']/2)),
+                         marker = dict(
+                             color = '#56b36f',),
+                        hovertemplate="Season: %{x}<br>" +
+                             "Away Win %: %{y:.0f}<br>" +
+                             "<extra></extra>",
+            )
 
-        fig.update_layout(template = 'plotly_dark',
-                  barmode='stack',
-                  bargap = 0,
-                  xaxis = dict(range = (-0.5, 130.5),
-                      zeroline=False,
-                      showgrid=False,
-                      tickmode = 'array',
-                      tickvals = [0, 32, 65, 97, 130],),
-                  yaxis = dict(range = (-5, 110),
-                      zeroline=False,
-                      showgrid=False,
-                      title=dict(text='Games (%)', standoff=10)),
-                  showlegend = False,
-                  margin=dict(
-                      l=0,
-                      r=61,
-                      t=0,
-                      b=0,
-                  ),
-                  height=180,)
+
+        return fig
+
+    elif graph_option == 'Home & Away':
+        fig = figure_templates.get(('team-WDL', graph_option))
 
         if chosen_team == None:
             pass
         else:
-            team = chosen_team['points'][0]['text']
-            team = (team.encode('utf-8')).encode('ascii', 'ignore')
+            team = _team_from_click(chosen_team)
             df2_team = df2[team]
 
             fig = go.Figure()
@@ -3281,12 +3132,192 @@ def update_output(graph_option, chosen_team):
         return fig
 
 
-@app.callback(
-    Output('team-pos', 'figure'),
-    [Input('tot-pos-dropdown', 'value'),
-    Input('Map', 'clickData')])
-def update_output(graph_option, chosen_team):
-    if graph_option == 'League Position':
+def team_pos_base(graph_option):
+    if graph_option == 'League Position':
+        dff2 = df2['Master']
+
+        fig = go.Figure()
+
+        fig.add_trace(go.Scatter(
+            name='team_trace',
+            visible=False,
+            ))
+
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_1'],
+            hoverinfo='none'
+            ))
+
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
+            hoverinfo='none'
+            ))
+
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
+            hoverinfo='none'
+            ))
+
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_4'] + dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
+            hoverinfo='none'
+            ))
+
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '1st Tier',
+                                            x = 122,
+                                            y = 6.5,
+                                            showarrow = False,
+                                            valign = 'middle',))
+
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '2nd Tier',
+                                            x = 122,
+                                            y = 26,
+                                            showarrow = False,
+                                            valign = 'middle',))
+
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '3rd Tier',
+                                            x = 122,
+                                            y = 50,
+                                            showarrow = False,
+                                            valign = 'middle',))
+
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '4th Tier',
+                                            x = 122,
+                                            y = 74,
+                                            showarrow = False,
+                                            valign = 'middle',))
+
+        fig.update_layout(
+            template='plotly_dark',
+            showlegend=False,
+            xaxis = dict(range = (-0.5, 130.5),
+                showgrid=False,
+                tickangle=0,
+                tickmode = 'array',
+                tickvals = [0, 32, 65, 97, 130],
+                ),
+            yaxis = dict(
+                zeroline=False,
+                showgrid=False,
+                range = (95.5, -0.5),
+                tickmode = 'array',
+                tickvals = [1, 20, 40, 60, 80],
+                title=dict(text='Final League Position', standoff=15),
+                ),
+            margin=dict(
+                l=0,
+                r=62,
+                t=0,
+                b=0,
+            ),
+            height=180,
+        )
+
+    elif graph_option == 'Points %':
+        dff2 = df2['Master']
+
+        fig = go.Figure()
+
+        fig.add_trace(go.Scatter(
+            name='team_trace',
+            visible=False,
+            ))
+
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_1'],
+            hoverinfo='none'
+            ))
+
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
+            hoverinfo='none'
+            ))
+
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
+            hoverinfo='none'
+            ))
+
+        fig.add_trace(go.Scatter(
+            line=dict(color='white'),
+            x=dff2['Season'],
+            y=dff2['Teams_in_Tier_4'] + dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
+            hoverinfo='none'
+            ))
+
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '1st Tier',
+                                            x = 122,
+                                            y = 6.5,
+                                            showarrow = False,
+                                            valign = 'middle',))
+
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '2nd Tier',
+                                            x = 122,
+                                            y = 26,
+                                            showarrow = False,
+                                            valign = 'middle',))
+
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '3rd Tier',
+                                            x = 122,
+                                            y = 50,
+                                            showarrow = False,
+                                            valign = 'middle',))
+
+        fig.add_annotation(go.layout.Annotation(
+                                            text = '4th Tier',
+                                            x = 122,
+                                            y = 74,
+                                            showarrow = False,
+                                            valign = 'middle',))
+
+        fig.update_layout(
+            template='plotly_dark',
+            showlegend=False,
+            xaxis = dict(range = (-0.5, 130.5),
+                showgrid=False,
+                tickangle=0,
+                tickmode = 'array',
+                tickvals = [0, 32, 65, 97, 130],
+                ),
+            yaxis = dict(
+                zeroline=False,
+                showgrid=False,
+                range = (95.5, -0.5),
+                tickmode = 'array',
+                tickvals = [1, 20, 40, 60, 80],
+                title=dict(text='Final League Position', standoff=15),
+                ),
+            margin=dict(
+                l=0,
+                r=62,
+                t=0,
+                b=0,
+            ),
+            height=180,
+        )
+
+    elif graph_option == 'Points':
         dff2 = df2['Master']
 
         fig = go.Figure()
@@ -3367,7 +3398,7 @@ def update_output(graph_option, chosen_team):
                 range = (95.5, -0.5),
                 tickmode = 'array',
                 tickvals = [1, 20, 40, 60, 80],
-                title=dict(text='Final League Position', standoff=15),
+                title=dict(text='Final League Position', standoff=10),
                 ),
             margin=dict(
                 l=0,
@@ -3378,33 +3409,7 @@ def update_output(graph_option, chosen_team):
             height=180,
         )
 
-        if chosen_team == None:
-            pass
-        else:
-            team = chosen_team['points'][0]['text']
-            team = (team.encode('utf-8')).encode('ascii', 'ignore')
-
-            df2_team = df2[team]
-
-            fig.update_traces(
-                selector=dict(name='team_trace'),
-                visible=True,
-                x=df2_team['Season'],
-                y=df2_team['TotPos'],
-                mode='lines+markers',
-                line=dict(color=df1_all.at[team, 'colour']),
-                marker=dict(
-                    size=2,
-                    color=df1_all.at[team, 'colour']),
-                customdata=df2_team['Pos'],
-                hovertemplate="Season: %{x}<br>" +
-                      "League Position: %{customdata}<br>" +
-                      "Full League Position: %{y}<br>" +
-                      "<extra></extra>",
-            )
-
-    elif graph_option == 'Points %':
-
+    elif graph_option == 'Home & Away Points':
         dff2 = df2['Master']
 
         fig = go.Figure()
@@ -3485,7 +3490,7 @@ def update_output(graph_option, chosen_team):
                 range = (95.5, -0.5),
                 tickmode = 'array',
                 tickvals = [1, 20, 40, 60, 80],
-                title=dict(text='Final League Position', standoff=15),
+                title=dict(text='Final League Position', standoff=10),
                 ),
             margin=dict(
                 l=0,
@@ -3496,58 +3501,7 @@ def update_output(graph_option, chosen_team):
             height=180,
         )
 
-        if chosen_team == None:
-            pass
-        else:
-
-            team = chosen_team['points'][0]['text']
-            team = (team.encode('utf-8')).encode('ascii', 'ignore')
-            df2_team = df2[team]
-
-            fig = go.Figure()
-
-            fig.add_trace(go.Scatter(
-                x=df2_team['Season'],
-                y=100 * (df2_team['Pts']/df2_team['Max_Pts']),
-                mode='lines+markers',
-                line=dict(color=df1_all.at[team, 'colour']),
-                        marker=dict(
-                            size=2,
-                            color=df1_all.at[team, 'colour']),
-                        customdata=df2_team['Pts'],
-                        hovertemplate="Season: %{x}<br>" +
-                              "Points: %{customdata}<br>" +
-                              "Points (as % of max): %{y:0f}<br>" +
-                              "<extra></extra>",)
-            )
-
-            fig.update_layout(
-                    template='plotly_dark',
-                    showlegend=False,
-                    xaxis = dict(range = (-0.5, 130.5),
-                        showgrid=False,
-                        tickangle=0,
-                        tickmode = 'array',
-                        tickvals = [0, 32, 65, 97, 130],
-                        ),
-                    yaxis = dict(
-                        zeroline=False,
-                        showgrid=False,
-                        range = (-5, 105),
-                        tickmode = 'array',
-                        tickvals = [0, 25, 50, 75, 100],
-                        title=dict(text='Points (% of max)' , standoff=10),
-                        ),
-                    margin=dict(
-                        l=0,
-                        r=62,
-                        t=0,
-                        b=0,
-                    ),
-                    height=180,
-                )
-
-    elif graph_option == 'Points':
+    elif graph_option == 'Home & Away Points %':
         dff2 = df2['Master']
 
         fig = go.Figure()
@@ -3628,7 +3582,7 @@ def update_output(graph_option, chosen_team):
                 range = (95.5, -0.5),
                 tickmode = 'array',
                 tickvals = [1, 20, 40, 60, 80],
-                title=dict(text='Final League Position', standoff=10),
+                title=dict(text='Final League Position', standoff=15),
                 ),
             margin=dict(
                 l=0,
@@ -3639,28 +3593,64 @@ def update_output(graph_option, chosen_team):
             height=180,
         )
 
+    return fig
+
+for option in ['League Position', 'Points %', 'Points', 'Home & Away Points', 'Home & Away Points %']:
+    figure_templates.add(('team-pos', option), team_pos_base(option))
+
+def team_pos_figure(graph_option, chosen_team):
+    if graph_option == 'League Position':
+        fig = figure_templates.get(('team-pos', graph_option))
+
+        if chosen_team == None:
+            pass
+        else:
+            team = _team_from_click(chosen_team)
+
+            df2_team = df2[team]
+
+            fig.update_traces(
+                selector=dict(name='team_trace'),
+                visible=True,
+                x=df2_team['Season'],
+                y=df2_team['TotPos'],
+                mode='lines+markers',
+                line=dict(color=df1_all.at[team, 'colour']),
+                marker=dict(
+                    size=2,
+                    color=df1_all.at[team, 'colour']),
+                customdata=df2_team['Pos'],
+                hovertemplate="Season: %{x}<br>" +
+                      "League Position: %{customdata}<br>" +
+                      "Full League Position: %{y}<br>" +
+                      "<extra></extra>",
+            )
+
+    elif graph_option == 'Points %':
+
+        fig = figure_templates.get(('team-pos', graph_option))
+
         if chosen_team == None:
             pass
         else:
 
-            team = chosen_team['points'][0]['text']
-            team = (team.encode('utf-8')).encode('ascii', 'ignore')
+            team = _team_from_click(chosen_team)
             df2_team = df2[team]
 
             fig = go.Figure()
 
             fig.add_trace(go.Scatter(
                 x=df2_team['Season'],
-                y=df2_team['Pts'],
+                y=100 * (df2_team['Pts']/df2_team['Max_Pts']),
                 mode='lines+markers',
                 line=dict(color=df1_all.at[team, 'colour']),
                         marker=dict(
                             size=2,
                             color=df1_all.at[team, 'colour']),
-                        customdata=(100*df2_team['Pts']/df2_team['Max_Pts']),
+                        customdata=df2_team['Pts'],
                         hovertemplate="Season: %{x}<br>" +
-                              "Points: {y}<br>" +
-                              "Points (as % of max): %{customdata:0f}<br>" +
+                              "Points: %{customdata}<br>" +
+                              "Points (as % of max): %{y:0f}<br>" +
                               "<extra></extra>",)
             )
 
@@ -3679,7 +3669,7 @@ def update_output(graph_option, chosen_team):
                         range = (-5, 105),
                         tickmode = 'array',
                         tickvals = [0, 25, 50, 75, 100],
-                        title=dict(text='Points', standoff=10),
+                        title=dict(text='Points (% of max)' , standoff=10),
                         ),
                     margin=dict(
                         l=0,
@@ -3690,104 +3680,67 @@ def update_output(graph_option, chosen_team):
                     height=180,
                 )
 
-    elif graph_option == 'Home & Away Points':
-        dff2 = df2['Master']
-
-        fig = go.Figure()
-
-        fig.add_trace(go.Scatter(
-            name='team_trace',
-            visible=False,
-            ))
-
-        fig.add_trace(go.Scatter(
-            line=dict(color='white'),
-            x=dff2['Season'],
-            y=dff2['Teams_in_Tier_1'],
-            hoverinfo='none'
-            ))
-
-        fig.add_trace(go.Scatter(
-            line=dict(color='white'),
-            x=dff2['Season'],
-            y=dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
-            hoverinfo='none'
-            ))
-
-        fig.add_trace(go.Scatter(
-            line=dict(color='white'),
-            x=dff2['Season'],
-            y=dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
-            hoverinfo='none'
-            ))
+    elif graph_option == 'Points':
+        fig = figure_templates.get(('team-pos', graph_option))
 
-        fig.add_trace(go.Scatter(
-            line=dict(color='white'),
-            x=dff2['Season'],
-            y=dff2['Teams_in_Tier_4'] + dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
-            hoverinfo='none'
-            ))
+        if chosen_team == None:
+            pass
+        else:
 
-        fig.add_annotation(go.layout.Annotation(
-                                            text = '1st Tier',
-                                            x = 122,
-                                            y = 6.5,
-                                            showarrow = False,
-                                            valign = 'middle',))
+            team = _team_from_click(chosen_team)
+            df2_team = df2[team]
 
-        fig.add_annotation(go.layout.Annotation(
-                                            text = '2nd Tier',
-                                            x = 122,
-                                            y = 26,
-                                            showarrow = False,
-                                            valign = 'middle',))
+            fig = go.Figure()
 
-        fig.add_annotation(go.layout.Annotation(
-                                            text = '3rd Tier',
-                                            x = 122,
-                                            y = 50,
-                                            showarrow = False,
-                                            valign = 'middle',))
+            fig.add_trace(go.Scatter(
+                x=df2_team['Season'],
+                y=df2_team['Pts'],
+                mode='lines+markers',
+                line=dict(color=df1_all.at[team, 'colour']),
+                        marker=dict(
+                            size=2,
+                            color=df1_all.at[team, 'colour']),
+                        customdata=(100*df2_team['Pts']/df2_team['Max_Pts']),
+                        hovertemplate="Season: %{x}<br>" +
+                              "Points: {y}<br>" +
+                              "Points (as % of max): %{customdata:0f}<br>" +
+                              "<extra></extra>",)
+            )
 
-        fig.add_annotation(go.layout.Annotation(
-                                            text = '4th Tier',
-                                            x = 122,
-                                            y = 74,
-                                            showarrow = False,
-                                            valign = 'middle',))
+            fig.update_layout(
+                    template='plotly_dark',
+                    showlegend=False,
+                    xaxis = dict(range = (-0.5, 130.5),
+                        showgrid=False,
+                        tickangle=0,
+                        tickmode = 'array',
+                        tickvals = [0, 32, 65, 97, 130],
+                        ),
+                    yaxis = dict(
+                        zeroline=False,
+                        showgrid=False,
+                        range = (-5, 105),
+                        tickmode = 'array',
+                        tickvals = [0, 25, 50, 75, 100],
+                        title=dict(text='Points', standoff=10),
+                        ),
+                    margin=dict(
+                        l=0,
+                        r=62,
+                        t=0,
+                        b=0,
+                    ),
+                    height=180,
+                )
 
-        fig.update_layout(
-            template='plotly_dark',
-            showlegend=False,
-            xaxis = dict(range = (-0.5, 130.5),
-                showgrid=False,
-                tickangle=0,
-                tickmode = 'array',
-                tickvals = [0, 32, 65, 97, 130],
-                ),
-            yaxis = dict(
-                zeroline=False,
-                showgrid=False,
-                range = (95.5, -0.5),
-                tickmode = 'array',
-                tickvals = [1, 20, 40, 60, 80],
-                title=dict(text='Final League Position', standoff=10),
-                ),
-            margin=dict(
-                l=0,
-                r=62,
-                t=0,
-                b=0,
-            ),
-            height=180,
-        )
+    elif graph_option == 'Home & Away Points':
+        fig = figure_templates.get(('team-pos', graph_option))
 
         if chosen_team == None:
             pass
         else:
 
-            team = chosen_team['points'][0]['text']
-            team = (team.encode('utf-8')).encode('ascii', 'ignore')
+            team = _team_from_click(chosen_team)
             df2_team = df2[team]
 
             fig = go.Figure()
@@ -3863,103 +3816,13 @@ def update_output(graph_option, chosen_team):
 
     elif graph_option == 'Home & Away Points %':
 
-        dff2 = df2['Master']
-
-        fig = go.Figure()
-
-        fig.add_trace(go.Scatter(
-            name='team_trace',
-            visible=False,
-            ))
-
-        fig.add_trace(go.Scatter(
-            line=dict(color='white'),
-            x=dff2['Season'],
-            y=dff2['Teams_in_Tier_1'],
-            hoverinfo='none'
-            ))
-
-        fig.add_trace(go.Scatter(
-            line=dict(color='white'),
-            x=dff2['Season'],
-            y=dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
-            hoverinfo='none'
-            ))
-
-        fig.add_trace(go.Scatter(
-            line=dict(color='white'),
-            x=dff2['Season'],
-            y=dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
-            hoverinfo='none'
-            ))
-
-        fig.add_trace(go.Scatter(
-            line=dict(color='white'),
-            x=dff2['Season'],
-            y=dff2['Teams_in_Tier_4'] + dff2['Teams_in_Tier_3'] + dff2['Teams_in_Tier_2'] + dff2['Teams_in_Tier_1'],
-            hoverinfo='none'
-            ))
-
-        fig.add_annotation(go.layout.Annotation(
-                                            text = '1st Tier',
-                                            x = 122,
-                                            y = 6.5,
-                                            showarrow = False,
-                                            valign = 'middle',))
-
-        fig.add_annotation(go.layout.Annotation(
-                                            text = '2nd Tier',
-                                            x = 122,
-                                            y = 26,
-                                            showarrow = False,
-                                            valign = 'middle',))
-
-        fig.add_annotation(go.layout.Annotation(
-                                            text = '3rd Tier',
-                                            x = 122,
-                                            y = 50,
-                                            showarrow = False,
-                                            valign = 'middle',))
-
-        fig.add_annotation(go.layout.Annotation(
-                                            text = '4th Tier',
-                                            x = 122,
-                                            y = 74,
-                                            showarrow = False,
-                                            valign = 'middle',))
-
-        fig.update_layout(
-            template='plotly_dark',
-            showlegend=False,
-            xaxis = dict(range = (-0.5, 130.5),
-                showgrid=False,
-                tickangle=0,
-                tickmode = 'array',
-                tickvals = [0, 32, 65, 97, 130],
-                ),
-            yaxis = dict(
-                zeroline=False,
-                showgrid=False,
-                range = (95.5, -0.5),
-                tickmode = 'array',
-                tickvals = [1, 20, 40, 60, 80],
-                title=dict(text='Final League Position', standoff=15),
-                ),
-            margin=dict(
-                l=0,
-                r=62,
-                t=0,
-                b=0,
-            ),
-            height=180,
-        )
+        fig = figure_templates.get(('team-pos', graph_option))
 
         if chosen_team == None:
             pass
         else:
 
-            team = chosen_team['points'][0]['text']
-            team = (team.encode('utf-8')).encode('ascii', 'ignore')
+            team = _team_from_click(chosen_team)
             df2_team = df2[team]
 
             fig = go.Figure()
@@ -4037,131 +3900,128 @@ def update_output(graph_option, chosen_team):
     return fig
 
 
-@app.callback(
-    Output('team-info', 'children'),
-    [Input('Map', 'clickData')])
-def update_output(chosen_team):
-    if chosen_team == None:
-        raise PreventUpdate
-    else:
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
-
-        text = """Nickname: %s\nEst. %s\nEntered League: %s\nCurrent status: \n%s
-            """ % (df1_all.at[team, 'nickname'], int(df1_all.at[team, 'founded']), int(df1_all.at[team, 'entered_league']), df1_all.at[team, 'current_status'])
-
-        return text
-
-@app.callback(
-    Output('line', 'figure'),
-    [Input('Map', 'clickData')])
-def update_output(chosen_team):
-    fig = go.Figure()
+team_charts = {'team-pos': team_pos_figure, 'team-WDL': team_WDL_figure, 'team-GD': team_GD_figure}
+# Responses pre-rendered by ``python render_cache.py``, if it has been run
+# for this data and code.
+render_cache = RenderCache(render_version(dataset.version))
 
-    fig.update_layout(
-        margin=go.layout.Margin(
-                l=0,
-                r=0,
-                b=4,
-                t=0,
-        ),
-        xaxis=dict(range=(0, 0),
-                       visible=False,
-                       showgrid=False,
-                       showticklabels=False,),
-        yaxis=dict(range=(0, 0),
-                      visible=False,
-                      showgrid=False,
-                      showticklabels=False,),
-        height=10,
-        plot_bgcolor='#111111',
-        paper_bgcolor='white',
-    )
-    if chosen_team == None:
-        pass
-    else:
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
-        team_primary_color = df1_all.at[team, 'colour']
 
-        fig.update_layout(
-        paper_bgcolor=team_primary_color,
-        )
+def team_chart_patch(chart, graph_option, chosen_team):
+    if chosen_team is not None:
+        rendered = render_cache.get(chart, graph_option, _team_from_click(chosen_team))
+        if rendered is not None:
+            return rendered
+    return figure_templates.patch((chart, graph_option), team_charts[chart](graph_option, chosen_team))
 
-    return fig
 
 @app.callback(
-    Output('chosen-team-wiki', 'style'),
-    [Input('Map', 'clickData')])
-def update_output(chosen_team):
-    if chosen_team == None:
-        raise PreventUpdate
-    else:
-        return {'color':'white', 'textAlign':'left', 'fontSize': '13'}
+    Output('team-pos-patch', 'data'),
+    [Input('tot-pos-dropdown', 'value'),
+    Input('team-click', 'data')])
+@callback_cache.memoize('team-pos', key=_callback_key, encode=_encoded)
+def team_pos_generator(graph_option, chosen_team):
+    return team_chart_patch('team-pos', graph_option, chosen_team)
 
 @app.callback(
-    Output('chosen-team-website', 'style'),
-    [Input('Map', 'clickData')])
-def update_output(chosen_team):
-    if chosen_team == None:
-        raise PreventUpdate
-    else:
-        return {'color':'white', 'textAlign':'right', 'fontSize': '13',}
+    Output('team-WDL-patch', 'data'),
+    [Input('WDL-graph-dropdown', 'value'),
+     Input('team-click', 'data')])
+@callback_cache.memoize('team-WDL', key=_callback_key, encode=_encoded)
+def team_WDL_generator(graph_option, chosen_team):
+    return team_chart_patch('team-WDL', graph_option, chosen_team)
 
 @app.callback(
-    Output('chosen-team', 'children'),
-    [Input('Map', 'clickData')])
-def update_output(chosen_team):
-    if chosen_team == None:
-        return 'Pick a team'
-    else:
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
+    Output('team-GD-patch', 'data'),
+    [Input('GD-graph-dropdown', 'value'),
+    Input('team-click', 'data')])
+@callback_cache.memoize('team-GD', key=_callback_key, encode=_encoded)
+def team_GD_generator(graph_option, chosen_team):
+    return team_chart_patch('team-GD', graph_option, chosen_team)
 
-        return '{} \n{}'.format(team, df1_all.at[team, 'suffix'])
+templates_store.data = figure_templates.store(['team-pos', 'team-WDL', 'team-GD', 'gd-pie', 'wdl-pie', 'pts-pie'])
 
-@app.callback(
-    Output('chosen-team', 'style'),
-    [Input('Map', 'clickData')])
-def update_output(chosen_team):
-    if chosen_team == None:
-        raise PreventUpdate
-    else:
-        return {'paddingTop': '2px', 'paddingBottom': '2px', 'fontSize': '19px',
-                'textAlign': 'center', 'height': '78px', 'verticalAlign': 'middle',
-                'whiteSpace':'pre-wrap'}
+for chart in ['team-pos', 'team-WDL', 'team-GD']:
+    app.clientside_callback(
+        ClientsideFunction(namespace='football', function_name='applyPatch'),
+        Output(chart, 'figure'),
+        [Input(chart + '-patch', 'data')],
+        [State('figure-templates', 'data')])
 
 @app.callback(
-    Output('chosen-team-wiki', 'href'),
-    [Input('Map', 'clickData')])
-def wiki_generator(chosen_team):
+    [Output('team-info', 'children'),
+     Output('team-name-vs', 'children'),
+     Output('versus-team-dropdown', 'options'),
+     Output('versus-team-dropdown', 'disabled'),
+     Output('range-slider-all-pies', 'disabled'),
+     Output('team-seasons', 'data')],
+    [Input('team-click', 'data')])
+@callback_cache.memoize('team', key=_callback_key, encode=_encoded)
+def team_generator(chosen_team):
     if chosen_team == None:
-        return None
+        return dash.no_update, "Team", [], True, True, None
     else:
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
-        wiki_link = df1_all.at[team, 'wiki']
+        team = _team_from_click(chosen_team)
 
-        return wiki_link
+        text = """Nickname: %s\nEst. %s\nEntered League: %s\nCurrent status: \n%s
+            """ % (df1_all.at[team, 'nickname'], int(df1_all.at[team, 'founded']), int(df1_all.at[team, 'entered_league']), df1_all.at[team, 'current_status'])
 
-@app.callback(
-    Output('chosen-team-website', 'href'),
-    [Input('Map', 'clickData')])
-def website_generator(chosen_team):
-    if chosen_team == None:
-        return None
-    else:
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
-        website_link = df1_all.at[team, 'website']
+        options = opponent_options.get(team, [])
+
+        return text, '{}'.format(team), options, len(options) == 0, False, team_seasons(team)
+
+app.clientside_callback(
+    ClientsideFunction(namespace='football', function_name='teamHeader'),
+    [Output('line', 'figure'),
+     Output('line-opposition', 'figure'),
+     Output('chosen-team', 'children'),
+     Output('chosen-team', 'style'),
+     Output('chosen-team-wiki', 'style'),
+     Output('chosen-team-website', 'style'),
+     Output('chosen-team-wiki', 'href'),
+     Output('chosen-team-website', 'href')],
+    [Input('team-click', 'data')],
+    [State('team-store', 'data')])
+
+map_zoom = 4.6
+map_sheets = {
+    'All': ['League_Teams', 'Non-League_Teams', 'Defunct_Teams'],
+    'League': ['League_Teams'],
+    'Non-League': ['Non-League_Teams'],
+    'Defunct': ['Defunct_Teams'],
+}
+
+
+def map_markers(teams):
+    # The black outline and colour marker traces for one sheet's teams.
+    return [
+        go.Scattermapbox(
+            lat=teams['lat'],
+            lon=teams['lon'],
+            mode='markers',
+            marker=dict(
+                size=7,
+                color='black'
+            ),
+            text=teams['Team'],
+            hovertemplate="%{text}<br>" +
+                      "<extra></extra>",
+        ),
+        go.Scattermapbox(
+            lat=teams['lat'],
+            lon=teams['lon'],
+            mode='markers',
+            marker=dict(
+                size=5,
+                color=teams['colour']
+            ),
+            text=teams['Team'],
+            hovertemplate="%{text}<br>" +
+                      "<extra></extra>",
+        ),
+    ]
 
-        return website_link
 
-@app.callback(
-    Output('Map', 'figure'),
-    [Input('L-NL-D-option', 'value'),
-    Input('Map', 'clickData')])
-def map_generator(league_option, chosen_team):
+def map_base(league_option):
     fig = go.Figure()
 
     fig.add_trace(go.Scattermapbox(
@@ -4180,157 +4040,8 @@ def map_generator(league_option, chosen_team):
                       "<extra></extra>",
         ))
 
-    if league_option == 'All':
-        fig.add_trace(go.Scattermapbox(
-                lat=df1['League_Teams']['lat'],
-                lon=df1['League_Teams']['lon'],
-                mode='markers',
-                marker=dict(
-                    size=7,
-                    color='black'
-                ),
-                text=df1['League_Teams']['Team'],
-                hovertemplate="%{text}<br>" +
-                          "<extra></extra>",
-            ))
-        fig.add_trace(go.Scattermapbox(
-                lat=df1['League_Teams']['lat'],
-                lon=df1['League_Teams']['lon'],
-                mode='markers',
-                marker=dict(
-                    size=5,
-                    color=df1['League_Teams']['colour']
-                ),
-                text=df1['League_Teams']['Team'],
-                hovertemplate="%{text}<br>" +
-                          "<extra></extra>",
-            ))
-        fig.add_trace(go.Scattermapbox(
-                lat=df1['Non-League_Teams']['lat'],
-                lon=df1['Non-League_Teams']['lon'],
-                mode='markers',
-                marker=dict(
-                    size=7,
-                    color='black'
-                ),
-                text=df1['Non-League_Teams']['Team'],
-                hovertemplate="%{text}<br>" +
-                          "<extra></extra>",
-            ))
-        fig.add_trace(go.Scattermapbox(
-                lat=df1['Non-League_Teams']['lat'],
-                lon=df1['Non-League_Teams']['lon'],
-                mode='markers',
-                marker=dict(
-                    size=5,
-                    color=df1['Non-League_Teams']['colour']
-                ),
-                text=df1['Non-League_Teams']['Team'],
-                hovertemplate="%{text}<br>" +
-                          "<extra></extra>",
-            ))
-        fig.add_trace(go.Scattermapbox(
-                lat=df1['Defunct_Teams']['lat'],
-                lon=df1['Defunct_Teams']['lon'],
-                mode='markers',
-                marker=dict(
-                    size=7,
-                    color='black'
-                ),
-                text=df1['Defunct_Teams']['Team'],
-                hovertemplate="%{text}<br>" +
-                          "<extra></extra>",
-            ))
-        fig.add_trace(go.Scattermapbox(
-                lat=df1['Defunct_Teams']['lat'],
-                lon=df1['Defunct_Teams']['lon'],
-                mode='markers',
-                marker=dict(
-                    size=5,
-                    color=df1['Defunct_Teams']['colour']
-                ),
-                text=df1['Defunct_Teams']['Team'],
-                hovertemplate="%{text}<br>" +
-                          "<extra></extra>",
-            ))
-
-    elif league_option == 'League':
-        fig.add_trace(go.Scattermapbox(
-                lat=df1['League_Teams']['lat'],
-                lon=df1['League_Teams']['lon'],
-                mode='markers',
-                marker=dict(
-                    size=7,
-                    color='black'
-                ),
-                text=df1['League_Teams']['Team'],
-                hovertemplate="%{text}<br>" +
-                          "<extra></extra>",
-            ))
-        fig.add_trace(go.Scattermapbox(
-                lat=df1['League_Teams']['lat'],
-                lon=df1['League_Teams']['lon'],
-                mode='markers',
-                marker=dict(
-                    size=5,
-                    color=df1['League_Teams']['colour']
-                ),
-                text=df1['League_Teams']['Team'],
-                hovertemplate="%{text}<br>" +
-                          "<extra></extra>",
-            ))
-
-    elif league_option == 'Non-League':
-        fig.add_trace(go.Scattermapbox(
-                lat=df1['Non-League_Teams']['lat'],
-                lon=df1['Non-League_Teams']['lon'],
-                mode='markers',
-                marker=dict(
-                    size=7,
-                    color='black'
-                ),
-                text=df1['Non-League_Teams']['Team'],
-                hovertemplate="%{text}<br>" +
-                          "<extra></extra>",
-            ))
-        fig.add_trace(go.Scattermapbox(
-                lat=df1['Non-League_Teams']['lat'],
-                lon=df1['Non-League_Teams']['lon'],
-                mode='markers',
-                marker=dict(
-                    size=5,
-                    color=df1['Non-League_Teams']['colour']
-                ),
-                text=df1['Non-League_Teams']['Team'],
-                hovertemplate="%{text}<br>" +
-                          "<extra></extra>",
-            ))
-
-    elif league_option == 'Defunct':
-        fig.add_trace(go.Scattermapbox(
-                lat=df1['Defunct_Teams']['lat'],
-                lon=df1['Defunct_Teams']['lon'],
-                mode='markers',
-                marker=dict(
-                    size=7,
-                    color='black'
-                ),
-                text=df1['Defunct_Teams']['Team'],
-                hovertemplate="%{text}<br>" +
-                          "<extra></extra>",
-            ))
-        fig.add_trace(go.Scattermapbox(
-                lat=df1['Defunct_Teams']['lat'],
-                lon=df1['Defunct_Teams']['lon'],
-                mode='markers',
-                marker=dict(
-                    size=5,
-                    color=df1['Defunct_Teams']['colour']
-                ),
-                text=df1['Defunct_Teams']['Team'],
-                hovertemplate="%{text}<br>" +
-                          "<extra></extra>",
-            ))
+    for sheet in map_sheets[league_option]:
+        fig.add_traces(map_markers(df1[sheet]))
 
     fig.update_layout(
         margin=go.layout.Margin(
@@ -4356,23 +4067,100 @@ def map_generator(league_option, chosen_team):
                 lon=-2
             ),
             pitch=0,
-            zoom=4.6,
-            uirevision=False,
+            zoom=map_zoom,
+            uirevision='map',
         )
         )
 
-    if chosen_team == None:
-        return fig
-    else:
-        team = chosen_team['points'][0]['text']
-        team = (team.encode('utf-8')).encode('ascii', 'ignore')
-        team_primary_color = df1_all.at[team, 'colour']
+    return fig
 
-        fig.update_layout(
-        paper_bgcolor=team_primary_color,
-        )
+map_figures = dict((option, map_base(option).to_plotly_json()) for option in map_sheets)
+map_indexes = dict(
+    (sheet, MarkerIndex(df1[sheet]['lon'], df1[sheet]['lat']))
+    for sheet in map_sheets['All'])
+map_clusters = dict(
+    (sheet, ClusterIndex(df1[sheet]['lon'], df1[sheet]['lat']))
+    for sheet in map_sheets['All'])
+# Overlapping clubs are drawn as clusters, which split as the Map zooms in.
+# MAP_CLUSTERS=0 draws every club instead, for a static export with no
+# server to split them.
+map_clustered = os.environ.get('MAP_CLUSTERS', '1') != '0'
+
+
+def map_cluster_traces(teams, level, clusters):
+    # Grey markers, sized by count, for the clusters of one sheet's teams,
+    # tagged in customdata so that the teamClick clientside callback ignores
+    # clicks on them.
+    counts = level.counts[clusters]
+    names = teams['Team'].values
+    members = [names[level.members[cluster]] for cluster in clusters]
+    size = 5 + 2 * np.sqrt(counts)
+    trace = dict(
+        type='scattermapbox',
+        lat=level.lat[clusters],
+        lon=level.lon[clusters],
+        mode='markers',
+        text=['%d clubs: %s' % (len(team), ', '.join(team[:5]) + (', ...' if len(team) > 5 else ''))
+              for team in members],
+        customdata=[CLUSTER_TAG] * len(members),
+        hovertemplate="%{text}<br>" +
+                  "<extra></extra>",
+    )
+    return [dict(trace, marker=dict(size=size + 2, color='black')),
+            dict(trace, marker=dict(size=size, color='#888888'))]
+
+
+def map_view_figure(league_option, bounds, zoom):
+    # The filter's map with only the markers inside bounds (all of them if
+    # None), overlapping ones drawn as clusters at this zoom.  After the
+    # placeholder, each sheet has its outline and colour traces in turn.
+    fig = map_figures[league_option]
+    data = fig['data'][:1]
+    clusters = []
+    for number, sheet in enumerate(map_sheets[league_option]):
+        if bounds is None:
+            rows = np.arange(len(map_indexes[sheet]))
+        else:
+            rows = map_indexes[sheet].within(*bounds)
+        if map_clustered:
+            singles, level, groups = map_clusters[sheet].group(zoom, rows)
+        else:
+            singles, level, groups = rows, None, []
+        data += [take_points(trace, singles) for trace in fig['data'][1 + 2 * number:3 + 2 * number]]
+        if len(groups):
+            clusters += map_cluster_traces(df1[sheet], level, groups)
+    return dict(fig, data=data + clusters)
+
+# The map for each league filter at its initial view, built and encoded
+# once; a team click only changes the border colour, which the mapFigure
+# clientside callback sets.
+map_encoded = dict(
+    (option, serialization.RawJSON(serialization.dumps(map_view_figure(option, None, map_zoom))))
+    for option in map_sheets)
 
-        return fig
+@app.callback(
+    Output('map-base', 'data'),
+    [Input('L-NL-D-option', 'value'),
+     Input('Map', 'relayoutData')])
+def map_generator(league_option, relayout):
+    bounds = viewport(relayout)
+    if bounds is None:
+        return map_encoded[league_option]
+    return map_view_figure(league_option, bounds, view_zoom(relayout, map_zoom))
+
+# The click every team callback follows: the Map's clickData when a club
+# was clicked; a click on a cluster leaves the team as it was.
+app.clientside_callback(
+    ClientsideFunction(namespace='football', function_name='teamClick'),
+    Output('team-click', 'data'),
+    [Input('Map', 'clickData')])
+
+app.clientside_callback(
+    ClientsideFunction(namespace='football', function_name='mapFigure'),
+    Output('Map', 'figure'),
+    [Input('map-base', 'data'),
+     Input('team-click', 'data')],
+    [State('team-store', 'data')])
 
 
 
@@ -0,0 +1,181 @@
+// Clientside callbacks: outputs that only restyle the page for the clicked
+// team, computed in the browser from the team data in the 'team-store' Store.
+(function() {
+    // The Map's click data carries the team name as the point text; drop
+    // non-ASCII characters as the server side does.
+    function teamName(clickData) {
+        if (!clickData) {
+            return null;
+        }
+        return clickData.points[0].text.replace(/[^\x00-\x7F]/g, '');
+    }
+
+    function hiddenAxis() {
+        return {range: [0, 0], visible: false, showgrid: false, showticklabels: false};
+    }
+
+    // The thin bar in the team's colour under the team name.
+    function colourBar(colour) {
+        return {
+            data: [],
+            layout: {
+                margin: {l: 0, r: 0, b: 4, t: 0},
+                xaxis: hiddenAxis(),
+                yaxis: hiddenAxis(),
+                height: 10,
+                plot_bgcolor: '#111111',
+                paper_bgcolor: colour
+            }
+        };
+    }
+
+    // Set each property in changes on target, deleting those set to null
+    // and copying those given as {_from: i} from trace i of the template.
+    function merge(target, changes, baseData) {
+        for (var key in changes) {
+            var value = changes[key];
+            if (value === null) {
+                delete target[key];
+            } else if (typeof value === 'object' && value._from !== undefined) {
+                target[key] = JSON.parse(JSON.stringify(baseData[value._from][key]));
+            } else {
+                target[key] = value;
+            }
+        }
+        return target;
+    }
+
+    // A copy of the named figure from the 'figure-templates' Store, with
+    // its layout's plotly template filled back in.
+    function templateFigure(templates, name) {
+        var figure = JSON.parse(JSON.stringify(templates.figures[templates.names[name]]));
+        var template = figure.layout.template;
+        if (template && template._template !== undefined) {
+            figure.layout.template = JSON.parse(JSON.stringify(templates.templates[template._template]));
+        }
+        return figure;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        football: {
+            // A team chart's figure from the patch its server callback sent:
+            // a copy of the chart's template with the changed trace and
+            // layout properties merged in.
+            applyPatch: function(patch, templates) {
+                if (!patch) {
+                    return window.dash_clientside.no_update;
+                }
+                var base = templates.figures[templates.names[patch.base]];
+                var figure = templateFigure(templates, patch.base);
+                if (patch.traces) {
+                    figure.data = patch.traces.map(function(trace) {
+                        return merge({}, trace, base.data);
+                    });
+                } else {
+                    for (var i in patch.data) {
+                        merge(figure.data[i], patch.data[i], base.data);
+                    }
+                }
+                merge(figure.layout, patch.layout, base.data);
+                return figure;
+            },
+
+            // The Map's click data when a club was clicked, for the team
+            // callbacks; clicks on a cluster marker (customdata 'cluster', as
+            // map_index.CLUSTER_TAG) are ignored.
+            teamClick: function(clickData) {
+                if (clickData && clickData.points[0].customdata === 'cluster') {
+                    return window.dash_clientside.no_update;
+                }
+                return clickData;
+            },
+
+            // The map for the league filter, bordered in the clicked team's
+            // colour; the markers are shared with the server's figure.
+            mapFigure: function(base, clickData, teams) {
+                if (!base) {
+                    return window.dash_clientside.no_update;
+                }
+                var team = teamName(clickData);
+                var colour = team !== null && teams[team] ? teams[team].colour : 'white';
+                return Object.assign({}, base, {
+                    layout: Object.assign({}, base.layout, {paper_bgcolor: colour})
+                });
+            },
+
+            // The season-range label and the goals, results and points pies
+            // for the slider's range, from the clicked team's running season
+            // totals (row s: the total over the seasons before s).
+            seasonPies: function(bundle, range, templates, teams, seasons) {
+                if (!bundle) {
+                    return [seasons[0] + ' - ' + seasons[seasons.length - 1],
+                            templateFigure(templates, 'gd-pie/empty'),
+                            templateFigure(templates, 'wdl-pie/empty'),
+                            templateFigure(templates, 'pts-pie/empty')];
+                }
+                var colours = [teams[bundle.team].colour, teams[bundle.team].colour_away];
+                function total(column) {
+                    return bundle.totals[column][range[1] + 1] - bundle.totals[column][range[0]];
+                }
+                var HF = total('HF'), HA = total('HA'), AF = total('AF'), AA = total('AA');
+                var HW = total('HW'), HD = total('HD'), HL = total('HL');
+                var AW = total('AW'), AD = total('AD'), AL = total('AL');
+                var HPts = total('HPts'), APts = total('APts'), Pld = total('Pld');
+
+                var gd = templateFigure(templates, Pld === 0 ? 'gd-pie/empty' : 'gd-pie/team');
+                if (Pld !== 0) {
+                    var goals = AF + HF + HA + AA;
+                    var scored = 100 * (AF + HF) / goals, conceded = 100 * (AA + HA) / goals;
+                    gd.data[0].values = [HF + HA, AF + AA];
+                    gd.data[0].marker.colors = colours;
+                    gd.data[0].rotation = (AF + AA) / goals * 360;
+                    gd.data[1].values = [100 * AF / goals, 100 * HF / goals,
+                                         100 * HA / goals, 100 * AA / goals];
+                    gd.data[1].meta = [scored, scored, conceded, conceded];
+                }
+
+                var wdl = templateFigure(templates, 'wdl-pie/team');
+                var won = 100 * (AW + HW) / Pld, drawn = 100 * (AD + HD) / Pld, lost = 100 * (AL + HL) / Pld;
+                wdl.data[0].marker.colors = colours;
+                wdl.data[1].values = [AW, HW, HD, HL, AL, AD];
+                wdl.data[1].meta = [won, won, drawn, lost, lost, drawn];
+
+                var noPoints = HPts === 0 || APts === 0;
+                var pts = templateFigure(templates, noPoints ? 'pts-pie/empty' : 'pts-pie/team');
+                if (!noPoints) {
+                    pts.data[0].values = [HPts, APts];
+                    pts.data[0].marker.colors = colours;
+                    pts.data[0].rotation = APts / (HPts + APts) * 360;
+                    pts.layout.annotations[1].font.color = colours[0];
+                    pts.layout.annotations[2].font.color = colours[1];
+                }
+
+                return [seasons[range[0]] + ' - ' + seasons[range[1]], gd, wdl, pts];
+            },
+
+            // Colour bars, team name, name style, link styles and link
+            // targets, resolving the clicked team once.
+            teamHeader: function(clickData, teams) {
+                var team = teamName(clickData);
+                var noUpdate = window.dash_clientside.no_update;
+                if (team === null || !teams[team]) {
+                    return [colourBar('white'), colourBar('white'), 'Pick a team',
+                            noUpdate, noUpdate, noUpdate, null, null];
+                }
+                var info = teams[team];
+                return [
+                    colourBar(info.colour),
+                    colourBar(info.colour),
+                    team + ' \n' + info.suffix,
+                    {paddingTop: '2px', paddingBottom: '2px', fontSize: '19px',
+                     textAlign: 'center', height: '78px', verticalAlign: 'middle',
+                     whiteSpace: 'pre-wrap'},
+                    {color: 'white', textAlign: 'left', fontSize: '13'},
+                    {color: 'white', textAlign: 'right', fontSize: '13'},
+                    info.wiki,
+                    info.website
+                ];
+            }
+        }
+    });
+})();
@@ -0,0 +1,44 @@
+"""Time building each chart's base figure against cloning its template.
+
+Usage: ``python benchmarks/figure_templates.py [repeats]``
+
+Imports the app (which loads the dataset and builds the templates), then for
+every chart and dropdown option times the base-figure builder the callbacks
+used to run on each request and ``figure_templates.get``, which they run now.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+
+BUILDERS = [
+    ('team-pos', app.team_pos_base),
+    ('team-WDL', app.team_WDL_base),
+    ('team-GD', app.team_GD_base),
+    ('opposition-tot-pos', app.opposition_tot_pos_base),
+]
+
+
+def _time(function, repeats):
+    start = time.time()
+    for _ in range(repeats):
+        function()
+    return 1000 * (time.time() - start) / repeats
+
+
+def main(argv):
+    repeats = int(argv[1]) if len(argv) > 1 else 20
+    print('%-20s %-22s %10s %10s' % ('chart', 'option', 'build ms', 'clone ms'))
+    for chart, builder in BUILDERS:
+        options = sorted(option for key, option in app.figure_templates.keys() if key == chart)
+        for option in options:
+            build = _time(lambda: builder(option), repeats)
+            clone = _time(lambda: app.figure_templates.get((chart, option)), repeats)
+            print('%-20s %-22s %10.1f %10.1f' % (chart, option, build, clone))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
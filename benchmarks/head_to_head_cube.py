@@ -0,0 +1,82 @@
+"""Time the head-to-head summary cube against per-request filtering.
+
+Usage: ``python benchmarks/head_to_head_cube.py [matches csv] [pairs]``
+
+Builds the team x team cube once, then answers the opposition panel's
+questions (games played, W/D/L, goals, record win/loss/most goals) for a
+sample of random pairs both ways: by filtering the matches table and
+deriving the result columns per request, as the callbacks used to, and by
+lookups in the cube.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from football_data import load_dataset
+from head_to_head import HeadToHeadCube, team_perspective
+
+
+def filter_pair(df3, team_name, versus_name):
+    df3_team = df3.loc[((df3['home'] == team_name) & (df3['visitor'] == versus_name)) |
+                       ((df3['home'] == versus_name) & (df3['visitor'] == team_name))].copy()
+    df3_team['WDL'] = None
+    df3_team['GF'] = None
+    df3_team['GA'] = None
+    df3_team.loc[((df3_team.result == 'H') & (df3.home == team_name)), 'WDL'] = 'W'
+    df3_team.loc[((df3_team.result == 'A') & (df3.home == team_name)), 'WDL'] = 'L'
+    df3_team.loc[((df3_team.result == 'H') & (df3.home != team_name)), 'WDL'] = 'L'
+    df3_team.loc[((df3_team.result == 'A') & (df3.home != team_name)), 'WDL'] = 'W'
+    df3_team.loc[df3_team.result == 'D', 'WDL'] = 'D'
+    df3_team.loc[(df3.home == team_name), 'GF'] = df3_team['hgoal']
+    df3_team.loc[(df3.visitor == team_name), 'GF'] = df3_team['vgoal']
+    df3_team.loc[(df3.home != team_name), 'GA'] = df3_team['hgoal']
+    df3_team.loc[(df3.visitor != team_name), 'GA'] = df3_team['vgoal']
+    wins = (df3_team.WDL == 'W').sum()
+    draws = (df3_team.WDL == 'D').sum()
+    losses = (df3_team.WDL == 'L').sum()
+    totgoals = df3_team['GF'] + df3_team['GA']
+    return (len(df3_team), wins, draws, losses, df3_team['GF'].sum(),
+            df3_team['GA'].sum(), totgoals.max() if len(df3_team) else None)
+
+
+def cube_pair(cube, team_name, versus_name):
+    summary = cube.summary(team_name, versus_name)
+    return (summary, cube.record('win', team_name, versus_name),
+            cube.record('loss', team_name, versus_name),
+            cube.record('goals', team_name, versus_name))
+
+
+def _time(function, pairs):
+    start = time.time()
+    for team_name, versus_name in pairs:
+        function(team_name, versus_name)
+    return time.time() - start
+
+
+def main(argv):
+    matches_path = argv[1] if len(argv) > 1 else 'All_Matches_Data.csv'
+    n_pairs = int(argv[2]) if len(argv) > 2 else 200
+    df3 = load_dataset(matches_path=matches_path).matches
+
+    start = time.time()
+    cube = HeadToHeadCube(team_perspective(df3))
+    build = time.time() - start
+
+    random.seed(0)
+    teams = sorted(cube.team_ids)
+    pairs = [random.sample(teams, 2) for _ in range(n_pairs)]
+    filtered = _time(lambda team, versus: filter_pair(df3, team, versus), pairs)
+    looked_up = _time(lambda team, versus: cube_pair(cube, team, versus), pairs)
+
+    print('%d matches, %d teams, %d pairs' % (len(df3), len(teams), n_pairs))
+    print('cube build:        %8.1f ms' % (1000 * build))
+    print('filter per pair:   %8.3f ms' % (1000 * filtered / n_pairs))
+    print('cube per pair:     %8.3f ms' % (1000 * looked_up / n_pairs))
+    print('break-even after:  %8.0f requests' % (build / max(filtered / n_pairs - looked_up / n_pairs, 1e-9)))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,77 @@
+"""Count the server requests one Map click causes and the CPU they take.
+
+Usage: ``python benchmarks/map_click.py [team] [repeats]``
+
+When a team is clicked, every server callback with the clicked team (the
+``team-click`` Store, set in the browser from the Map's ``clickData``) as an
+input fires, one HTTP request each; clientside callbacks cost none.
+The script posts those requests to the app's Flask server through the test
+client, as the browser would (other inputs keep their layout values), and
+reports the number of requests, the response bytes and the server CPU time
+of one click.  Run it on two revisions to compare them.
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+from static_export import callback_outputs, layout_components
+
+process_time = time.process_time if hasattr(time, 'process_time') else time.clock
+
+
+def click_requests(team):
+    components = layout_components(app.app.layout)
+    click = {'points': [{'text': team}]}
+    requests = []
+    for key, callback in app.app.callback_map.items():
+        # Clientside callbacks are listed too, with no server function.
+        if 'callback' not in callback:
+            continue
+        if not any(i['id'] == 'team-click' and i['property'] == 'data' for i in callback['inputs']):
+            continue
+        outputs, multi = callback_outputs(key)
+
+        def value(item):
+            if item['id'] == 'team-click' and item['property'] == 'data':
+                return click
+            return getattr(components.get(item['id']), item['property'], None)
+
+        requests.append((key, dict(
+            output=key,
+            outputs=outputs if multi else outputs[0],
+            inputs=[dict(item, value=value(item)) for item in callback['inputs']],
+            state=[dict(item, value=value(item)) for item in callback.get('state', [])],
+            changedPropIds=['team-click.data'],
+        )))
+    return requests
+
+
+def main(argv):
+    team = argv[1] if len(argv) > 1 else 'Arsenal'
+    repeats = int(argv[2]) if len(argv) > 2 else 5
+    client = app.server.test_client()
+    requests = click_requests(team)
+
+    cpu = dict((key, 0.0) for key, body in requests)
+    size = {}
+    for _ in range(repeats):
+        for key, body in requests:
+            start = process_time()
+            response = client.post('/_dash-update-component', data=json.dumps(body),
+                                   content_type='application/json')
+            cpu[key] += process_time() - start
+            size[key] = len(response.data)
+
+    print('%-70s %10s %10s' % ('callback', 'bytes', 'cpu ms'))
+    for key, body in requests:
+        print('%-70s %10d %10.1f' % (key[:70], size[key], 1000 * cpu[key] / repeats))
+    print('%d requests per click, %d bytes, %.1f ms server CPU' % (
+        len(requests), sum(size.values()), 1000 * sum(cpu.values()) / repeats))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,276 @@
+"""Small caches shared by the data and callback layers.
+
+``LRUCache`` keeps values in process memory and ``FileCache`` keeps them,
+pickled, in a directory that several processes can share; both have the
+same ``get``/``put``/``stats`` interface, an optional bound on the number of
+entries and an optional time to live.  ``Memoizer`` caches the results of
+functions in either of them, keyed by a version string as well as the
+arguments, and counts the compute time its hits saved.
+"""
+import functools
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+# FileCache lists its directory to enforce maxsize once per this many writes.
+PRUNE_INTERVAL = 100
+
+
+class LRUCache(object):
+    """Mapping of at most ``maxsize`` entries, evicting the least recently
+    used one first and counting hits, misses and evictions.  With ``ttl``
+    set, entries older than ``ttl`` seconds count as missing."""
+
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                stored, value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            if self.ttl is not None and time.time() - stored > self.ttl:
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data[key] = (stored, value)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (time.time(), value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            expirations=self.expirations,
+            size=len(self._data),
+            maxsize=self.maxsize,
+            ttl=self.ttl,
+            hit_ratio=float(self.hits) / lookups if lookups else 0.0,
+        )
+
+
+class FileCache(object):
+    """``LRUCache`` counterpart keeping pickled values in ``directory``, one
+    file per key, so the entries are shared by every process using the
+    directory and outlive them.  A hit refreshes the file's modification
+    time and an expired entry's file is removed when it is read.  Every
+    ``prune_interval`` writes, the least recently used files past
+    ``maxsize`` are removed, so the directory can exceed ``maxsize`` by up
+    to that many files in between.  The counters are per process."""
+
+    def __init__(self, directory, maxsize=None, ttl=None, prune_interval=PRUNE_INTERVAL):
+        self.directory = directory
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.prune_interval = prune_interval
+        self._writes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(repr(key).encode('utf-8')).hexdigest())
+
+    def _files(self):
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                if '.tmp' not in name]
+
+    def __len__(self):
+        return len(self._files())
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key, default=None):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                stored, value = pickle.load(f)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return default
+        if self.ttl is not None and time.time() - stored > self.ttl:
+            self.expirations += 1
+            self.misses += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return default
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        tmp_path = '%s.%d.%d.tmp' % (path, os.getpid(), threading.current_thread().ident)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((time.time(), value), f, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_path, path)
+        if self.maxsize is not None:
+            with self._lock:
+                self._writes += 1
+                due = self._writes % self.prune_interval == 0
+            if due:
+                self._prune()
+
+    def _prune(self):
+        files = self._files()
+        if len(files) <= self.maxsize:
+            return
+        used = []
+        for path in files:
+            try:
+                used.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+        used.sort()
+        for _, path in used[:len(used) - self.maxsize]:
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except OSError:
+                pass
+
+    def get_or_compute(self, key, compute):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        for path in self._files():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            expirations=self.expirations,
+            size=len(self),
+            maxsize=self.maxsize,
+            ttl=self.ttl,
+            directory=self.directory,
+            hit_ratio=float(self.hits) / lookups if lookups else 0.0,
+        )
+
+
+def _freeze(value):
+    # A hashable, repr-stable stand-in for an argument built from dicts,
+    # lists and scalars.
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class Memoizer(object):
+    """Caches function results in ``backend`` (an ``LRUCache`` or a
+    ``FileCache``) under the function's name, ``version`` and arguments.
+
+    ``memoize(name)`` decorates a function whose result depends only on its
+    arguments and on data that ``version`` identifies.  ``key`` maps the
+    arguments to what the result really depends on, and ``encode`` the
+    result to what is stored and returned.  Exceptions are not cached.
+    ``stats`` gives each function's hits, misses, the seconds spent
+    computing the misses and the seconds the hits saved.
+    """
+
+    def __init__(self, backend, version):
+        self.backend = backend
+        self.version = version
+        self._functions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def memoize(self, name, key=None, encode=None):
+        def decorate(function):
+            counters = self._functions.setdefault(name, dict(
+                hits=0, misses=0, compute_seconds=0.0, saved_seconds=0.0))
+
+            @functools.wraps(function)
+            def memoized(*args):
+                cache_key = (name, self.version, _freeze(key(*args) if key else args))
+                entry = self.backend.get(cache_key)
+                if entry is not None:
+                    value, seconds = entry
+                    with self._lock:
+                        counters['hits'] += 1
+                        counters['saved_seconds'] += seconds
+                    return value
+                start = time.time()
+                value = function(*args)
+                if encode is not None:
+                    value = encode(value)
+                seconds = time.time() - start
+                self.backend.put(cache_key, (value, seconds))
+                with self._lock:
+                    counters['misses'] += 1
+                    counters['compute_seconds'] += seconds
+                return value
+
+            return memoized
+        return decorate
+
+    def stats(self):
+        with self._lock:
+            functions = OrderedDict()
+            for name, counters in self._functions.items():
+                lookups = counters['hits'] + counters['misses']
+                functions[name] = dict(
+                    counters, hit_ratio=float(counters['hits']) / lookups if lookups else 0.0)
+        return dict(version=self.version, backend=self.backend.stats(), functions=functions)
@@ -0,0 +1,122 @@
+"""Base figures built once at startup and handed out as copies."""
+import copy
+import json
+
+import plotly.graph_objs as go
+import plotly.utils
+
+
+def _encode(value):
+    return json.dumps(value, cls=plotly.utils.PlotlyJSONEncoder, sort_keys=True)
+
+
+def _changes(new, old, shared=None):
+    # Top-level keys of ``new`` that differ from ``old``; keys only ``old``
+    # has map to None, which the client deletes.  Values found in
+    # ``shared`` (encoded value -> trace index, per key) are sent as
+    # ``{'_from': index}``, a reference to that trace of the template.
+    changes = {}
+    for key, value in new.items():
+        encoded = _encode(value)
+        if key in old and encoded == _encode(old[key]):
+            continue
+        if shared is not None and encoded in shared.get(key, {}):
+            value = {'_from': shared[key][encoded]}
+        changes[key] = value
+    for key in old:
+        if key not in new:
+            changes[key] = None
+    return changes
+
+
+def _shared_values(figure):
+    # The array properties of the figure's traces, encoded, for _changes.
+    shared = {}
+    for i, trace in enumerate(figure['data']):
+        for key, value in trace.items():
+            if isinstance(value, (list, tuple)) or hasattr(value, 'shape'):
+                shared.setdefault(key, {}).setdefault(_encode(value), i)
+    return shared
+
+
+class FigureTemplates(object):
+    """Prebuilt figures keyed by chart and dropdown option.
+
+    ``add`` stores a figure as a plain dict; ``get`` returns a new figure
+    built from a deep copy of it without validating it again, which costs a
+    fraction of building the figure trace by trace.  The stored templates
+    are never handed out, so callbacks may modify what they get freely.
+
+    For charts whose templates are also shipped to the browser (``store``),
+    ``patch`` reduces a figure to what differs from its template, for the
+    ``applyPatch`` clientside function to merge back in.
+    """
+
+    def __init__(self):
+        self._figures = {}
+        self._shared = {}
+
+    def add(self, key, figure):
+        self._figures[key] = figure.to_dict()
+
+    def get(self, key):
+        return go.Figure(copy.deepcopy(self._figures[key]), _validate=False)
+
+    def __contains__(self, key):
+        return key in self._figures
+
+    def __len__(self):
+        return len(self._figures)
+
+    def keys(self):
+        return list(self._figures)
+
+    @staticmethod
+    def name(key):
+        return '%s/%s' % key
+
+    def store(self, charts):
+        """The templates of ``charts`` for a ``dcc.Store``: ``names`` maps
+        each template's name to one of the distinct ``figures``.  The plotly
+        layout templates the figures use (mostly the same one) are sent once,
+        in ``templates``, and referred to as ``{'_template': id}``."""
+        names, figures, ids = {}, {}, {}
+        templates, template_ids = {}, {}
+        for key in sorted(self._figures):
+            if key[0] not in charts:
+                continue
+            figure = self._figures[key]
+            template = figure['layout'].get('template')
+            if template is not None:
+                encoded = _encode(template)
+                if encoded not in template_ids:
+                    template_ids[encoded] = str(len(template_ids))
+                    templates[template_ids[encoded]] = template
+                figure = dict(figure, layout=dict(
+                    figure['layout'], template={'_template': template_ids[encoded]}))
+            encoded = _encode(figure)
+            if encoded not in ids:
+                ids[encoded] = str(len(ids))
+                figures[ids[encoded]] = figure
+            names[self.name(key)] = ids[encoded]
+        return dict(names=names, figures=figures, templates=templates)
+
+    def patch(self, key, figure):
+        """What turns template ``key`` into ``figure``: the changed top-level
+        properties of each trace and of the layout.  When the traces don't
+        line up with the template's, all of them are sent in ``traces``."""
+        base = self._figures[key]
+        if key not in self._shared:
+            self._shared[key] = _shared_values(base)
+        shared = self._shared[key]
+        new = figure.to_dict()
+        patch = dict(base=self.name(key), layout=_changes(new['layout'], base['layout']))
+        if [trace.get('type') for trace in new['data']] != [trace.get('type') for trace in base['data']]:
+            patch['traces'] = [_changes(trace, {}, shared) for trace in new['data']]
+        else:
+            patch['data'] = {}
+            for i, (trace, base_trace) in enumerate(zip(new['data'], base['data'])):
+                changes = _changes(trace, base_trace, shared)
+                if changes:
+                    patch['data'][str(i)] = changes
+        return patch
@@ -0,0 +1,509 @@
+"""Loading of the football datasets used by the app.
+
+Parsing ``All_Team_Data.xlsx`` means reading every sheet of the workbook,
+which takes several seconds.  The parsed sheets are therefore written to a
+binary cache next to the workbook the first time they are read, one file per
+sheet, and every later start loads that cache instead.  Caches are keyed by
+the size and modification time of their source, so editing the workbook
+makes the old cache stale and it is rebuilt on the next start.
+
+``open_workbook`` gives lazy access to a cached workbook: a sheet is only
+read from disk the first time it is looked up, and a bounded LRU keeps the
+recently used sheets in memory.
+
+The per-team sheets of ``All_Team_Data.xlsx`` all share the same 131
+seasons, so ``load_season_table`` stacks them into one long table indexed by
+``(team_id, season_idx)`` with compact dtypes.  The columns every sheet
+repeats (the number of teams in each tier) are kept once, in the ``Master``
+seasons table, and a single team's rows are a contiguous slice of the long
+table.
+
+The team-season stats and the matches table are then written to a store of
+fixed-width NumPy arrays, one ``.npy`` file per column, with text columns
+(team names included) dictionary-encoded as integer ids.  ``load_dataset``
+opens that store with ``np.load(mmap_mode='r')``: opening it costs the same
+whatever the size of the data, and the gunicorn workers and any offline jobs
+reading it share a single copy in the page cache.  Text columns are held as
+categoricals everywhere so that, when the data is loaded in the gunicorn
+master before it forks, the workers can also share it copy-on-write.
+"""
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+import numpy as np
+import pandas as pd
+
+from caching import LRUCache
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.data_cache')
+TEAM_CACHE_SIZE = 32
+
+SEASON_COLUMNS = ['Season', 'Teams_total', 'Teams_in_Tier_1', 'Teams_in_Tier_2',
+                  'Teams_in_Tier_3', 'Teams_in_Tier_4', 'Zeros']
+STAT_COLUMNS = ['Pld', 'W', 'D', 'L', 'GF', 'GA', 'GD',
+                'HW', 'HD', 'HL', 'HF', 'HA', 'HGD',
+                'AW', 'AD', 'AL', 'AF', 'AA', 'AGD',
+                'HPts', 'APts', 'Pts', 'Max_Pts', 'Pos', 'TotPos']
+
+
+def source_fingerprint(path):
+    stat = os.stat(path)
+    return '%d-%d' % (stat.st_size, int(stat.st_mtime))
+
+
+def _cache_path(path, cache_dir):
+    name = os.path.basename(path)
+    return os.path.join(cache_dir, '%s.%s' % (name, source_fingerprint(path)))
+
+
+def _remove_stale(cache_path, prefix):
+    cache_dir, current = os.path.split(cache_path)
+    for entry in os.listdir(cache_dir):
+        if entry.startswith(prefix) and entry != current and '.tmp' not in entry:
+            shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+
+
+def _write_cache(sheets, cache_path):
+    tmp_path = '%s.%d.tmp' % (cache_path, os.getpid())
+    os.makedirs(tmp_path)
+    for i, frame in enumerate(sheets.values()):
+        pd.to_pickle(frame, os.path.join(tmp_path, '%d.pkl' % i))
+    pd.to_pickle(list(sheets), os.path.join(tmp_path, 'sheets.pkl'))
+    try:
+        os.rename(tmp_path, cache_path)
+    except OSError:
+        # Another worker finished building the same cache first.
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    _remove_stale(cache_path, os.path.basename(cache_path).rsplit('.', 1)[0] + '.')
+
+
+def _build_cache(path, cache_dir):
+    cache_path = _cache_path(path, cache_dir)
+    if not os.path.exists(os.path.join(cache_path, 'sheets.pkl')):
+        shutil.rmtree(cache_path, ignore_errors=True)
+        _write_cache(pd.read_excel(path, sheet_name=None), cache_path)
+    return cache_path
+
+
+class LazyWorkbook(Mapping):
+    """Read-only ``{sheet name: DataFrame}`` mapping over a workbook cache
+    that loads each sheet on first access and keeps the most recently used
+    ``maxsize`` of them in memory."""
+
+    def __init__(self, cache_path, maxsize=TEAM_CACHE_SIZE):
+        sheet_names = pd.read_pickle(os.path.join(cache_path, 'sheets.pkl'))
+        self._files = OrderedDict(
+            (name, os.path.join(cache_path, '%d.pkl' % i))
+            for i, name in enumerate(sheet_names))
+        self._sheets = LRUCache(maxsize)
+
+    def __getitem__(self, name):
+        frame = self._sheets.get(name)
+        if frame is None:
+            frame = pd.read_pickle(self._files[name])
+            self._sheets.put(name, frame)
+        return frame
+
+    def __iter__(self):
+        return iter(self._files)
+
+    def __len__(self):
+        return len(self._files)
+
+    def __contains__(self, name):
+        return name in self._files
+
+    def load(self, name):
+        """Read sheet ``name`` from disk without going through the LRU."""
+        return pd.read_pickle(self._files[name])
+
+    def stats(self):
+        return self._sheets.stats()
+
+
+def open_workbook(path, cache_dir=CACHE_DIR, maxsize=TEAM_CACHE_SIZE):
+    """Return a ``LazyWorkbook`` for ``path``, building its cache first if
+    it is missing or stale."""
+    return LazyWorkbook(_build_cache(path, cache_dir), maxsize)
+
+
+def read_excel_cached(path, cache_dir=CACHE_DIR):
+    """Return every sheet of ``path`` as ``pd.read_excel(sheet_name=None)``
+    would, loading from the binary cache when it is up to date."""
+    workbook = open_workbook(path, cache_dir)
+    return OrderedDict((name, workbook.load(name)) for name in workbook)
+
+
+def build_season_table(sheets):
+    """Stack the per-team sheets of ``sheets`` into one long table.
+
+    Returns ``(table, seasons, teams)``: ``table`` has one row per (team,
+    season), ordered by ``teams`` then season, and ``seasons`` is the
+    ``Master`` sheet with the per-season columns shared by every team.
+    """
+    master = sheets['Master']
+    season_labels = master['Season'].values
+    n_seasons = len(season_labels)
+    teams = [name for name in sheets if name != 'Master']
+
+    stats = []
+    divisions = []
+    for team in teams:
+        frame = sheets[team].set_index('Season').reindex(season_labels)
+        stats.append(frame[STAT_COLUMNS].values.astype(np.float32))
+        divisions.append(frame['Division'].values)
+
+    index = pd.MultiIndex.from_arrays(
+        [np.repeat(np.arange(len(teams), dtype=np.int16), n_seasons),
+         np.tile(np.arange(n_seasons, dtype=np.int16), len(teams))],
+        names=['team_id', 'season_idx'])
+    table = pd.DataFrame(np.concatenate(stats), index=index, columns=STAT_COLUMNS)
+    table.insert(0, 'Division', pd.Categorical(np.concatenate(divisions)))
+    table.insert(0, 'Season', pd.Categorical.from_codes(
+        np.tile(np.arange(n_seasons), len(teams)), categories=season_labels))
+
+    seasons = master[SEASON_COLUMNS].copy()
+    for column in SEASON_COLUMNS[1:-1]:
+        seasons[column] = seasons[column].astype(np.float32)
+    seasons['Zeros'] = seasons['Zeros'].astype(np.int8)
+
+    return table, seasons, teams
+
+
+class SeasonTable(Mapping):
+    """``{team: DataFrame}`` view of the long season table.
+
+    ``self['Master']`` is the per-season table and ``self[team]`` is that
+    team's slice of ``table`` with a 0..130 season index, sharing memory
+    with the long table.  The slices are kept in a bounded LRU so that the
+    callbacks of one click reuse the same frame.
+
+    ``prefix_sums`` holds every team's running totals of its stat columns,
+    computed once, so a team's totals over any range of seasons are one
+    subtraction of two rows.
+    """
+
+    def __init__(self, table, seasons, teams, maxsize=TEAM_CACHE_SIZE):
+        self.table = table
+        self.seasons = seasons
+        self.teams = teams
+        self.team_ids = dict((team, i) for i, team in enumerate(self.teams))
+        self._frames = LRUCache(maxsize)
+        self._prefix_sums = None
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        if name == 'Master':
+            return self.seasons
+        frame = self._frames.get(name)
+        if frame is None:
+            start = self.team_ids[name] * len(self.seasons)
+            frame = self.table.iloc[start:start + len(self.seasons)]
+            frame.index = self.seasons.index
+            self._frames.put(name, frame)
+        return frame
+
+    def __iter__(self):
+        yield 'Master'
+        for team in self.teams:
+            yield team
+
+    def __len__(self):
+        return len(self.teams) + 1
+
+    def __contains__(self, name):
+        return name == 'Master' or name in self.team_ids
+
+    def prefix_sums(self):
+        """The ``(teams, seasons + 1, STAT_COLUMNS)`` array whose row ``s``
+        for a team holds its stat totals over seasons ``0 .. s - 1``, NaN
+        counted as 0.  Built on first use; call it before forking workers to
+        share it."""
+        with self._lock:
+            if self._prefix_sums is None:
+                values = np.nan_to_num(self.table[STAT_COLUMNS].values.astype(np.float64))
+                values = values.reshape(len(self.teams), len(self.seasons), len(STAT_COLUMNS))
+                sums = np.zeros((len(self.teams), len(self.seasons) + 1, len(STAT_COLUMNS)))
+                np.cumsum(values, axis=1, out=sums[:, 1:])
+                self._prefix_sums = sums
+            return self._prefix_sums
+
+    def stats(self):
+        return self._frames.stats()
+
+
+def load_season_table(path, cache_dir=CACHE_DIR, maxsize=TEAM_CACHE_SIZE):
+    """Return the ``SeasonTable`` for the team workbook at ``path``, building
+    and caching the long table next to the sheet cache on first use."""
+    cache_path = _build_cache(path, cache_dir)
+    table_path = os.path.join(cache_path, 'season_table.pkl')
+    if not os.path.exists(table_path):
+        workbook = LazyWorkbook(cache_path)
+        season_table = build_season_table(
+            OrderedDict((name, workbook.load(name)) for name in workbook))
+        tmp_path = '%s.%d.tmp' % (table_path, os.getpid())
+        pd.to_pickle(season_table, tmp_path)
+        os.rename(tmp_path, table_path)
+    table, seasons, teams = pd.read_pickle(table_path)
+    return SeasonTable(table, seasons, teams, maxsize)
+
+
+def _is_text(dtype):
+    if isinstance(dtype, pd.CategoricalDtype):
+        return False
+    return dtype == object or pd.api.types.is_string_dtype(dtype)
+
+
+def freeze_frame(frame):
+    """Convert the text columns of ``frame`` to categoricals in place.
+
+    The values then live in integer code arrays instead of one Python string
+    object per cell, so reading them does not write reference counts into
+    pages a forked worker shares with the master.
+    """
+    for column in frame.columns:
+        if _is_text(frame[column].dtype):
+            frame[column] = frame[column].astype('category')
+    return frame
+
+
+def _season_year(season):
+    # Seasons are either a start year (1888) or a label ('1888/89').
+    return int(str(season)[:4])
+
+
+def _memory_report(before, after):
+    lines = ['%-12s %10s %10s' % ('column', 'before', 'after')]
+    for column in after.index:
+        lines.append('%-12s %10d %10d' % (column, before.get(column, 0), after[column]))
+    lines.append('%-12s %10d %10d' % ('total', before.sum(), after.sum()))
+    return '\n'.join(lines)
+
+
+def read_matches(path, seasons, verbose=True):
+    """Read the matches CSV at ``path`` into a compact DataFrame.
+
+    ``home`` and ``visitor`` become categoricals sharing one list of teams,
+    the other text columns become categoricals, integer columns are
+    downcast to the smallest type that holds them, ``Date`` is parsed to
+    datetime64 and a ``season_idx`` column gives each match's row in
+    ``seasons`` (the ``Master`` table).  With ``verbose`` the memory used by
+    each column before and after the conversion is printed.
+    """
+    matches = pd.read_csv(path)
+    before = matches.memory_usage(index=True, deep=True)
+
+    teams = sorted(set(matches['home'].dropna()) | set(matches['visitor'].dropna()))
+    for column in matches.columns:
+        values = matches[column]
+        if column in ('home', 'visitor'):
+            matches[column] = pd.Categorical(values, categories=teams)
+        elif column == 'Date':
+            matches[column] = pd.to_datetime(values)
+        elif _is_text(values.dtype):
+            matches[column] = values.astype('category')
+        elif pd.api.types.is_integer_dtype(values.dtype):
+            matches[column] = pd.to_numeric(values, downcast='integer')
+
+    first_year = _season_year(seasons['Season'].iloc[0])
+    years = matches['Season'].map(_season_year) if _is_text(
+        matches['Season'].dtype) else matches['Season']
+    matches['season_idx'] = (years - first_year).astype(np.int16)
+
+    if verbose:
+        print('%s memory use (bytes):' % os.path.basename(path))
+        print(_memory_report(before, matches.memory_usage(index=True, deep=True)))
+    return matches
+
+
+def _save_array(store_path, name, array):
+    np.save(os.path.join(store_path, name + '.npy'), np.ascontiguousarray(array))
+
+
+def _load_array(store_path, name):
+    return np.load(os.path.join(store_path, name + '.npy'), mmap_mode='r')
+
+
+def _encode_columns(frame, store_path, prefix, shared_categories=None):
+    """Write each column of ``frame`` as a fixed-width array file and return
+    the column specs needed to read them back.
+
+    Text and categorical columns are stored as integer codes.  Columns named
+    in ``shared_categories`` (a ``{column: categories}`` dict) are encoded
+    against the given categories so that they share one dictionary.
+    """
+    shared_categories = shared_categories or {}
+    specs = []
+    for i, column in enumerate(frame.columns):
+        values = frame[column]
+        spec = dict(name=column, file='%s.%d' % (prefix, i))
+        if column in shared_categories:
+            values = pd.Categorical(values, categories=shared_categories[column])
+            spec['shared'] = True
+        elif _is_text(values.dtype) or isinstance(values.dtype, pd.CategoricalDtype):
+            values = pd.Categorical(values)
+            spec['categories'] = [str(c) for c in values.categories]
+        if isinstance(values, pd.Categorical):
+            spec['kind'] = 'category'
+            _save_array(store_path, spec['file'], values.codes)
+        else:
+            spec['kind'] = 'numeric'
+            _save_array(store_path, spec['file'], values.values)
+        specs.append(spec)
+    return specs
+
+
+def _categorical(codes, categories):
+    # The codes were saved with the dtype pandas picks for this many
+    # categories, so the Categorical wraps the memory-mapped array without
+    # copying it; validate=False (pandas 2.1 and later) also skips scanning
+    # it, which would read every page.
+    try:
+        return pd.Categorical.from_codes(codes, categories=categories, validate=False)
+    except TypeError:
+        return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def _decode_columns(store_path, specs, shared_categories=None):
+    columns = OrderedDict()
+    for spec in specs:
+        values = _load_array(store_path, spec['file'])
+        if spec['kind'] == 'category':
+            if spec.get('shared'):
+                categories = shared_categories[spec['name']]
+            else:
+                categories = spec['categories']
+            values = _categorical(values, categories)
+        columns[spec['name']] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+def _store_path(teams_path, matches_path, cache_dir):
+    return os.path.join(cache_dir, 'store.%s.%s' % (
+        source_fingerprint(teams_path), source_fingerprint(matches_path)))
+
+
+def build_store(teams_path, matches_path, store_path, cache_dir=CACHE_DIR):
+    """Write the team-season stats and the matches table to ``store_path``
+    as one ``.npy`` file per column plus a ``meta.json`` describing them.
+
+    Team names in the ``home`` and ``visitor`` columns are encoded as ids
+    into a single list of every team that appears in either.
+    """
+    season_table = load_season_table(teams_path, cache_dir)
+    matches = read_matches(matches_path, season_table.seasons)
+
+    tmp_path = '%s.%d.tmp' % (store_path, os.getpid())
+    os.makedirs(tmp_path)
+
+    table = season_table.table
+    _save_array(tmp_path, 'team_stats', table[STAT_COLUMNS].values)
+    match_teams = [str(team) for team in matches['home'].cat.categories]
+    meta = dict(
+        teams=season_table.teams,
+        seasons=_encode_columns(season_table.seasons, tmp_path, 'seasons'),
+        team_divisions=_encode_columns(table[['Division']], tmp_path, 'team_divisions'),
+        match_teams=match_teams,
+        matches=_encode_columns(matches, tmp_path, 'matches', dict(
+            home=match_teams, visitor=match_teams)),
+    )
+    with open(os.path.join(tmp_path, 'meta.json'), 'w') as meta_file:
+        json.dump(meta, meta_file)
+
+    try:
+        os.rename(tmp_path, store_path)
+    except OSError:
+        # Another worker finished building the same store first.
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    _remove_stale(store_path, 'store.')
+
+
+def open_store(store_path, maxsize=TEAM_CACHE_SIZE):
+    """Open the store at ``store_path`` and return ``(teams, matches)``.
+
+    Every column is memory-mapped read-only and wrapped without a copy, the
+    category codes included, so all the processes using the store share one
+    copy of it in the page cache.  Opening it does not read the data itself,
+    except that pandas before 2.1 scans the category codes to validate them
+    and pandas before 2.0, which holds dates only in nanoseconds, converts
+    (and so copies) a date column stored at another resolution.
+    """
+    with open(os.path.join(store_path, 'meta.json')) as meta_file:
+        meta = json.load(meta_file)
+
+    seasons = _decode_columns(store_path, meta['seasons'])
+    teams = meta['teams']
+    n_seasons = len(seasons)
+    index = pd.MultiIndex.from_arrays(
+        [np.repeat(np.arange(len(teams), dtype=np.int16), n_seasons),
+         np.tile(np.arange(n_seasons, dtype=np.int16), len(teams))],
+        names=['team_id', 'season_idx'])
+    table = pd.DataFrame(_load_array(store_path, 'team_stats'),
+                         index=index, columns=STAT_COLUMNS, copy=False)
+    divisions = _decode_columns(store_path, meta['team_divisions'])
+    table.insert(0, 'Division', divisions['Division'].values)
+    table.insert(0, 'Season', pd.Categorical.from_codes(
+        np.tile(np.arange(n_seasons), len(teams)), categories=seasons['Season']))
+
+    match_teams = meta['match_teams']
+    matches = _decode_columns(store_path, meta['matches'], dict(
+        home=match_teams, visitor=match_teams))
+
+    return SeasonTable(table, seasons, teams, maxsize), matches
+
+
+class Dataset(object):
+    """The three datasets the app reads, loaded once per process.
+
+    ``version`` identifies the source files the data was loaded from, for
+    use in cache keys that must change when the data does.
+    """
+
+    def __init__(self, coordinates, teams, matches, version):
+        self.coordinates = coordinates
+        self.teams = teams
+        self.matches = matches
+        self.version = version
+
+
+_dataset = None
+
+
+def load_dataset(coordinates_path='All_Teams_Coordinates.xlsx',
+                 teams_path='All_Team_Data.xlsx',
+                 matches_path='All_Matches_Data.csv',
+                 cache_dir=CACHE_DIR):
+    """Load (once) and return the ``Dataset``.
+
+    The team and match data are opened from the memory-mapped store, which
+    is built first if it is missing or older than its sources.  Call this in
+    the gunicorn master (``preload_app``) so that the workers forked from it
+    share the loaded data copy-on-write instead of each building their own.
+    """
+    global _dataset
+    if _dataset is None:
+        coordinates = read_excel_cached(coordinates_path, cache_dir)
+        for frame in coordinates.values():
+            freeze_frame(frame)
+        store_path = _store_path(teams_path, matches_path, cache_dir)
+        if not os.path.exists(os.path.join(store_path, 'meta.json')):
+            shutil.rmtree(store_path, ignore_errors=True)
+            build_store(teams_path, matches_path, store_path, cache_dir)
+        teams, matches = open_store(store_path)
+        version = '%s.%s' % (source_fingerprint(coordinates_path),
+                             os.path.basename(store_path)[len('store.'):])
+        _dataset = Dataset(coordinates, teams, matches, version)
+    return _dataset
+
+
+if __name__ == '__main__':
+    # Build the caches and the store ahead of deploying.
+    load_dataset()
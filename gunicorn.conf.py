@@ -0,0 +1,20 @@
+"""gunicorn settings for serving ``app:server``.
+
+Run with ``gunicorn -c gunicorn.conf.py app:server``.  The app module, and
+with it the dataset, is imported once in the master process; the workers are
+forked from it and share the loaded data copy-on-write.
+"""
+import gc
+import multiprocessing
+
+bind = '0.0.0.0:8050'
+workers = multiprocessing.cpu_count() * 2 + 1
+preload_app = True
+
+
+def when_ready(server):
+    # Everything allocated so far is long-lived.  Moving it out of the
+    # collector's generations stops gc passes in the workers from writing to
+    # (and so un-sharing) the pages holding the dataset.
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
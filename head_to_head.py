@@ -0,0 +1,325 @@
+"""Head-to-head lookups over the matches table."""
+import numpy as np
+import pandas as pd
+
+from caching import LRUCache
+
+HEAD_TO_HEAD_CACHE_SIZE = 256
+
+# Columns the matches table sorts by, where it isn't the column itself: the
+# score sorts by goal difference, then total goals.
+SORT_KEYS = dict(FT=['diff', 'totgoals'])
+
+
+def _pair_keys(home_ids, visitor_ids):
+    # Unordered pair -> one integer: the smaller id in the high 16 bits.
+    home_ids = home_ids.astype(np.int64)
+    visitor_ids = visitor_ids.astype(np.int64)
+    return (np.minimum(home_ids, visitor_ids) << 16) | np.maximum(home_ids, visitor_ids)
+
+
+def _perspective_columns(matches, is_home):
+    # Result, goals and venue of each match from one side, ``is_home`` telling
+    # whether that side was the home team.
+    result = np.asarray(matches['result'])
+    hgoal = np.asarray(matches['hgoal'])
+    vgoal = np.asarray(matches['vgoal'])
+    gf = np.where(is_home, hgoal, vgoal)
+    ga = np.where(is_home, vgoal, hgoal)
+    wdl = np.select([result == 'D', (result == 'H') == is_home], ['D', 'W'], 'L')
+    return [
+        ('WDL', wdl),
+        ('GF', gf),
+        ('GA', ga),
+        ('diff', gf - ga),
+        ('HA', np.where(is_home, 'H', 'A')),
+        ('totgoals', gf + ga),
+    ]
+
+
+def team_perspective(matches):
+    """Every match seen from both sides: two rows per match.
+
+    ``match`` is the row position in ``matches``; ``team`` and ``opponent``
+    share the categories of ``home`` and ``visitor``.  The derived columns
+    are those of ``HeadToHead.between``, computed for all teams in one pass.
+    """
+    n = len(matches)
+    is_home = np.concatenate([np.ones(n, dtype=bool), np.zeros(n, dtype=bool)])
+    sides = pd.concat([matches, matches], ignore_index=True)
+    home, visitor = matches['home'], matches['visitor']
+    if hasattr(home, 'cat'):
+        team = pd.Categorical.from_codes(
+            np.concatenate([home.cat.codes.values, visitor.cat.codes.values]),
+            categories=home.cat.categories)
+        opponent = pd.Categorical.from_codes(
+            np.concatenate([visitor.cat.codes.values, home.cat.codes.values]),
+            categories=home.cat.categories)
+    else:
+        team = np.concatenate([home.values, visitor.values])
+        opponent = np.concatenate([visitor.values, home.values])
+    view = pd.DataFrame({
+        'match': np.tile(np.arange(n, dtype=np.int32), 2),
+        'team': team,
+        'opponent': opponent,
+    }, columns=['match', 'team', 'opponent'])
+    for column in ('Season', 'season_idx'):
+        if column in matches:
+            view[column] = sides[column].values
+    for column, values in _perspective_columns(sides, is_home):
+        if column in ('WDL', 'HA'):
+            values = pd.Categorical(values)
+        view[column] = values
+    return view
+
+
+class PairIndex(object):
+    """Row positions of the matches played between each pair of teams.
+
+    Built once from the ``home`` and ``visitor`` columns of the matches
+    table; ``rows(team, opponent)`` then costs a dictionary lookup instead of
+    four string comparisons over every match.  Rows added to the table
+    later are indexed with ``append``.
+    """
+
+    def __init__(self, matches):
+        self.team_ids = {}
+        self._rows = {}
+        self._n_rows = 0
+        self.append(matches)
+
+    def _ids(self, names):
+        ids = np.empty(len(names), dtype=np.int64)
+        for i, name in enumerate(names):
+            ids[i] = self.team_ids.setdefault(name, len(self.team_ids))
+        return ids
+
+    def _team_codes(self, column):
+        if hasattr(column, 'cat'):
+            ids = self._ids(list(column.cat.categories))
+            codes = column.cat.codes.values
+            return np.where(codes >= 0, ids[codes], -1)
+        names, codes = np.unique(column.astype(str).values, return_inverse=True)
+        return self._ids(list(names))[codes]
+
+    def append(self, matches):
+        """Index ``matches``, the rows that follow the ones indexed so far."""
+        home_ids = self._team_codes(matches['home'])
+        visitor_ids = self._team_codes(matches['visitor'])
+        keys = _pair_keys(home_ids, visitor_ids)
+        order = np.argsort(keys, kind='mergesort')
+        sorted_keys = keys[order]
+        unique_keys, starts = np.unique(sorted_keys, return_index=True)
+        stops = np.append(starts[1:], len(sorted_keys))
+        for key, start, stop in zip(unique_keys.tolist(), starts, stops):
+            rows = order[start:stop] + self._n_rows
+            if key in self._rows:
+                rows = np.concatenate([self._rows[key], rows])
+            self._rows[key] = rows
+        self._n_rows += len(keys)
+
+    def rows(self, team, opponent):
+        """Positions, in table order, of the matches between ``team`` and
+        ``opponent``."""
+        team_id = self.team_ids.get(team)
+        opponent_id = self.team_ids.get(opponent)
+        if team_id is None or opponent_id is None:
+            return np.empty(0, dtype=np.int64)
+        key = int(_pair_keys(np.array([team_id]), np.array([opponent_id]))[0])
+        return self._rows.get(key, np.empty(0, dtype=np.int64))
+
+    def __len__(self):
+        return self._n_rows
+
+
+class HeadToHeadCube(object):
+    """Dense team x team summary of every head-to-head record.
+
+    Built in one grouped pass over a ``team_perspective`` view.  Entry
+    ``[i, j]`` of ``W``, ``D``, ``L``, ``GF``, ``GA`` and ``games`` is team
+    ``i``'s record against team ``j`` (ids in ``team_ids``).  ``records``
+    holds, for ``'win'``, ``'loss'`` and ``'goals'``, the row in the matches
+    table of the pair's biggest win, biggest loss and highest-scoring match
+    (-1 when there is none) and how many matches share that record.
+    """
+
+    def __init__(self, perspective):
+        team = perspective['team']
+        if hasattr(team, 'cat'):
+            names = list(team.cat.categories)
+            team_codes = team.cat.codes.values.astype(np.int64)
+            opponent_codes = perspective['opponent'].cat.codes.values.astype(np.int64)
+        else:
+            names, codes = np.unique(np.concatenate([
+                team.values, perspective['opponent'].values]), return_inverse=True)
+            names = list(names)
+            team_codes = codes[:len(team)].astype(np.int64)
+            opponent_codes = codes[len(team):].astype(np.int64)
+        self.names = names
+        self.team_ids = dict((name, i) for i, name in enumerate(names))
+        n = len(names)
+        shape = (n, n)
+        cells = team_codes * n + opponent_codes
+
+        def total(weights=None):
+            return np.bincount(cells, weights=weights, minlength=n * n).reshape(
+                shape).astype(np.int32)
+
+        wdl = np.asarray(perspective['WDL'])
+        gf = np.asarray(perspective['GF']).astype(np.int64)
+        ga = np.asarray(perspective['GA']).astype(np.int64)
+        diff = np.asarray(perspective['diff']).astype(np.int64)
+        totgoals = np.asarray(perspective['totgoals']).astype(np.int64)
+        match = np.asarray(perspective['match'])
+
+        self.W = total((wdl == 'W').astype(np.float64))
+        self.D = total((wdl == 'D').astype(np.float64))
+        self.L = total((wdl == 'L').astype(np.float64))
+        self.GF = total(gf.astype(np.float64))
+        self.GA = total(ga.astype(np.float64))
+        self.games = total()
+
+        self.records = {}
+        for kind, mask, keys in [
+                ('win', wdl == 'W', (diff, gf)),
+                ('loss', wdl == 'L', (-diff, ga)),
+                ('goals', None, (totgoals,))]:
+            self.records[kind] = _group_records(cells, match, mask, keys, n * n, shape)
+
+    def _cell(self, team, opponent):
+        i = self.team_ids.get(team)
+        j = self.team_ids.get(opponent)
+        if i is None or j is None:
+            return None
+        return i, j
+
+    def opponents(self, team):
+        """``(opponent, games)`` for every team ``team`` has played, most
+        games first."""
+        i = self.team_ids.get(team)
+        if i is None:
+            return []
+        games = self.games[i]
+        played = np.flatnonzero(games)
+        return sorted(((self.names[j], int(games[j])) for j in played),
+                      key=lambda item: (-item[1], item[0]))
+
+    def summary(self, team, opponent):
+        """``team``'s W, D, L, GF, GA and games played against ``opponent``."""
+        cell = self._cell(team, opponent)
+        summary = dict(W=0, D=0, L=0, GF=0, GA=0, games=0)
+        if cell is not None:
+            for key in summary:
+                summary[key] = int(getattr(self, key)[cell])
+        return summary
+
+    def record(self, kind, team, opponent):
+        """``(row, ties)`` of ``team``'s ``kind`` record against ``opponent``."""
+        cell = self._cell(team, opponent)
+        if cell is None:
+            return -1, 0
+        rows, ties = self.records[kind]
+        return int(rows[cell]), int(ties[cell])
+
+
+def _group_records(cells, match, mask, keys, size, shape):
+    # For each cell, the row with the largest ``keys`` (compared in order,
+    # the earliest match breaking ties) and how many rows equal it on keys.
+    if mask is not None:
+        cells, match = cells[mask], match[mask]
+        keys = [key[mask] for key in keys]
+    order = np.lexsort([match] + [-key for key in reversed(keys)] + [cells])
+    cells = cells[order]
+    rows = np.full(size, -1, dtype=np.int32)
+    ties = np.zeros(size, dtype=np.int32)
+    if len(order):
+        first = np.concatenate([[True], cells[1:] != cells[:-1]])
+        starts = np.flatnonzero(first)
+        group = np.cumsum(first) - 1
+        tied = np.ones(len(order), dtype=bool)
+        for key in keys:
+            key = key[order]
+            tied &= key == key[starts][group]
+        rows[cells[starts]] = match[order][starts]
+        ties[cells[starts]] = np.bincount(group, weights=tied, minlength=len(starts))
+    return rows.reshape(shape), ties.reshape(shape)
+
+
+class HeadToHead(object):
+    """Matches between two teams, seen from the first team's side.
+
+    ``between(team, opponent)`` returns the pair's matches with the columns
+    the opposition panel reads added: ``WDL``, ``GF``, ``GA``, ``diff``,
+    ``HA``, ``totgoals`` and ``zeros``.  Each result is computed once and
+    kept in a bounded LRU keyed by the pair and the data version, so every
+    opposition callback fired by one dropdown change shares a single
+    computation.  The returned frame is shared and must not be modified.
+    ``perspective`` is the same derivation for every team at once (see
+    ``team_perspective``) and ``cube`` the per-pair totals and records
+    computed from it, so ``summary`` and ``record_matches`` are lookups.
+    """
+
+    def __init__(self, matches, version, maxsize=HEAD_TO_HEAD_CACHE_SIZE):
+        self.matches = matches
+        self.version = version
+        self.pairs = PairIndex(matches)
+        self.perspective = team_perspective(matches)
+        self.cube = HeadToHeadCube(self.perspective)
+        self._results = LRUCache(maxsize)
+
+    def between(self, team, opponent):
+        return self._results.get_or_compute(
+            (team, opponent, self.version), lambda: self._derive(team, opponent))
+
+    def summary(self, team, opponent):
+        return self.cube.summary(team, opponent)
+
+    def opponents(self, team):
+        return self.cube.opponents(team)
+
+    def record_matches(self, kind, team, opponent):
+        """The matches sharing ``team``'s ``kind`` record (``'win'``,
+        ``'loss'`` or ``'goals'``) against ``opponent``, in table order."""
+        row, ties = self.cube.record(kind, team, opponent)
+        if ties <= 1:
+            return self.matches.iloc[[row] if ties else []]
+        df3_team = self.between(team, opponent)
+        best = df3_team.iloc[np.searchsorted(self.pairs.rows(team, opponent), row)]
+        keys = dict(win=['diff', 'GF'], loss=['diff', 'GA'], goals=['totgoals'])[kind]
+        tied = np.ones(len(df3_team), dtype=bool)
+        for key in keys:
+            tied &= np.asarray(df3_team[key] == best[key])
+        return df3_team[tied]
+
+    def page(self, team, opponent, page_current, page_size, sort_column=None,
+             descending=False):
+        """One page of ``between(team, opponent)``, sorted by ``sort_column``
+        (table order when None), the number of pages and the page returned,
+        which is ``page_current`` clamped to the pages there are."""
+        df3_team = self.between(team, opponent)
+        n_pages = max(-(-len(df3_team) // page_size), 1)
+        page_current = min(max(page_current, 0), n_pages - 1)
+        order = np.arange(len(df3_team))
+        if sort_column is not None:
+            keys = []
+            for key in SORT_KEYS.get(sort_column, [sort_column]):
+                values = df3_team[key]
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    values = values.astype(str)
+                keys.append(np.asarray(values))
+            order = np.lexsort(keys[::-1])
+            if descending:
+                order = order[::-1]
+        start = page_current * page_size
+        return df3_team.iloc[order[start:start + page_size]], n_pages, page_current
+
+    def _derive(self, team, opponent):
+        df3_team = self.matches.iloc[self.pairs.rows(team, opponent)].copy()
+        is_home = np.asarray(df3_team['home'] == team)
+        for column, values in _perspective_columns(df3_team, is_home):
+            df3_team[column] = values
+        df3_team['zeros'] = 1
+        return df3_team
+
+    def stats(self):
+        return self._results.stats()
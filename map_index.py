@@ -0,0 +1,166 @@
+"""Spatial lookups over the clubs' coordinates for the Map.
+
+``MarkerIndex`` buckets the points of one coordinates sheet into a grid of
+``CELL_DEGREES`` cells, so ``within`` finds the points inside a longitude and
+latitude box by visiting only the cells the box overlaps.  ``viewport``
+turns the Map's ``relayoutData`` into such a box and ``take_points`` cuts a
+marker trace down to the points found.
+
+``ClusterIndex`` keeps each point's cell of the web mercator grid for every
+zoom level up to ``CLUSTER_MAX_ZOOM``, computed once, and ``group`` clusters
+the points it is given (those on screen): points within the same
+``CLUSTER_RADIUS``-pixel cell at a zoom form one cluster.  Each zoom's cells
+are halves of the previous zoom's, so the clusters nest, every cluster being
+the union of clusters one zoom in.  Cluster markers are tagged with
+``CLUSTER_TAG`` in their customdata, so that clicks on them can be told
+from clicks on a club.
+"""
+import math
+
+import numpy as np
+
+CELL_DEGREES = 0.5
+# Added on each side of the visible box, as a fraction of its size, so
+# markers just off screen are there when the map is dragged.
+VIEWPORT_MARGIN = 0.25
+# The Map's size in pixels when relayoutData gives only centre and zoom.
+MAP_WIDTH = 450
+MAP_HEIGHT = 350
+# Mapbox GL tiles are 512 pixels wide at zoom 0.
+TILE_SIZE = 512
+CLUSTER_RADIUS = 8
+CLUSTER_MAX_ZOOM = 12
+CLUSTER_TAG = 'cluster'
+
+
+class MarkerIndex(object):
+    """Grid index over points given as longitude and latitude arrays."""
+
+    def __init__(self, lon, lat, cell=CELL_DEGREES):
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.cell = cell
+        self.west = self.lon.min() if len(self.lon) else 0.0
+        self.south = self.lat.min() if len(self.lat) else 0.0
+        self.columns = self._column(self.lon.max()) + 1 if len(self.lon) else 1
+        self.rows = self._row(self.lat.max()) + 1 if len(self.lat) else 1
+        cells = self._row(self.lat) * self.columns + self._column(self.lon)
+        self._order = np.argsort(cells, kind='mergesort')
+        self._cells = cells[self._order]
+
+    def __len__(self):
+        return len(self.lon)
+
+    def _column(self, lon):
+        return np.floor((lon - self.west) / self.cell).astype(np.int64)
+
+    def _row(self, lat):
+        return np.floor((lat - self.south) / self.cell).astype(np.int64)
+
+    def within(self, west, south, east, north):
+        """Positions of the points inside the box, in ascending order."""
+        first_column = max(int(self._column(west)), 0)
+        last_column = min(int(self._column(east)), self.columns - 1)
+        first_row = max(int(self._row(south)), 0)
+        last_row = min(int(self._row(north)), self.rows - 1)
+        if first_column > last_column or first_row > last_row:
+            return np.empty(0, dtype=np.int64)
+        # Each grid row's overlapped cells are one run of the sorted cells.
+        rows = np.arange(first_row, last_row + 1) * self.columns
+        starts = np.searchsorted(self._cells, rows + first_column, side='left')
+        stops = np.searchsorted(self._cells, rows + last_column, side='right')
+        found = np.concatenate([self._order[start:stop] for start, stop in zip(starts, stops)])
+        lon, lat = self.lon[found], self.lat[found]
+        inside = (lon >= west) & (lon <= east) & (lat >= south) & (lat <= north)
+        return np.sort(found[inside])
+
+
+def _mercator_y(lat):
+    return math.log(math.tan(math.pi / 4 + math.radians(lat) / 2))
+
+
+def _mercator_lat(y):
+    return math.degrees(2 * math.atan(math.exp(y)) - math.pi / 2)
+
+
+def viewport(relayout, margin=VIEWPORT_MARGIN, width=MAP_WIDTH, height=MAP_HEIGHT):
+    """The (west, south, east, north) box the Map shows after a relayout,
+    widened by ``margin``, or None if ``relayout`` does not say."""
+    if not relayout:
+        return None
+    derived = relayout.get('mapbox._derived')
+    if derived and derived.get('coordinates'):
+        lon = [corner[0] for corner in derived['coordinates']]
+        lat = [corner[1] for corner in derived['coordinates']]
+        west, east, south, north = min(lon), max(lon), min(lat), max(lat)
+    elif 'mapbox.center' in relayout and 'mapbox.zoom' in relayout:
+        center, zoom = relayout['mapbox.center'], relayout['mapbox.zoom']
+        # Radians of web mercator per pixel at this zoom.
+        scale = 2 * math.pi / (TILE_SIZE * 2 ** zoom)
+        half_lon = math.degrees(scale * width / 2)
+        y = _mercator_y(center['lat'])
+        west, east = center['lon'] - half_lon, center['lon'] + half_lon
+        south = _mercator_lat(y - scale * height / 2)
+        north = _mercator_lat(y + scale * height / 2)
+    else:
+        return None
+    pad_lon, pad_lat = (east - west) * margin, (north - south) * margin
+    return (west - pad_lon, max(south - pad_lat, -90.0),
+            east + pad_lon, min(north + pad_lat, 90.0))
+
+
+def view_zoom(relayout, default):
+    """The Map's zoom after a relayout, else ``default``."""
+    return (relayout or {}).get('mapbox.zoom', default)
+
+
+class _ClusterLevel(object):
+
+    def __init__(self, rows, keys, lon, lat):
+        _, self.labels, self.counts = np.unique(keys, return_inverse=True, return_counts=True)
+        self.labels = self.labels.ravel()
+        self.lon = np.bincount(self.labels, lon) / self.counts
+        self.lat = np.bincount(self.labels, lat) / self.counts
+        order = np.argsort(self.labels, kind='mergesort')
+        self.members = np.split(rows[order], np.cumsum(self.counts)[:-1])
+
+
+class ClusterIndex(object):
+    """Clusters of points given as longitude and latitude arrays, for each
+    zoom level from 0 to ``max_zoom``."""
+
+    def __init__(self, lon, lat, radius=CLUSTER_RADIUS, max_zoom=CLUSTER_MAX_ZOOM):
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        # Web mercator position, 0 to 1 across the world.
+        x = (self.lon + 180.0) / 360.0
+        y = 0.5 - np.log(np.tan(np.pi / 4 + np.radians(np.clip(self.lat, -85.0, 85.0)) / 2)) / (2 * np.pi)
+        self.max_zoom = max_zoom
+        self.keys = []
+        for zoom in range(max_zoom + 1):
+            cell = float(radius) / (TILE_SIZE * 2 ** zoom)
+            self.keys.append(np.floor(x / cell).astype(np.int64) << 32 | np.floor(y / cell).astype(np.int64))
+
+    def group(self, zoom, rows):
+        """Split the points at ``rows`` into those shown on their own and
+        the clusters they form at ``zoom`` among themselves, as a level
+        (counts, centres and member rows) and the positions of its clusters
+        of more than one point."""
+        if len(rows) == 0 or zoom > self.max_zoom:
+            return rows, None, np.empty(0, dtype=np.int64)
+        keys = self.keys[int(max(zoom, 0))][rows]
+        level = _ClusterLevel(rows, keys, self.lon[rows], self.lat[rows])
+        clustered = level.counts[level.labels] > 1
+        return rows[~clustered], level, np.flatnonzero(level.counts > 1)
+
+
+def take_points(trace, rows):
+    """Copy of a marker trace dict keeping only the points at ``rows``."""
+    trace = dict(trace)
+    for key in ['lat', 'lon', 'text']:
+        if key in trace:
+            trace[key] = np.asarray(trace[key])[rows]
+    marker = trace.get('marker')
+    if marker is not None and isinstance(marker.get('color'), (np.ndarray, list, tuple)):
+        trace['marker'] = dict(marker, color=np.asarray(marker['color'])[rows])
+    return trace
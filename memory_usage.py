@@ -0,0 +1,67 @@
+"""Report how much memory each gunicorn worker shares with the master.
+
+Usage: ``python memory_usage.py <master pid>``
+
+For the master and each of its child processes this prints the resident set
+size (RSS), the proportional set size (PSS) and the unique set size (USS,
+memory no other process maps).  With the dataset preloaded in the master, a
+worker's USS is what it costs on top of the shared copy.  Linux only: the
+figures come from ``/proc/<pid>/smaps``.
+"""
+import os
+import sys
+
+
+def _smaps_totals(pid):
+    totals = dict(Rss=0, Pss=0, Private_Clean=0, Private_Dirty=0)
+    path = '/proc/%d/smaps_rollup' % pid
+    if not os.path.exists(path):
+        path = '/proc/%d/smaps' % pid
+    with open(path) as smaps:
+        for line in smaps:
+            field = line.split(':', 1)[0]
+            if field in totals:
+                totals[field] += int(line.split()[1])
+    return totals
+
+
+def _children(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open('/proc/%s/stat' % entry) as stat:
+                fields = stat.read().rsplit(')', 1)[1].split()
+        except IOError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def memory_report(master_pid):
+    """Return ``[(pid, rss_kb, pss_kb, uss_kb)]`` for the master and its
+    children."""
+    rows = []
+    for pid in [master_pid] + _children(master_pid):
+        totals = _smaps_totals(pid)
+        uss = totals['Private_Clean'] + totals['Private_Dirty']
+        rows.append((pid, totals['Rss'], totals['Pss'], uss))
+    return rows
+
+
+def main(argv):
+    if len(argv) != 2:
+        sys.exit(__doc__)
+    rows = memory_report(int(argv[1]))
+    print('%8s %10s %10s %10s' % ('pid', 'RSS (MB)', 'PSS (MB)', 'USS (MB)'))
+    for pid, rss, pss, uss in rows:
+        print('%8d %10.1f %10.1f %10.1f' % (pid, rss / 1024.0, pss / 1024.0, uss / 1024.0))
+    workers = rows[1:]
+    if workers:
+        print('mean worker USS: %.1f MB' % (sum(row[3] for row in workers) / 1024.0 / len(workers)))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,136 @@
+"""Pre-rendered team chart responses, built offline and served from disk.
+
+Usage: ``python render_cache.py [processes]``
+
+The team charts (``team-pos``, ``team-WDL`` and ``team-GD``) depend only on
+the static data, the chart's dropdown option and the team clicked, so
+``build`` renders the response for every (chart, option, team) once, in
+parallel across cores, as compact JSON files under
+``RENDER_DIR/<version>/``.  The app then serves those files through
+``RenderCache`` instead of rebuilding the figures.  ``render_version``
+combines the dataset version with a hash of the code that draws and encodes
+the charts, so new data or changed chart code leaves the old renders unused
+until the next build.
+"""
+import hashlib
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+
+from caching import LRUCache
+from serialization import RawJSON, dumps
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RENDER_DIR = os.path.join(HERE, '.render_cache')
+RENDERER_SOURCES = ['app.py', 'football_data.py', 'figures.py', 'serialization.py']
+TEAM_CHARTS = ['team-pos', 'team-WDL', 'team-GD']
+RENDER_CACHE_SIZE = 512
+
+
+def render_version(dataset_version, sources=RENDERER_SOURCES):
+    digest = hashlib.sha1()
+    for source in sources:
+        with open(os.path.join(HERE, source), 'rb') as f:
+            digest.update(f.read())
+    return '%s.%s' % (dataset_version, digest.hexdigest()[:12])
+
+
+def _file_name(chart, option, team):
+    key = '\n'.join([option, team]).encode('utf-8')
+    return os.path.join(chart, hashlib.sha1(key).hexdigest() + '.json')
+
+
+class RenderCache(object):
+    """The responses ``build`` rendered for ``version``, read from disk on
+    first use and kept in an LRU cache; ``get`` returns None for anything
+    that was not rendered."""
+
+    def __init__(self, version, directory=RENDER_DIR, maxsize=RENDER_CACHE_SIZE):
+        self.version = version
+        self.path = os.path.join(directory, version)
+        self.misses = 0
+        self._cache = LRUCache(maxsize)
+
+    def get(self, chart, option, team):
+        name = _file_name(chart, option, team)
+        text = self._cache.get(name)
+        if text is None:
+            try:
+                with open(os.path.join(self.path, name), 'rb') as f:
+                    text = f.read().decode('utf-8')
+            except (IOError, OSError):
+                self.misses += 1
+                return None
+            self._cache.put(name, text)
+        return RawJSON(text)
+
+    def stats(self):
+        return dict(self._cache.stats(), version=self.version, disk_misses=self.misses)
+
+
+def _render_team(args):
+    # Render and write every chart and option for one team; runs in a pool
+    # worker, which has the app imported already (forked) or imports it.
+    path, team = args
+    import app
+    click = dict(points=[dict(text=team)])
+    size, failed = 0, []
+    for chart, option in app.figure_templates.keys():
+        if chart not in TEAM_CHARTS:
+            continue
+        try:
+            figure = app.team_charts[chart](option, click)
+        except Exception as e:
+            # Left to the app, which renders it (and fails) as before.
+            failed.append('%s %s %s: %r' % (team, chart, option, e))
+            continue
+        encoded = dumps(app.figure_templates.patch((chart, option), figure)).encode('utf-8')
+        with open(os.path.join(path, _file_name(chart, option, team)), 'wb') as f:
+            f.write(encoded)
+        size += len(encoded)
+    return size, failed
+
+
+def build(processes=None, directory=RENDER_DIR):
+    """Render every team chart response for the current data and code.
+
+    The files are written to a temporary directory that replaces
+    ``directory/<version>`` once complete, so a running app never reads a
+    partial build; renders for other versions are removed.
+    """
+    import app
+    version = app.render_cache.version
+    path = os.path.join(directory, version)
+    building = '%s.tmp-%d' % (path, os.getpid())
+    for chart in TEAM_CHARTS:
+        os.makedirs(os.path.join(building, chart))
+    teams = list(app.df1_all.index)
+
+    start = time.time()
+    pool = multiprocessing.Pool(processes)
+    try:
+        rendered = pool.map(_render_team, [(building, team) for team in teams], chunksize=4)
+    finally:
+        pool.close()
+        pool.join()
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(building, path)
+    for entry in os.listdir(directory):
+        if entry != version and '.tmp-' not in entry:
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+    return dict(version=version, teams=len(teams),
+                bytes=sum(size for size, _ in rendered),
+                failed=[failure for _, failed in rendered for failure in failed],
+                seconds=time.time() - start)
+
+
+if __name__ == '__main__':
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    result = build(processes)
+    print('Rendered %(teams)d teams (%(bytes)d bytes) in %(seconds).1f s into '
+          '.render_cache/%(version)s' % result)
+    for failure in result['failed']:
+        print('Not rendered: %s' % failure)
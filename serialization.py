@@ -0,0 +1,186 @@
+"""Fast JSON for callback responses, with per-output size and time counters.
+
+``FastJSONEncoder`` dumps responses with orjson when it is installed, else
+with the standard library, converting plotly objects, NumPy arrays and
+pandas objects to lists in bulk (float arrays rounded to ``DISPLAY_DIGITS``
+decimals) rather than element by element.  ``install`` makes Dash use it
+for every response and ``payload_stats`` reports, per callback output, how
+many responses were serialized, their total and largest size and the time
+spent.  Results cached already encoded are encoded by ``encode``, which adds
+that time to their output's; otherwise such outputs would report only the
+time to copy them into each response.
+"""
+import json
+import re
+import threading
+import time
+import uuid
+
+import numpy as np
+import plotly.utils
+from plotly.basedatatypes import BaseFigure, BasePlotlyType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import flask
+except ImportError:
+    flask = None
+
+DISPLAY_DIGITS = 4
+
+_PlotlyJSONEncoder = plotly.utils.PlotlyJSONEncoder
+
+# Stands in for a RawJSON value while the rest of the response is encoded.
+_RAW_MARK = '__raw_json_%s_' % uuid.uuid4().hex
+_RAW_MARKS = re.compile('"%s(\\d+)"' % _RAW_MARK)
+
+
+class RawJSON(object):
+    """Already-encoded JSON, written into a response as it is.
+
+    Encoders other than ``FastJSONEncoder`` decode it through
+    ``to_plotly_json`` and encode it again.
+    """
+
+    def __init__(self, text):
+        self.text = text
+
+    def to_plotly_json(self):
+        return json.loads(self.text)
+
+
+def _plain_array(array, digits):
+    if array.dtype.kind == 'f':
+        array = np.round(array.astype(np.float64), digits)
+        if not np.isfinite(array).all():
+            return [x if np.isfinite(x) else None for x in array.tolist()]
+    return array.tolist()
+
+
+def _default(value, digits=DISPLAY_DIGITS):
+    # The JSON-ready form of a value json/orjson can't write themselves:
+    # arrays and pandas objects become lists, float arrays rounded.
+    if isinstance(value, (BaseFigure, BasePlotlyType)):
+        return value.to_plotly_json()
+    if isinstance(value, np.ndarray) and value.ndim == 1:
+        return _plain_array(value, digits)
+    if hasattr(value, 'dtype') and hasattr(value, 'values') and getattr(value, 'ndim', 0) == 1:
+        return _plain_array(np.asarray(value.values), digits)
+    if isinstance(value, np.generic):
+        return value.item()
+    return _PlotlyJSONEncoder().default(value)
+
+
+class PayloadStats(object):
+    """Responses, bytes and seconds spent serializing, per output."""
+
+    def __init__(self):
+        self._outputs = {}
+        self._lock = threading.Lock()
+
+    def _output(self, output):
+        return self._outputs.setdefault(
+            output, dict(responses=0, bytes=0, max_bytes=0, seconds=0.0))
+
+    def record(self, output, size, seconds):
+        with self._lock:
+            stats = self._output(output)
+            stats['responses'] += 1
+            stats['bytes'] += size
+            stats['max_bytes'] = max(stats['max_bytes'], size)
+            stats['seconds'] += seconds
+
+    def record_encoding(self, output, seconds):
+        # Time spent encoding part of a response ahead of it, added to the
+        # output's without counting a response or bytes; the response
+        # records its full size when it is written.
+        with self._lock:
+            self._output(output)['seconds'] += seconds
+
+    def stats(self):
+        with self._lock:
+            return dict((output, dict(stats)) for output, stats in self._outputs.items())
+
+    def clear(self):
+        with self._lock:
+            self._outputs.clear()
+
+
+payloads = PayloadStats()
+
+
+def _current_output():
+    # The output a Dash update request is for, else the request path.
+    if flask is None or not flask.has_request_context():
+        return None
+    body = flask.request.get_json(silent=True)
+    if isinstance(body, dict) and 'output' in body:
+        return body['output']
+    return flask.request.path
+
+
+def dumps(value):
+    """``value`` as compact JSON; float arrays are rounded to
+    ``DISPLAY_DIGITS`` decimals and NaN becomes null, as plotly writes it,
+    and ``RawJSON`` values are copied in unchanged."""
+    raw = []
+
+    def default(o):
+        if isinstance(o, RawJSON):
+            raw.append(o.text)
+            return _RAW_MARK + str(len(raw) - 1)
+        return _default(o)
+
+    if orjson is not None:
+        encoded = orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    else:
+        try:
+            encoded = json.dumps(value, default=default, separators=(',', ':'), allow_nan=False)
+        except ValueError:
+            return json.dumps(value, cls=_PlotlyJSONEncoder, separators=(',', ':'))
+    if raw:
+        encoded = _RAW_MARKS.sub(lambda match: raw[int(match.group(1))], encoded)
+    return encoded
+
+
+def encode(value):
+    """``value`` encoded as ``RawJSON`` by ``dumps``, the time taken added
+    to the current request's output in ``payloads``."""
+    start = time.time()
+    encoded = RawJSON(dumps(value))
+    output = _current_output()
+    if output is not None:
+        payloads.record_encoding(output, time.time() - start)
+    return encoded
+
+
+class FastJSONEncoder(_PlotlyJSONEncoder):
+    """Drop-in for ``plotly.utils.PlotlyJSONEncoder`` that serializes through
+    ``dumps`` and records each response in ``payloads``."""
+
+    def encode(self, o):
+        if self.indent is not None or self.sort_keys:
+            return _PlotlyJSONEncoder.encode(self, o)
+        start = time.time()
+        encoded = dumps(o)
+        output = _current_output()
+        if output is not None:
+            payloads.record(output, len(encoded), time.time() - start)
+        return encoded
+
+
+def install():
+    """Serialize Dash responses with ``FastJSONEncoder``; Dash looks the
+    encoder up on ``plotly.utils`` for every response it writes."""
+    plotly.utils.PlotlyJSONEncoder = FastJSONEncoder
+
+
+def payload_stats():
+    """``payloads.stats()``, largest total bytes first, as a list of dicts."""
+    stats = payloads.stats()
+    return [dict(stats[output], output=output)
+            for output in sorted(stats, key=lambda output: -stats[output]['bytes'])]
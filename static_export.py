@@ -0,0 +1,238 @@
+"""Export the dashboard as static files that need no Python to serve.
+
+Usage: ``python static_export.py <directory> [fallback url]``
+
+The export holds the index page, ``_dash-layout.json``,
+``_dash-dependencies.json``, every file of the renderer and the component
+packages (the chunks they load later included), the assets, and the
+response of every server callback for every state a visitor can reach by
+clicking: each team (and none) on the Map, each option of the chart
+dropdowns and each of the team's opponents in the versus dropdown.  Other inputs keep their layout
+values, so the season-range pies are exported for the full range and the
+matches table for its first page in date order.
+
+``static_loader.js``, added to the exported page, answers the renderer's
+callback requests from ``_dash-update-component/<output>/<inputs>.json``
+and its layout and dependencies requests from their ``.json`` files.
+A state that was not exported goes to the fallback server when one is
+given, and is otherwise left as it is (a 204, which Dash treats as no
+update).  Without a fallback server the Map cannot split its clusters as it
+zooms in, so the export then draws every club (``MAP_CLUSTERS=0``), each one
+clickable.  Serve the directory at the site root.
+"""
+import importlib
+import itertools
+import json
+import multiprocessing
+import os
+import pkgutil
+import re
+import shutil
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LOADER = 'static_loader.js'
+MAP_CLICK = ('team-click', 'data')
+VERSUS = ('versus-team-dropdown', 'value')
+# The version and modified time Dash puts in a component file's name,
+# after its first dot, for caching; any one is served the same file.
+FINGERPRINT = re.compile(r'["\'`](v[0-9][A-Za-z0-9_-]*m[0-9a-fA-F]+)["\'`]')
+
+
+def slug(value):
+    return re.sub('[^A-Za-z0-9]+', '-', value)
+
+
+def _part(value):
+    # One input's share of a response's file name; static_loader.js's
+    # part() must give the same for the same value.
+    if value is None:
+        return 'none'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, dict):
+        if 'points' in value:
+            return slug(value['points'][0]['text'])
+        return 'object'
+    if isinstance(value, (list, tuple)):
+        return '-'.join(_part(item) for item in value)
+    return slug(u'%s' % value)
+
+
+def response_path(output, values):
+    return '/'.join(['_dash-update-component', slug(output),
+                     '.'.join(_part(value) for value in values) + '.json'])
+
+
+def callback_outputs(key):
+    # 'id.prop' for one output, '..id.prop...id.prop..' for several.
+    if key.startswith('..'):
+        return [dict(zip(('id', 'property'), output.rsplit('.', 1)))
+                for output in key[2:-2].split('...')], True
+    return [dict(zip(('id', 'property'), key.rsplit('.', 1)))], False
+
+
+def layout_components(layout):
+    values = {}
+    for component in layout._traverse():
+        component_id = getattr(component, 'id', None)
+        if component_id is not None:
+            values[component_id] = component
+    return values
+
+
+def _choices(app, components, item, team):
+    # The values an input can have once ``team`` is clicked.
+    key = (item['id'], item['property'])
+    component = components.get(item['id'])
+    if key == MAP_CLICK:
+        return [None if team is None else dict(points=[dict(text=team)])]
+    if key == VERSUS:
+        opponents = app.opponent_options.get(team, []) if team is not None else []
+        return [getattr(component, 'value', None)] + [option['value'] for option in opponents]
+    options = getattr(component, 'options', None)
+    if item['property'] == 'value' and options:
+        return [option['value'] for option in options]
+    return [getattr(component, item['property'], None)]
+
+
+def _write(directory, path, data):
+    path = os.path.join(directory, *path.split('/'))
+    try:
+        os.makedirs(os.path.dirname(path))
+    except OSError:
+        # Already there, possibly made by another worker meanwhile.
+        if not os.path.isdir(os.path.dirname(path)):
+            raise
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def _export_team(args):
+    # Post every callback request reachable with ``team`` clicked and write
+    # the responses; runs in a pool worker, with the app imported.
+    directory, team = args
+    import app
+    client = app.server.test_client()
+    components = layout_components(app.app.layout)
+    written = size = 0
+    for key, callback in sorted(app.app.callback_map.items()):
+        if 'callback' not in callback:
+            continue
+        items = list(callback['inputs']) + list(callback.get('state', []))
+        if team is not None and not any((i['id'], i['property']) == MAP_CLICK for i in items):
+            continue
+        outputs, multi = callback_outputs(key)
+        for values in itertools.product(*[_choices(app, components, i, team) for i in items]):
+            inputs = [dict(item, value=value) for item, value in zip(items, values)]
+            body = dict(
+                output=key,
+                outputs=outputs if multi else outputs[0],
+                inputs=inputs[:len(callback['inputs'])],
+                state=inputs[len(callback['inputs']):],
+                changedPropIds=[],
+            )
+            response = client.post('/_dash-update-component', data=json.dumps(body),
+                                   content_type='application/json')
+            if response.status_code == 200:
+                size += _write(directory, response_path(key, values), response.data)
+                written += 1
+    return written, size
+
+
+def _fingerprinted(path, fingerprint):
+    directory, _, name = path.rpartition('/')
+    name = name.replace('.', '.%s.' % fingerprint, 1)
+    return '/'.join([directory, name]) if directory else name
+
+
+def _component_files():
+    # Every file the renderer and each component package ship for the
+    # browser, under each URL the page may ask for it by.  The index page
+    # names only the bundles loaded up front, with the fingerprint Dash
+    # gives them; the chunks marked async or dynamic (dcc's graph, dropdown
+    # and plotly.js among them) are loaded later by the bundles, with the
+    # fingerprint the package was built with.
+    from dash.development.base_component import ComponentRegistry
+    for namespace in ['dash_renderer'] + sorted(ComponentRegistry.registry):
+        module = importlib.import_module(namespace)
+        files = []
+        for resource in getattr(module, '_js_dist', []) + getattr(module, '_css_dist', []):
+            paths = resource.get('relative_package_path')
+            if paths:
+                files.extend(paths if isinstance(paths, list) else [paths])
+        fingerprints = set()
+        contents = []
+        for path in files:
+            try:
+                data = pkgutil.get_data(namespace, path)
+            except (IOError, OSError):
+                # Listed but not shipped, as some source maps are.
+                continue
+            modified = int(os.stat(os.path.join(os.path.dirname(module.__file__), path)).st_mtime)
+            fingerprints.add('v%sm%d' % (module.__version__.replace('.', '_'), modified))
+            if path.endswith('.js'):
+                fingerprints.update(FINGERPRINT.findall(data.decode('utf-8', 'replace')))
+            contents.append((path, data))
+        for path, data in contents:
+            for url in [path] + [_fingerprinted(path, f) for f in sorted(fingerprints)]:
+                yield '/'.join(['_dash-component-suites', namespace, url]), data
+
+
+def _export_page(app, directory, fallback):
+    client = app.server.test_client()
+    index = client.get('/').data.decode('utf-8')
+    for path in ['_dash-layout', '_dash-dependencies']:
+        # Named .json so that any server sends them as JSON, which the
+        # renderer requires; static_loader.js asks for them by these names.
+        _write(directory, path + '.json', client.get('/' + path).data)
+    written = set()
+    for path, data in _component_files():
+        _write(directory, path, data)
+        written.add(path)
+    for path in re.findall(r'(?:src|href)="/([^"?]+)', index):
+        if not path.startswith('assets/') and path not in written:
+            _write(directory, path, client.get('/' + path).data)
+    shutil.copytree(app.app.config.assets_folder, os.path.join(directory, 'assets'))
+    shutil.copy(os.path.join(HERE, LOADER), os.path.join(directory, LOADER))
+
+    # The loader has to wrap fetch before the renderer's scripts run.
+    loader = ('<script>window.STATIC_EXPORT = %s;</script>\n'
+              '<script src="/%s"></script>\n' % (json.dumps(dict(fallback=fallback)), LOADER))
+    first_script = index.index('<script')
+    index = index[:first_script] + loader + index[first_script:]
+    _write(directory, 'index.html', index.encode('utf-8'))
+
+
+def export(directory, fallback=None, processes=None):
+    """Write the static export of the app to ``directory`` (replacing it)."""
+    if fallback is None:
+        # Set before the app is imported, here and in the pool's workers.
+        os.environ['MAP_CLUSTERS'] = '0'
+    import app
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    start = time.time()
+    _export_page(app, directory, fallback)
+
+    teams = [None] + list(app.df1_all.index)
+    pool = multiprocessing.Pool(processes)
+    try:
+        exported = pool.map(_export_team, [(directory, team) for team in teams])
+    finally:
+        pool.close()
+        pool.join()
+    return dict(responses=sum(written for written, _ in exported),
+                bytes=sum(size for _, size in exported),
+                seconds=time.time() - start)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    result = export(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print('Exported %(responses)d responses (%(bytes)d bytes) in %(seconds).0f s' % result)
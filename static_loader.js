@@ -0,0 +1,55 @@
+// Answers the Dash renderer's callback requests from a static export made by
+// static_export.py, which adds this script to the exported page, and sends
+// its layout and dependencies requests to their .json files.  Requests for
+// states that were not exported go to window.STATIC_EXPORT.fallback if it is
+// set, and otherwise get a 204, which the renderer treats as no update.
+(function() {
+    var config = window.STATIC_EXPORT || {};
+    var fetch = window.fetch.bind(window);
+
+    function slug(value) {
+        return String(value).replace(/[^A-Za-z0-9]+/g, '-');
+    }
+
+    // One input's share of a response's file name, as _part() in
+    // static_export.py gives it.
+    function part(value) {
+        if (value === null || value === undefined) {
+            return 'none';
+        }
+        if (Array.isArray(value)) {
+            return value.map(part).join('-');
+        }
+        if (typeof value === 'object') {
+            return value.points ? slug(value.points[0].text) : 'object';
+        }
+        return slug(value);
+    }
+
+    function responsePath(request) {
+        var values = request.inputs.concat(request.state || []).map(function(item) {
+            return part(item.value);
+        });
+        return '_dash-update-component/' + slug(request.output) + '/' + values.join('.') + '.json';
+    }
+
+    window.fetch = function(url, init) {
+        var path = String(url);
+        if (/_dash-(layout|dependencies)$/.test(path)) {
+            return fetch(path + '.json', init);
+        }
+        if (!init || init.method !== 'POST' || !/_dash-update-component$/.test(path)) {
+            return fetch(url, init);
+        }
+        var request = JSON.parse(init.body);
+        return fetch('/' + responsePath(request)).then(function(response) {
+            if (response.ok) {
+                return response;
+            }
+            if (config.fallback) {
+                return fetch(config.fallback.replace(/\/$/, '') + '/_dash-update-component', init);
+            }
+            return new Response(null, {status: 204});
+        });
+    };
+})();